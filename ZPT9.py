@@ -19,6 +19,8 @@ import multiprocessing
 from tqdm import tqdm
 import psutil
 import traceback
+import sqlite3
+from contextlib import contextmanager
 
 # ----------------------------
 # Dizin Tanımlamaları
@@ -31,6 +33,7 @@ TEMIZ_TABLO_DIR = os.path.join(BASE_DIR, "TemizTablo")
 TEMIZ_KAYNAKCA_DIR = os.path.join(BASE_DIR, "TemizKaynakca")
 EMBEDDING_DIR = os.path.join(SUCCESS_DIR, "embedingparca") if SUCCESS_DIR else os.path.join(os.getcwd(), "embedingparca")
 PDF_DIR = os.path.join(SUCCESS_DIR, "pdfler") if SUCCESS_DIR else os.path.join(os.getcwd(), "pdfler")
+METADATA_DB = os.path.join(BASE_DIR, "metadata.sqlite3")  # Bibliyografi ve eksik chunk kayıtları (doküman id anahtarlı)
 
 # ----------------------------
 # Loglama Yapılandırması
@@ -79,7 +82,6 @@ client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 try:
     chroma_client = chromadb.PersistentClient(path="chroma_db")
     collection = chroma_client.get_or_create_collection(name="pdf_embeddings")
-    bib_collection = chroma_client.get_or_create_collection(name="pdf_bibliography")
 except Exception as e:
     logger.error(f"ChromaDB bağlantısı kurulamadı: {e}")
     chroma_client = None
@@ -139,6 +141,35 @@ def save_text_file(directory, filename, content):
     with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
         f.write(content)
 
+@contextmanager
+def metadata_db():
+    """
+    Bibliyografi ve eksik chunk tablolarını içeren SQLite bağlantısını açar (context manager).
+    Blok başarıyla biterse commit, hata olursa rollback yapılır; bağlantı her durumda kapatılır.
+    """
+    conn = sqlite3.connect(METADATA_DB, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS bibliography (doc_id TEXT PRIMARY KEY, title TEXT, data TEXT, timestamp TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS missing_chunks (doc_id TEXT, chunk_index INTEGER, timestamp TEXT, PRIMARY KEY (doc_id, chunk_index))")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def save_bibliography(doc_id, title, bib_data):
+    """Zotero bibliyografisini vektör koleksiyonu yerine doküman id anahtarlı tabloya yazar."""
+    with metadata_db() as conn:
+        conn.execute("INSERT OR REPLACE INTO bibliography VALUES (?, ?, ?, ?)",
+                     (doc_id, title, json.dumps(bib_data, ensure_ascii=False), datetime.now().isoformat()))
+
+def save_missing_chunks(doc_id, indices):
+    """Embedding'i oluşturulamayan chunk'ları indekslemek yerine eksik olarak kaydeder."""
+    with metadata_db() as conn:
+        conn.execute("DELETE FROM missing_chunks WHERE doc_id = ?", (doc_id,))
+        conn.executemany("INSERT INTO missing_chunks VALUES (?, ?, ?)",
+                         [(doc_id, i, datetime.now().isoformat()) for i in indices])
+
 # ----------------------------
 # PDF İşleme Fonksiyonları
 # ----------------------------
@@ -282,7 +313,8 @@ def process_file(item):
       - Temiz metni (ekstralar çıkarılmış) wrap olmadan kaydeder.
       - Temiz metni küçük parçalara bölüp her parçayı OpenAI ile embedding'e dönüştürür,
         ChromaDB'ye ekler ve her chunk embedding metnini ayrı dosya olarak saklar.
-      - Zotero'dan bibliyografik bilgileri çekip ChromaDB'ye ekler.
+        Embedding'i oluşturulamayan parçalar eklenmez, eksik olarak kaydedilir.
+      - Zotero'dan bibliyografik bilgileri çekip metadata veritabanına (doküman id anahtarlı) ekler.
     """
     try:
         if not isinstance(item, dict):
@@ -311,39 +343,39 @@ def process_file(item):
         temiz_metin_filename = os.path.splitext(title)[0] + ".temizmetin.txt"
         save_text_file(TEMIZMETIN_DIR, temiz_metin_filename, temiz_metin)
         # Metni küçük parçalara böl
+        doc_id = os.path.splitext(title)[0]
         chunks = split_text(temiz_metin, chunk_size=256)
-        chunk_ids = [f"{os.path.splitext(title)[0]}_{i}" for i in range(len(chunks))]
-        embeddings = []
+        chunk_ids, embeddings, chunk_indices, missing = [], [], [], []
         for idx, chunk in enumerate(chunks):
             emb = embed_text(chunk)
             if emb is None:
                 logger.warning(f"Chunk {idx} için embedding oluşturulamadı.")
-                embeddings.append([0.0] * 768)  # Modelin embedding boyutuna göre ayarlayın
+                missing.append(idx)
             else:
+                chunk_ids.append(f"{doc_id}_{idx}")
                 embeddings.append(emb)
+                chunk_indices.append(idx)
             # Her chunk embedding metni ayrı dosya olarak kaydediliyor.
             embed_filename = f"{os.path.splitext(title)[0]}_{idx}.embed.txt"
             save_text_file(EMBEDDING_DIR, embed_filename, chunk)
+        save_missing_chunks(doc_id, missing)
         try:
-            collection.add(
-                ids=chunk_ids,
-                embeddings=embeddings,
-                metadatas=[{'title': title, 'chunk_index': i, 'timestamp': datetime.now().isoformat()} for i in range(len(chunks))]
-            )
-            logger.info(f"✅ {title} için tüm chunk embedding'leri ChromaDB'ye eklendi.")
+            if chunk_ids:
+                collection.add(
+                    ids=chunk_ids,
+                    embeddings=embeddings,
+                    metadatas=[{'title': title, 'chunk_index': i, 'timestamp': datetime.now().isoformat()} for i in chunk_indices]
+                )
+            logger.info(f"✅ {title} için {len(chunk_ids)} chunk embedding'i ChromaDB'ye eklendi ({len(missing)} eksik).")
         except Exception as e:
             logger.error(f"Embedding eklenirken hata oluştu: {e}")
-        # Zotero bibliyografik bilgileri çekiliyor ve ChromaDB'ye ekleniyor.
+        # Zotero bibliyografik bilgileri çekiliyor ve metadata veritabanına ekleniyor.
         item_key = item.get("key")
         if item_key:
             bib_data = fetch_zotero_metadata(item_key)
             if bib_data:
                 try:
-                    bib_collection.add(
-                        ids=[os.path.splitext(title)[0]],
-                        embeddings=[[0.0] * 768],  # Bibliyografi için dummy embedding
-                        metadatas=[{'title': title, 'bibliography': bib_data, 'timestamp': datetime.now().isoformat()}]
-                    )
+                    save_bibliography(doc_id, title, bib_data)
                     logger.info(f"✅ {title} için Zotero bibliyografi bilgisi eklendi.")
                 except Exception as e:
                     logger.error(f"Bibliyografi eklenirken hata: {e}")
@@ -367,7 +399,7 @@ def process_file(item):
 
 def main():
     global total_files, success_count, embedding_failed_count, text_extraction_failed_count
-    global collection, bib_collection
+    global collection
     try:
         init_dirs()
         print("\n" + "="*60)
@@ -389,10 +421,11 @@ def main():
         if user_input == 'b':
             logger.warning("⚠️ Veritabanı sıfırlanıyor...")
             try:
-                collection.delete()
-                bib_collection.delete()
+                chroma_client.delete_collection(name="pdf_embeddings")
                 collection = chroma_client.get_or_create_collection(name="pdf_embeddings")
-                bib_collection = chroma_client.get_or_create_collection(name="pdf_bibliography")
+                with metadata_db() as conn:
+                    conn.execute("DELETE FROM bibliography")
+                    conn.execute("DELETE FROM missing_chunks")
             except Exception as e:
                 logger.error(f"❌ Veritabanı sıfırlama hatası: {e}")
                 return
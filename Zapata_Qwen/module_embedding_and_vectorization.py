@@ -94,16 +94,14 @@ def embed_text_chunks(text_chunks):
     Args:
         text_chunks (list): Embedding oluşturulacak metin parçaları listesi.
     Returns:
-        list: Embedding vektörleri listesi.
+        list: Embedding vektörleri listesi; oluşturulamayan parçalar için None
+              (sıfır vektör indekse eklenmez, parça eksik olarak kaydedilir).
     """
     embeddings = []
     client = OpenAI(api_key=OPENAI_API_KEY)
     for chunk in text_chunks:
         embedding = embed_text_chunk(client, chunk)
-        if embedding:
-            embeddings.append(embedding)
-        else:
-            embeddings.append([0.0] * 1536)  # Default embedding (sıfır vektör)
+        embeddings.append(embedding if embedding else None)
     return embeddings
 
 
@@ -153,8 +151,11 @@ def process_embedding_for_file(file_data):
         text_chunks = file_data.get("chunks", [])
         embeddings = embed_text_chunks(text_chunks)
 
-        # Embedding'leri kaydet
+        # Embedding'leri kaydet (başarısız parçalar eksik olarak listelenir)
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
         for idx, embedding in enumerate(embeddings):
+            if embedding is None:
+                continue
             embed_filename = f"{title}_chunk_{idx}.embed.json"
             save_json(os.path.join(EMBEDDING_DIR, embed_filename), {"embedding": embedding})
 
@@ -162,6 +163,7 @@ def process_embedding_for_file(file_data):
         return {
             "title": title,
             "embeddings": embeddings,
+            "missing_chunks": missing,
             "status": "success",
             "timestamp": datetime.now().isoformat()
         }
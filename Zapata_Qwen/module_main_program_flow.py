@@ -16,6 +16,8 @@ import logging
 import sys
 import requests
 import traceback
+import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
 import pytz
 from concurrent.futures import ProcessPoolExecutor, as_completed
@@ -51,6 +53,7 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ZOTERO_API_KEY = os.getenv("ZOTERO_API_KEY")
 ZOTERO_USER_ID = os.getenv("ZOTERO_USER_ID")
 ZOTERO_API_URL = f"https://api.zotero.org/users/{ZOTERO_USER_ID}/items"
+METADATA_DB = Path(SUCCESS_DIR) / "metadata.sqlite3" if SUCCESS_DIR else Path("metadata.sqlite3")
 
 # ----------------------------
 # ChromaDB Configuration
@@ -58,7 +61,6 @@ ZOTERO_API_URL = f"https://api.zotero.org/users/{ZOTERO_USER_ID}/items"
 try:
     chroma_client = chromadb.PersistentClient(path="chroma_db")
     collection = chroma_client.get_or_create_collection(name="pdf_embeddings")
-    bib_collection = chroma_client.get_or_create_collection(name="pdf_bibliography")
 except Exception as e:
     logger.error(f"ChromaDB connection failed: {e}")
     chroma_client = None
@@ -139,6 +141,35 @@ def fetch_zotero_metadata(item_key):
 # File Processing Function
 # ----------------------------
 
+@contextmanager
+def metadata_db():
+    """
+    Opens the SQLite store holding bibliography and missing-chunk records keyed by document id.
+    Commits when the block succeeds, rolls back on error and always closes the connection.
+    """
+    conn = sqlite3.connect(METADATA_DB, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS bibliography (doc_id TEXT PRIMARY KEY, title TEXT, data TEXT, timestamp TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS missing_chunks (doc_id TEXT, chunk_index INTEGER, timestamp TEXT, PRIMARY KEY (doc_id, chunk_index))")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def save_bibliography(doc_id, title, bib_data):
+    """Stores Zotero metadata in the side store instead of the vector collection."""
+    with metadata_db() as conn:
+        conn.execute("INSERT OR REPLACE INTO bibliography VALUES (?, ?, ?, ?)",
+                     (doc_id, title, json.dumps(bib_data, ensure_ascii=False), datetime.now().isoformat()))
+
+def save_missing_chunks(doc_id, indices):
+    """Records chunks whose embedding failed instead of indexing placeholder vectors."""
+    with metadata_db() as conn:
+        conn.execute("DELETE FROM missing_chunks WHERE doc_id = ?", (doc_id,))
+        conn.executemany("INSERT INTO missing_chunks VALUES (?, ?, ?)",
+                         [(doc_id, i, datetime.now().isoformat()) for i in indices])
+
 def process_file(item):
     """
     Processes a single file, extracts text, generates embeddings, and stores metadata.
@@ -165,21 +196,23 @@ def process_file(item):
         
         # Split text into chunks
         chunks = split_text(raw_text)
-        embeddings = []
-        for chunk in chunks:
+        embeddings, chunk_indices, missing = [], [], []
+        for i, chunk in enumerate(chunks):
             embedding = get_embedding(chunk)
             if embedding:
                 embeddings.append(embedding)
+                chunk_indices.append(i)
             else:
                 embedding_failed_count += 1
+                missing.append(i)
+        save_missing_chunks(title, missing)
         
-        # Save embeddings to ChromaDB
-        if chroma_client:
-            chunk_ids = [f"{title}_{i}" for i in range(len(chunks))]
+        # Save embeddings to ChromaDB (failed chunks are recorded as missing, not indexed)
+        if chroma_client and embeddings:
             collection.add(
-                ids=chunk_ids,
+                ids=[f"{title}_{i}" for i in chunk_indices],
                 embeddings=embeddings,
-                metadatas=[{"title": title, "chunk_index": i} for i in range(len(chunks))]
+                metadatas=[{"title": title, "chunk_index": i} for i in chunk_indices]
             )
         
         # Fetch and store Zotero metadata
@@ -187,11 +220,7 @@ def process_file(item):
         if item_key:
             bib_data = fetch_zotero_metadata(item_key)
             if bib_data:
-                bib_collection.add(
-                    ids=[title],
-                    embeddings=[[0] * 768],  # Dummy embedding
-                    metadatas=[bib_data]
-                )
+                save_bibliography(title, title, bib_data)
         
         success_count += 1
         log_entry = {
@@ -216,7 +245,7 @@ def process_file(item):
 # ----------------------------
 
 def main():
-    global total_files
+    global total_files, collection
     try:
         init_dirs()
         print("\n" + "="*80)
@@ -242,10 +271,11 @@ def main():
         if user_input == "b":
             logger.warning("⚠️ Resetting database...")
             try:
-                collection.delete(where={"id": {"$exists": True}})
-                bib_collection.delete(where={"id": {"$exists": True}})
+                chroma_client.delete_collection(name="pdf_embeddings")
                 collection = chroma_client.get_or_create_collection(name="pdf_embeddings")
-                bib_collection = chroma_client.get_or_create_collection(name="pdf_bibliography")
+                with metadata_db() as conn:
+                    conn.execute("DELETE FROM bibliography")
+                    conn.execute("DELETE FROM missing_chunks")
             except Exception as e:
                 logger.error(f"❌ Database reset failed: {e}")
                 return
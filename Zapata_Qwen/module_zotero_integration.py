@@ -69,24 +69,36 @@ def fetch_zotero_metadata(item_key):
         return None
 
 
-def fetch_all_zotero_items():
+def fetch_all_zotero_items(since=0):
     """
-    Kullanıcının tüm Zotero öğelerini çeker.
+    Kullanıcının tüm Zotero öğelerini sayfalayarak (100'erli) çeker.
+    Args:
+        since (int): Yalnızca bu kütüphane sürümünden sonra değişen öğeleri getirir (0: tümü).
     Returns:
-        list: Zotero öğelerinin listesi (JSON formatında).
+        list: Zotero öğelerinin listesi (JSON formatında). Herhangi bir sayfa alınamazsa None
+              (eksik liste tam liste gibi döndürülmez).
     """
-    headers = {"Zotero-API-Key": ZOTERO_API_KEY}
-    url = f"{ZOTERO_API_URL}?limit=100"  # Örnek olarak 100 öğe limiti
+    headers = {"Zotero-API-Key": ZOTERO_API_KEY, "Zotero-API-Version": "3"}
+    items, start = [], 0
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Zotero'dan veri alınamadı: {response.status_code}")
-            return []
+        with requests.Session() as session:
+            while True:
+                params = {"since": since, "limit": 100, "start": start, "format": "json"}
+                response = session.get(ZOTERO_API_URL, headers=headers, params=params, timeout=30)
+                if response.status_code != 200:
+                    logger.error(f"Zotero'dan veri alınamadı: {response.status_code} (start={start}, "
+                                 f"{len(items)} öğe alınmıştı)")
+                    return None
+                page = response.json()
+                items.extend(page)
+                start += len(page)
+                total = int(response.headers.get("Total-Results", start))
+                if len(page) < 100 or start >= total:
+                    break
     except Exception as e:
         logger.error(f"Zotero API isteği başarısız: {e}")
-        return []
+        return None
+    return items
 
 
 def add_item_to_zotero(collection_key, item_data):
@@ -256,7 +268,7 @@ def save_zotero_metadata_to_file(metadata, file_path):
 if __name__ == "__main__":
     # Örnek: Tüm öğeleri çekme
     items = fetch_all_zotero_items()
-    for item in items:
+    for item in items or []:
         print(f"Öğe Başlığı: {item.get('data', {}).get('title')}")
 
     # Örnek: Yeni bir koleksiyon oluşturma
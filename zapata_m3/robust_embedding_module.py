@@ -1,8 +1,15 @@
+import os
 import time
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from config_module import config
+try:
+    import fcntl  # POSIX; Windows'ta süreçler arası dosya kilidi kullanılmaz
+except ImportError:
+    fcntl = None
 from alternative_embedding_module import (
     embed_text_with_retry,           # OpenAI API kullanan fonksiyon
     sentence_transformer_embed,      # SentenceTransformer tabanlı alternatif
@@ -32,27 +39,191 @@ _MODEL_FUNCTIONS = {
     "use_lite": universal_sentence_encoder_lite_embed
 }
 
-# Yığın (cache) dosyası yolu
-CACHE_FILE = Path("embedding_cache.json")
+# Yığın (cache) dosyası yolu: append-only JSON Lines günlüğü (her satır bir kayıt)
+CACHE_FILE = Path("embedding_cache.jsonl")
+LEGACY_CACHE_FILE = Path("embedding_cache.json")  # Eski, her chunk'ta yeniden yazılan format
+COMPACT_MIN_RECORDS = 1000  # Sıkıştırma için gereken en az satır sayısı
+COMPACT_RATIO = 2.0  # Satır sayısı / benzersiz kayıt oranı bunu aşarsa sıkıştırılır
+
+class EmbeddingCacheLog:
+    """
+    Embedding cache kayıtları için append-only günlük deposu.
+
+    - Her güncelleme dosyanın sonuna tek bir JSON satırı olarak eklenir (tek os.write çağrısı, O_APPEND).
+    - (pdf_id, chunk_no) -> son kayıt eşlemesi bellekte tutulur; arama O(1)'dir.
+    - Ekleme ve sıkıştırma, yan kilit dosyası üzerinde `fcntl.flock` ile süreçler arası özel kilit altında
+      yapılır (fcntl olmayan platformlarda yalnızca thread kilidi kullanılır).
+    - Her aramadan önce dosyanın inode/boyut/mtime bilgisi kontrol edilir; diğer süreçlerin eklediği
+      satırlar kaldığı yerden okunur, dosya sıkıştırılarak değiştirildiyse baştan yüklenir.
+    - Yarım kalmış (çökme sırasında kesilmiş) satırlar yükleme sırasında atlanır.
+    - Günlük, tekrar eden kayıtlarla şiştiğinde geçici dosyaya yazılıp os.replace ile atomik olarak sıkıştırılır.
+    - Eski embedding_cache.json dosyası ilk yüklemede otomatik olarak taşınır.
+    """
+    def __init__(self, path=CACHE_FILE, legacy_path=LEGACY_CACHE_FILE):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path)
+        self.lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        self.lock = threading.Lock()
+        self.index = {}
+        self.line_count = 0
+        self._offset = 0  # Günlükte okunmuş (tam satırlardan oluşan) bayt sayısı
+        self._signature = None  # Son okunduğunda dosyanın (inode, boyut, mtime_ns) bilgisi
+        self._loaded = False
+
+    @staticmethod
+    def _key(entry):
+        return (str(entry["pdf_id"]), int(entry["chunk_no"]))
+
+    @contextmanager
+    def _file_lock(self):
+        """Süreçler arası özel kilit; ekleme ve sıkıştırma boyunca tutulur."""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # Kilit dosya tanımlayıcısı kapanınca bırakılır
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _parse_lines(self, data):
+        # Yalnızca satır sonuyla biten satırlar işlenir; yarım son satır bir sonraki okumaya kalır
+        end = data.rfind(b"\n")
+        if end < 0:
+            return 0
+        for line in data[:end].split(b"\n"):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+                self.index[self._key(entry)] = entry
+                self.line_count += 1
+            except (ValueError, KeyError, TypeError):
+                config.logger.warning("Embedding cache günlüğünde bozuk satır atlandı.")
+        return end + 1
+
+    def _refresh(self):
+        """Dosya son okumadan beri değiştiyse yeni satırları okur (gerekirse baştan yükler)."""
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return
+        if (signature is None or self._signature is None
+                or signature[0] != self._signature[0] or signature[1] < self._offset):
+            # Dosya yeni oluştu, silindi ya da başka bir süreç tarafından sıkıştırılıp değiştirildi
+            self.index, self.line_count, self._offset = {}, 0, 0
+        if signature is not None:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                self._offset += self._parse_lines(f.read())
+        self._signature = signature
+
+    def _migrate_legacy(self):
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            config.logger.error(f"Eski embedding cache okunamadı, taşıma atlandı: {e}")
+            return
+        for entry in legacy:
+            try:
+                self.index[self._key(entry)] = entry
+            except (KeyError, TypeError, ValueError):
+                continue
+        self._write_compacted()
+        os.replace(self.legacy_path, self.legacy_path.with_suffix(".json.migrated"))
+        config.logger.info(f"Eski embedding cache taşındı: {len(self.index)} kayıt -> {self.path}")
+
+    def _terminate_partial_line(self):
+        # Çökme sonucu yarım kalan son satır, sonraki kaydı bozmasın diye satır sonuyla kapatılır
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            self._refresh()
+            return
+        with self._file_lock():
+            if self.legacy_path.exists() and not self.path.exists():
+                self._migrate_legacy()
+            self._terminate_partial_line()
+            self._refresh()
+        self._loaded = True
+
+    def _write_compacted(self):
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.index.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.line_count = len(self.index)
+        self._signature = self._stat_signature()
+        self._offset = self._signature[1]
+
+    def _compact_locked(self):
+        # Dosya kilidi tutulurken çağrılır: diğer süreçlerin eklediği satırlar önce okunur, sonra yeniden yazılır
+        self._refresh()
+        self._write_compacted()
+
+    def compact(self):
+        """Günlüğü yalnızca her anahtarın son kaydını içerecek şekilde atomik olarak yeniden yazar."""
+        with self.lock:
+            self._ensure_loaded()
+            with self._file_lock():
+                self._compact_locked()
+
+    def append(self, entry):
+        """Kaydı günlüğe ekler ve bellek içi indeksi günceller."""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self.lock:
+            self._ensure_loaded()
+            with self._file_lock():
+                self._refresh()  # Kilit beklenirken eklenen satırlar; ofset yalnızca kendi satırımızla ilerlesin
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+                self.index[self._key(entry)] = entry
+                self.line_count += 1
+                self._offset += len(line)
+                self._signature = self._stat_signature()
+                if (self.line_count >= COMPACT_MIN_RECORDS
+                        and self.line_count > COMPACT_RATIO * len(self.index)):
+                    self._compact_locked()
+
+    def get(self, pdf_id, chunk_no):
+        """(pdf_id, chunk_no) için son kaydı döndürür; yoksa None."""
+        with self.lock:
+            self._ensure_loaded()
+            return self.index.get((str(pdf_id), int(chunk_no)))
+
+    def entries(self):
+        """Tüm güncel kayıtları liste olarak döndürür."""
+        with self.lock:
+            self._ensure_loaded()
+            return list(self.index.values())
+
+embedding_cache_log = EmbeddingCacheLog()
 
 def load_embedding_cache():
-    if CACHE_FILE.exists():
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return embedding_cache_log.entries()
 
 def update_embedding_cache(entry):
-    cache = load_embedding_cache()
-    updated = False
-    for i, rec in enumerate(cache):
-        if rec["pdf_id"] == entry["pdf_id"] and rec["chunk_no"] == entry["chunk_no"]:
-            cache[i] = entry
-            updated = True
-            break
-    if not updated:
-        cache.append(entry)
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+    embedding_cache_log.append(entry)
 
 def robust_embed_text(text, pdf_id, chunk_index, total_chunks, model_priority=None, max_retries=3, backoff_factor=1.0):
     """
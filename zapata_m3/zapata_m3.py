@@ -459,7 +459,6 @@ def universal_sentence_encoder_lite_embed(text):
 import time
 import json
 from datetime import datetime
-from pathlib import Path
 from config_module import config
 from alternative_embedding_module import (
     embed_text_with_retry,           # OpenAI API kullanan fonksiyon
@@ -490,27 +489,8 @@ _MODEL_FUNCTIONS = {
     "use_lite": universal_sentence_encoder_lite_embed
 }
 
-# Yığın (cache) dosyası yolu
-CACHE_FILE = Path("embedding_cache.json")
-
-def load_embedding_cache():
-    if CACHE_FILE.exists():
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-def update_embedding_cache(entry):
-    cache = load_embedding_cache()
-    updated = False
-    for i, rec in enumerate(cache):
-        if rec["pdf_id"] == entry["pdf_id"] and rec["chunk_no"] == entry["chunk_no"]:
-            cache[i] = entry
-            updated = True
-            break
-    if not updated:
-        cache.append(entry)
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+# Embedding cache günlüğü (EmbeddingCacheLog) yalnızca robust_embedding_module'de tanımlıdır
+from robust_embedding_module import update_embedding_cache
 
 def robust_embed_text(text, pdf_id, chunk_index, total_chunks, model_priority=None, max_retries=3, backoff_factor=1.0):
     """
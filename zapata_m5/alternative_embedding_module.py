@@ -1,4 +1,6 @@
 # Açıklama: Bu modül, alternatif embedding modelleri kullanarak metin embedding'i oluşturmayı sağlar.
+import threading
+from collections import OrderedDict
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from config_module import config
@@ -16,9 +18,118 @@ MODEL_LIST = {
     "universal_sentence_encoder_lite": "universal-sentence-encoder-lite"
 }
 
+class ModelRegistry:
+    """
+    📌 SentenceTransformer modelleri için süreç genelinde, thread-safe ve tembel (lazy) yüklenen kayıt defteri.
+
+    - Her model anahtarı süreç başına yalnızca bir kez yüklenir.
+    - Aynı model için eşzamanlı istekler tek bir yüklemeyi bekler.
+    - Toplam tahmini bellek `budget_mb` değerini aşarsa en az kullanılan (LRU) model bellekten çıkarılır.
+    """
+
+    def __init__(self, budget_mb=None):
+        self.budget_mb = budget_mb if budget_mb is not None else config.MODEL_MEMORY_BUDGET_MB
+        self._models = OrderedDict()  # model_key -> (model, boyut_mb); sıra = LRU sırası
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    @staticmethod
+    def _model_boyutu_mb(model):
+        """
+        📌 Modelin parametre belleğini MB cinsinden tahmin eder.
+        """
+        try:
+            total = sum(p.numel() * p.element_size() for p in model.parameters())
+            return total / (1024 ** 2)
+        except Exception:
+            return 0.0
+
+    def _bellek_kullanimi_mb(self):
+        return sum(size for _, size in self._models.values())
+
+    def _evict(self, keep_key):
+        """
+        📌 Bellek bütçesi aşıldığında en az kullanılan modelleri çıkarır (kilit altında çağrılır).
+        """
+        while self._bellek_kullanimi_mb() > self.budget_mb and len(self._models) > 1:
+            oldest_key = next(iter(self._models))
+            if oldest_key == keep_key:
+                self._models.move_to_end(keep_key)
+                continue
+            _, size = self._models.pop(oldest_key)
+            config.logger.info(f"♻️ {oldest_key} modeli bellekten çıkarıldı (~{size:.0f} MB, LRU).")
+
+    def get(self, model_key):
+        """
+        📌 Modeli kayıt defterinden döndürür; yoksa yükler.
+
+        Args:
+            model_key (str): MODEL_LIST içinde yer alan model anahtarı.
+
+        Returns:
+            SentenceTransformer veya None: Yüklenmiş model, yüklenemezse None.
+        """
+        model_name = MODEL_LIST.get(model_key)
+        if not model_name:
+            raise ValueError(f"❌ Geçersiz model anahtarı: {model_key}")
+
+        with self._lock:
+            if model_key in self._models:
+                self._models.move_to_end(model_key)
+                return self._models[model_key][0]
+            load_lock = self._load_locks.setdefault(model_key, threading.Lock())
+
+        with load_lock:
+            # Başka bir thread bu sırada yüklemiş olabilir
+            with self._lock:
+                if model_key in self._models:
+                    self._models.move_to_end(model_key)
+                    return self._models[model_key][0]
+            try:
+                model = SentenceTransformer(model_name)
+            except Exception as e:
+                config.logger.error(f"❌ Model yüklenirken hata oluştu ({model_key}): {e}")
+                return None
+            size = self._model_boyutu_mb(model)
+            with self._lock:
+                self._models[model_key] = (model, size)
+                self._evict(keep_key=model_key)
+            config.logger.info(f"✅ {model_key} modeli yüklendi (model adı: {model_name}, ~{size:.0f} MB).")
+            return model
+
+    def preload(self, models):
+        """
+        📌 Verilen model anahtarlarını önceden yükler.
+
+        Args:
+            models (list): Yüklenecek model anahtarları.
+
+        Returns:
+            list: Başarıyla yüklenen model anahtarları.
+        """
+        loaded = []
+        for model_key in models:
+            try:
+                if self.get(model_key) is not None:
+                    loaded.append(model_key)
+            except ValueError as e:
+                config.logger.error(str(e))
+        return loaded
+
+    def loaded_models(self):
+        """
+        📌 Bellekte bulunan model anahtarlarını LRU sırasıyla döndürür.
+        """
+        with self._lock:
+            return list(self._models.keys())
+
+
+model_registry = ModelRegistry()
+
 def get_sentence_transformer(model_key):
     """
-    📌 Belirtilen model anahtarına göre SentenceTransformer modelini yükler.
+    📌 Belirtilen model anahtarına göre SentenceTransformer modelini süreç genelindeki kayıt defterinden döndürür.
+    Model ilk kullanımda yüklenir; sonraki çağrılar aynı örneği kullanır.
     
     Args:
         model_key (str): MODEL_LIST içinde yer alan model anahtarı.
@@ -26,16 +137,19 @@ def get_sentence_transformer(model_key):
     Returns:
         SentenceTransformer veya None: Yüklenmiş model, yüklenemezse None.
     """
-    model_name = MODEL_LIST.get(model_key)
-    if not model_name:
-        raise ValueError(f"❌ Geçersiz model anahtarı: {model_key}")
-    try:
-        model = SentenceTransformer(model_name)
-        config.logger.info(f"✅ {model_key} modeli yüklendi (model adı: {model_name}).")
-        return model
-    except Exception as e:
-        config.logger.error(f"❌ Model yüklenirken hata oluştu ({model_key}): {e}")
-        return None
+    return model_registry.get(model_key)
+
+def preload(models):
+    """
+    📌 Uygulama başlangıcında alternatif embedding modellerini önceden yükler.
+
+    Args:
+        models (list): MODEL_LIST içindeki model anahtarları.
+
+    Returns:
+        list: Başarıyla yüklenen model anahtarları.
+    """
+    return model_registry.preload(models)
 
 def embed_text_with_model(text, model_key):
     """
@@ -60,6 +174,43 @@ def embed_text_with_model(text, model_key):
         config.logger.error(f"❌ Embedding oluşturulamadı ({model_key}): {e}")
         return None
 
+def embed_texts_with_model(texts, model_key, batch_size=32):
+    """
+    📌 Metin listesini alternatif embedding modeli ile tek seferde (vektörel) embedding'e dönüştürür.
+
+    Metinler padding kaybını azaltmak için uzunluğa göre sıralanarak `model.encode`'a verilir,
+    sonuçlar orijinal sıraya geri dizilir.
+
+    Args:
+        texts (list): Embedding oluşturulacak metinler.
+        model_key (str): Kullanılacak model anahtarı (MODEL_LIST içinde).
+        batch_size (int): `model.encode` iç batch boyutu (varsayılan: 32).
+
+    Returns:
+        np.ndarray veya None: (len(texts), boyut) şeklinde float32 dizi veya hata durumunda None.
+    """
+    model = get_sentence_transformer(model_key)
+    if not model:
+        config.logger.error(f"❌ Model {model_key} yüklenemedi, embedding oluşturulamıyor.")
+        return None
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    try:
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        encoded = model.encode(
+            [texts[i] for i in order],
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        embeddings = np.empty_like(encoded, dtype=np.float32)
+        embeddings[order] = encoded
+        config.logger.info(f"✅ {len(texts)} metin için embedding oluşturuldu ({model_key}).")
+        return embeddings
+    except Exception as e:
+        config.logger.error(f"❌ Toplu embedding oluşturulamadı ({model_key}): {e}")
+        return None
+
 def get_available_models():
     """
     📌 Kullanılabilir alternatif embedding modellerinin anahtarlarını döndürür.
@@ -87,6 +238,13 @@ def get_available_models():
 # - **embed_text_with_model:**  
 #   Yüklenen modeli kullanarak verilen metni embedding’e dönüştürür. Hata durumunda ilgili hata mesajını loglar.
 
+# - **ModelRegistry / preload:**  
+#   Modeller süreç başına bir kez yüklenir ve bellek bütçesi (MODEL_MEMORY_BUDGET_MB) aşılırsa LRU sırasıyla bellekten çıkarılır.
+# `preload` ile uygulama başlangıcında önceden yüklenebilir.
+
+# - **embed_texts_with_model:**  
+#   Metin listesini uzunluğa göre sıralayıp tek `encode` çağrısıyla float32 NumPy dizisine dönüştürür.
+
 # - **get_available_models:**  
 #   Kullanıcıya hangi alternatif modellerin mevcut olduğunu döndürür.
 
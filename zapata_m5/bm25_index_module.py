@@ -0,0 +1,457 @@
+import os
+import re
+import math
+import heapq
+import sqlite3
+import threading
+from pathlib import Path
+from collections import defaultdict
+import numpy as np
+from config_module import config
+
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")  # TfidfVectorizer varsayılanıyla aynı tokenizasyon
+CLEAN_SUFFIX = ".clean.txt"
+HIGHLIGHT = ("**", "**")  # Pasajlarda eşleşen terimlerin işaretleri
+
+
+def tokenize(text):
+    """
+    📌 Metni küçük harfli tokenlara böler.
+
+    Returns:
+        list: Token listesi (sırası korunur; liste indeksi token konumudur).
+    """
+    # Tokenlar özgün metin üzerinde bulunur (konumlar dosyadaki ofsetlerle örtüşsün diye), sonra küçültülür
+    return [m.group().lower() for m in TOKEN_PATTERN.finditer(text)]
+
+
+def vurgula(metin, terimler, isaret=HIGHLIGHT):
+    """
+    📌 Metindeki sorgu terimlerini işaretler (ör. "gene" → "**gene**").
+
+    Args:
+        metin (str): Pasaj metni.
+        terimler (iterable): Küçük harfli sorgu terimleri.
+        isaret (tuple): (açılış, kapanış) işaretleri.
+
+    Returns:
+        str: Vurgulanmış metin.
+    """
+    terimler = set(terimler)
+    return TOKEN_PATTERN.sub(
+        lambda m: f"{isaret[0]}{m.group()}{isaret[1]}" if m.group().lower() in terimler else m.group(), metin
+    )
+
+
+class BM25Index:
+    """
+    📌 **Temiz metinler için disk üzerinde, konumsal (positional) ters indeks ve BM25 arama.**
+
+    - SQLite tabloları: `docs` (doküman uzunluğu, dosya boyutu/mtime), `terms` (df, max_tf),
+      `postings` (terim → doküman, tf; terim anahtarına göre kümelenmiş, WITHOUT ROWID) ve
+      `positions` (terim, doküman → token konumları; arama sırasında okunmaz, ifade/snippet için).
+    - `ekle` pipeline'ın kaydetme aşamasından tek dokümanı, `guncelle` ise `CLEAN_TEXT_DIR/txt`
+      dizinindeki yeni/değişmiş dosyaları artımlı olarak indeksler.
+    - `search` top-k aramayı MaxScore budamasıyla yapar: her terimin BM25 üst sınırı (max_tf ve en kısa
+      doküman uzunluğundan) hesaplanır; eşik skoru aşamayacak dokümanlar tamamen puanlanmadan elenir.
+    - Her doküman `SNIPPET_PASSAGE_TOKENS` tokenlık pasajlara bölünür ve pasaj sınırlarının dosyadaki bayt
+      ofsetleri `docs` tablosunda saklanır; `pasaj` sorguya en iyi uyan pasajı terim konumlarından seçer
+      ve dosyadan yalnızca o bayt aralığını okur (doküman metni bellekte tutulmaz).
+
+    Örnek:
+        bm25_index.guncelle()
+        bm25_index.search("protein folding kinetics", k=10)
+    """
+
+    def __init__(self, db_path=None, txt_dir=None, k1=None, b=None):
+        self.db_path = str(db_path or config.BM25_INDEX_PATH)
+        self.txt_dir = Path(txt_dir or Path(config.CLEAN_TEXT_DIR) / "txt")
+        self.k1 = k1 or config.BM25_K1
+        self.b = b if b is not None else config.BM25_B
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self._yerel = threading.local()
+
+    @property
+    def son_istatistik(self):
+        """Bu thread'de yapılan son aramanın MaxScore istatistikleri ("puanlanan", "aday_ust_sinir")."""
+        return getattr(self._yerel, "istatistik", {})
+
+    def _baglanti(self):
+        if self._conn is None or self._pid != os.getpid():
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-65536")  # 64 MB: postings eklemeleri terim sayfalarına dağınık yazılır
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS docs (
+                    doc_id INTEGER PRIMARY KEY,
+                    ad TEXT UNIQUE NOT NULL,
+                    uzunluk INTEGER NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    yol TEXT,
+                    pasaj_boyu INTEGER,
+                    pasaj_ofsetleri BLOB
+                );
+                CREATE TABLE IF NOT EXISTS terms (
+                    term_id INTEGER PRIMARY KEY,
+                    term TEXT UNIQUE NOT NULL,
+                    df INTEGER NOT NULL DEFAULT 0,
+                    max_tf INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term_id INTEGER NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term_id, doc_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS positions (
+                    term_id INTEGER NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    konumlar BLOB NOT NULL,
+                    PRIMARY KEY (doc_id, term_id)
+                ) WITHOUT ROWID;
+            """)
+            # Pasaj sütunları olmadan oluşturulmuş indeksler; bu dokümanların pasajları ilk istekte yeniden indekslenir
+            sutunlar = {row[1] for row in conn.execute("PRAGMA table_info(docs)")}
+            for sutun, tip in (("yol", "TEXT"), ("pasaj_boyu", "INTEGER"), ("pasaj_ofsetleri", "BLOB")):
+                if sutun not in sutunlar:
+                    conn.execute(f"ALTER TABLE docs ADD COLUMN {sutun} {tip}")
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _sil(self, conn, doc_id):
+        # df düşürülür; max_tf düşürülmez (eski değer hâlâ geçerli bir üst sınırdır)
+        conn.execute(
+            "UPDATE terms SET df = df - 1 WHERE term_id IN (SELECT term_id FROM positions WHERE doc_id = ?)", (doc_id,)
+        )
+        conn.execute(
+            "DELETE FROM postings WHERE (term_id, doc_id) IN (SELECT term_id, doc_id FROM positions WHERE doc_id = ?)", (doc_id,)
+        )
+        conn.execute("DELETE FROM positions WHERE doc_id = ?", (doc_id,))
+        conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+
+    def ekle(self, ad, metin, size=None, mtime_ns=None):
+        """
+        📌 Dokümanı indekse ekler; aynı adla kayıtlı doküman varsa önce çıkarılır.
+
+        Args:
+            ad (str): Doküman adı (temiz metin dosyasının kökü, ör. "makale" → makale.clean.txt).
+            metin (str): Temiz metin (pasaj ofsetleri bu metnin UTF-8 baytlarına göre hesaplanır).
+            size (int, optional): Kaynak dosya boyutu (artımlı tarama için).
+            mtime_ns (int, optional): Kaynak dosya değişiklik zamanı (artımlı tarama için).
+        """
+        with self._lock:
+            conn = self._baglanti()
+            with conn:
+                self._ekle(conn, ad, metin, size, mtime_ns)
+
+    def dosya_ekle(self, yol, ad=None):
+        """
+        📌 Temiz metin dosyasını indekse ekler; pasaj ofsetleri dosyanın kendi baytlarından hesaplanır.
+
+        Args:
+            yol (str or Path): Temiz metin dosyası.
+            ad (str, optional): Doküman adı (varsayılan: dosya adından `.clean.txt` çıkarılmış kök).
+        """
+        with self._lock:
+            conn = self._baglanti()
+            with conn:
+                self._dosya_ekle(conn, yol, ad)
+
+    def _dosya_ekle(self, conn, yol, ad=None):
+        yol = Path(yol)
+        if ad is None:
+            ad = yol.name[:-len(CLEAN_SUFFIX)] if yol.name.endswith(CLEAN_SUFFIX) else yol.stem
+        with open(yol, "rb") as f:
+            stat = os.fstat(f.fileno())
+            metin = f.read().decode("utf-8")  # Satır sonları çevrilmez; ofsetler dosyayla birebir örtüşür
+        self._ekle(conn, ad, metin, stat.st_size, stat.st_mtime_ns, yol=str(yol))
+
+    def _pasaj_ofsetleri(self, metin, eslesmeler, boy):
+        # Her `boy` tokenda bir pasaj başlar; sınırların UTF-8 bayt ofsetleri artımlı hesaplanır
+        ofsetler, bayt, onceki = [0], 0, 0
+        for i in range(boy, len(eslesmeler), boy):
+            karakter = eslesmeler[i].start()
+            bayt += len(metin[onceki:karakter].encode("utf-8"))
+            ofsetler.append(bayt)
+            onceki = karakter
+        ofsetler.append(bayt + len(metin[onceki:].encode("utf-8")))
+        return np.asarray(ofsetler, dtype=np.uint32).tobytes()
+
+    def _ekle(self, conn, ad, metin, size, mtime_ns, yol=None):
+        # Çağıran işlem (transaction) içinde çalışır; commit çağırana aittir
+        eslesmeler = list(TOKEN_PATTERN.finditer(metin))
+        konumlar = defaultdict(list)
+        for i, m in enumerate(eslesmeler):
+            konumlar[m.group().lower()].append(i)
+        boy = config.SNIPPET_PASSAGE_TOKENS
+        eski = conn.execute("SELECT doc_id FROM docs WHERE ad = ?", (ad,)).fetchone()
+        if eski:
+            self._sil(conn, eski[0])
+        doc_id = conn.execute(
+            "INSERT INTO docs (ad, uzunluk, size, mtime_ns, yol, pasaj_boyu, pasaj_ofsetleri) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (ad, len(eslesmeler), size, mtime_ns, yol, boy, self._pasaj_ofsetleri(metin, eslesmeler, boy))
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO terms (term, df, max_tf) VALUES (?, 1, ?) "
+            "ON CONFLICT(term) DO UPDATE SET df = df + 1, max_tf = MAX(max_tf, excluded.max_tf)",
+            [(term, len(k)) for term, k in konumlar.items()]
+        )
+        term_idleri = {}
+        terimler = list(konumlar)
+        for start in range(0, len(terimler), 500):  # SQLite parametre sınırı
+            parca = terimler[start:start + 500]
+            term_idleri.update(conn.execute(
+                f"SELECT term, term_id FROM terms WHERE term IN ({','.join('?' * len(parca))})", parca
+            ).fetchall())
+        conn.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?)",
+            [(term_idleri[term], doc_id, len(k)) for term, k in konumlar.items()]
+        )
+        conn.executemany(
+            "INSERT INTO positions VALUES (?, ?, ?)",
+            [(term_idleri[term], doc_id, np.asarray(k, dtype=np.uint32).tobytes()) for term, k in konumlar.items()]
+        )
+
+    def cikar(self, ad):
+        """
+        📌 Dokümanı indeksten çıkarır.
+        """
+        with self._lock:
+            conn = self._baglanti()
+            with conn:
+                eski = conn.execute("SELECT doc_id FROM docs WHERE ad = ?", (ad,)).fetchone()
+                if eski:
+                    self._sil(conn, eski[0])
+
+    def guncelle(self, islem_boyutu=200):
+        """
+        📌 `CLEAN_TEXT_DIR/txt` dizinini tarar; yeni/değişmiş temiz metinleri indeksler, silinenleri çıkarır.
+        Dokümanlar `islem_boyutu`'luk gruplar halinde tek işlemde (transaction) yazılır.
+
+        Returns:
+            int: İndekslenen doküman sayısı.
+        """
+        if not self.txt_dir.exists():
+            return 0
+        mevcut = {}
+        with os.scandir(self.txt_dir) as girdiler:
+            for girdi in girdiler:
+                if girdi.is_file() and girdi.name.endswith(CLEAN_SUFFIX):
+                    stat = girdi.stat()
+                    mevcut[girdi.name[:-len(CLEAN_SUFFIX)]] = (girdi.path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            kayitli = {ad: (size, mtime_ns) for ad, size, mtime_ns in
+                       self._baglanti().execute("SELECT ad, size, mtime_ns FROM docs").fetchall()}
+        for ad in set(kayitli) - set(mevcut):
+            self.cikar(ad)
+        bekleyen = [(ad, bilgi) for ad, bilgi in mevcut.items() if kayitli.get(ad) != bilgi[1:]]
+        eklenen = 0
+        for start in range(0, len(bekleyen), islem_boyutu):
+            with self._lock:
+                conn = self._baglanti()
+                with conn:
+                    for ad, (yol, _, _) in bekleyen[start:start + islem_boyutu]:
+                        try:
+                            self._dosya_ekle(conn, yol, ad)
+                        except Exception as e:
+                            config.logger.error(f"❌ BM25 indeksleme hatası ({yol}): {e}")
+                            continue
+                        eklenen += 1
+        if eklenen:
+            config.logger.info(f"🔄 BM25 indeksi güncellendi: {eklenen} doküman indekslendi.")
+        return eklenen
+
+    def _postings(self, conn, term_id):
+        rows = conn.execute("SELECT doc_id, tf FROM postings WHERE term_id = ? ORDER BY doc_id", (term_id,)).fetchall()
+        arr = np.asarray(rows, dtype=np.int64).reshape(-1, 2)
+        return arr[:, 0], arr[:, 1]
+
+    def search(self, query, k=10, istatistik=None):
+        """
+        📌 **BM25 ile en iyi `k` dokümanı MaxScore budamasıyla döndürür.**
+
+        Args:
+            query (str): Arama metni.
+            k (int): Döndürülecek sonuç sayısı.
+            istatistik (dict, optional): Verilirse bu çağrının MaxScore istatistikleri içine yazılır
+                ("puanlanan": tam puanlanan doküman, "aday_ust_sinir": sorgu terimlerinin posting toplamı).
+
+        Returns:
+            list: Skora göre azalan [{"ad": ..., "skor": ..., "doc_id": ...}]
+        """
+        istatistik = {} if istatistik is None else istatistik
+        self._yerel.istatistik = istatistik
+        terimler = list(dict.fromkeys(tokenize(query)))
+        if not terimler or k <= 0:
+            return []
+        with self._lock:
+            conn = self._baglanti()
+            n, toplam, en_kisa = conn.execute("SELECT COUNT(*), COALESCE(SUM(uzunluk), 0), MIN(uzunluk) FROM docs").fetchone()
+            if not n:
+                return []
+            avgdl = toplam / n
+            bilgiler = conn.execute(
+                f"SELECT term_id, df, max_tf FROM terms WHERE term IN ({','.join('?' * len(terimler))}) AND df > 0",
+                terimler
+            ).fetchall()
+            listeler = []
+            for term_id, df, max_tf in bilgiler:
+                doc_ids, tfs = self._postings(conn, term_id)
+                if not len(doc_ids):
+                    continue
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                ust_sinir = idf * max_tf * (self.k1 + 1) / (max_tf + self.k1 * (1 - self.b + self.b * en_kisa / avgdl))
+                listeler.append({"doc_ids": doc_ids, "tfs": tfs, "idf": idf, "ust": ust_sinir, "i": 0})
+            if not listeler:
+                return []
+            ilgili = np.unique(np.concatenate([l["doc_ids"] for l in listeler]))
+            uzunluklar = dict(conn.execute(
+                f"SELECT doc_id, uzunluk FROM docs WHERE doc_id IN ({','.join('?' * len(ilgili))})",
+                [int(d) for d in ilgili]
+            ).fetchall()) if len(ilgili) <= 900 else dict(conn.execute("SELECT doc_id, uzunluk FROM docs").fetchall())
+
+        sonuclar = self._maxscore(listeler, uzunluklar, avgdl, k, istatistik)
+        with self._lock:
+            adlar = dict(self._baglanti().execute(
+                f"SELECT doc_id, ad FROM docs WHERE doc_id IN ({','.join('?' * len(sonuclar))})", [d for _, d in sonuclar]
+            ).fetchall()) if sonuclar else {}
+        return [{"ad": adlar.get(d), "skor": round(float(s), 4), "doc_id": d} for s, d in sonuclar]
+
+    def _maxscore(self, listeler, uzunluklar, avgdl, k, istatistik):
+        """
+        📌 MaxScore (doküman-anında) top-k değerlendirmesi.
+
+        Listeler üst sınıra göre artan sıralanır; önek üst sınır toplamı eşiği (k'ıncı skor) geçmeyen
+        listeler "esas olmayan" sayılır. Aday dokümanlar yalnızca esas listelerden üretilir; esas olmayan
+        listelere ikili arama ile bakılır ve kalan üst sınırlarla eşik aşılamıyorsa puanlama kesilir.
+        Puanlama istatistikleri çağrıya ait `istatistik` sözlüğüne yazılır (paylaşılan örnekte tutulmaz).
+        """
+        k1, b = self.k1, self.b
+        listeler.sort(key=lambda l: l["ust"])
+        onek = np.cumsum([l["ust"] for l in listeler]).tolist()
+        heap = []  # (skor, doc_id) min-heap
+        esik = 0.0
+        ilk_esas = 0  # listeler[ilk_esas:] esas listeler
+        puanlanan = 0
+
+        def katki(liste, j, doc_id):
+            tf = liste["tfs"][j]
+            return liste["idf"] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * uzunluklar[doc_id] / avgdl))
+
+        while True:
+            esaslar = [l for l in listeler[ilk_esas:] if l["i"] < len(l["doc_ids"])]
+            if not esaslar:
+                break
+            doc_id = int(min(l["doc_ids"][l["i"]] for l in esaslar))
+            skor = 0.0
+            for l in esaslar:
+                if l["doc_ids"][l["i"]] == doc_id:
+                    skor += katki(l, l["i"], doc_id)
+                    l["i"] += 1
+            # Esas olmayan listeler: büyük üst sınırdan küçüğe, eşik aşılamıyorsa dur
+            for j in range(ilk_esas - 1, -1, -1):
+                if skor + onek[j] <= esik:
+                    break
+                l = listeler[j]
+                pos = int(np.searchsorted(l["doc_ids"], doc_id, side="left"))
+                l["i"] = pos
+                if pos < len(l["doc_ids"]) and l["doc_ids"][pos] == doc_id:
+                    skor += katki(l, pos, doc_id)
+            puanlanan += 1
+            if len(heap) < k:
+                heapq.heappush(heap, (skor, doc_id))
+            elif skor > heap[0][0]:
+                heapq.heapreplace(heap, (skor, doc_id))
+            if len(heap) == k and heap[0][0] > esik:
+                esik = heap[0][0]
+                while ilk_esas < len(listeler) and onek[ilk_esas] <= esik:
+                    ilk_esas += 1
+        istatistik.update(puanlanan=puanlanan, aday_ust_sinir=sum(len(l["doc_ids"]) for l in listeler))
+        return sorted(heap, key=lambda x: (-x[0], x[1]))
+
+    def konumlar(self, ad, terimler):
+        """
+        📌 Dokümanda verilen terimlerin token konumlarını döndürür (ifade arama / vurgulama için).
+
+        Returns:
+            dict: {terim: [konumlar]}
+        """
+        terimler = list(dict.fromkeys(t.lower() for t in terimler))
+        if not terimler:
+            return {}
+        with self._lock:
+            rows = self._baglanti().execute(
+                "SELECT t.term, p.konumlar FROM positions p JOIN terms t ON t.term_id = p.term_id "
+                f"JOIN docs d ON d.doc_id = p.doc_id WHERE d.ad = ? AND t.term IN ({','.join('?' * len(terimler))})",
+                [ad] + terimler
+            ).fetchall()
+        return {term: np.frombuffer(blob, dtype=np.uint32).tolist() for term, blob in rows}
+
+    def pasaj(self, ad, query, isaret=HIGHLIGHT):
+        """
+        📌 **Dokümanın sorguya en iyi uyan pasajını vurgulanmış olarak döndürür.**
+
+        - Pasaj skoru: Σ idf(t) · log(1 + pasajdaki t sayısı); terim konumları `positions` tablosundan gelir.
+        - Dosyadan yalnızca seçilen pasajın bayt aralığı okunur. Dosya indekslendiğinden beri değişmişse
+          (veya pasaj ofsetleri yoksa) doküman önce yeniden indekslenir.
+
+        Args:
+            ad (str): Doküman adı.
+            query (str): Sorgu metni.
+            isaret (tuple): Vurgulama işaretleri.
+
+        Returns:
+            dict veya None: {"metin", "baslangic", "bitis", "eslesen_terimler"} (bayt ofsetleri);
+                            doküman veya dosya bulunamazsa None.
+        """
+        terimler = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            conn = self._baglanti()
+            satir = self._pasaj_satiri(conn, ad)
+            yol = Path(satir[1]) if satir and satir[1] else self.txt_dir / f"{ad}{CLEAN_SUFFIX}"
+            try:
+                stat = os.stat(yol)
+            except OSError:
+                return None
+            if satir is None or satir[4] is None or (satir[2], satir[3]) != (stat.st_size, stat.st_mtime_ns):
+                with conn:
+                    self._dosya_ekle(conn, yol, ad)
+                satir = self._pasaj_satiri(conn, ad)
+            doc_id, _, _, _, boy, ofset_blob = satir
+            n = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            rows = conn.execute(
+                "SELECT t.term, t.df, p.konumlar FROM positions p JOIN terms t ON t.term_id = p.term_id "
+                f"WHERE p.doc_id = ? AND t.term IN ({','.join('?' * len(terimler))})", [doc_id] + terimler
+            ).fetchall() if terimler else []
+
+        ofsetler = np.frombuffer(ofset_blob, dtype=np.uint32)
+        pasaj_sayisi = len(ofsetler) - 1
+        skorlar = np.zeros(pasaj_sayisi)
+        for _, df, blob in rows:
+            sayim = np.bincount(np.frombuffer(blob, dtype=np.uint32) // boy, minlength=pasaj_sayisi)[:pasaj_sayisi]
+            skorlar += math.log(1 + (n - df + 0.5) / (df + 0.5)) * np.log1p(sayim)
+        en_iyi = int(np.argmax(skorlar)) if pasaj_sayisi else 0
+        baslangic, bitis = (int(ofsetler[en_iyi]), int(ofsetler[en_iyi + 1])) if pasaj_sayisi else (0, 0)
+        with open(yol, "rb") as f:
+            f.seek(baslangic)
+            metin = " ".join(f.read(bitis - baslangic).decode("utf-8", errors="replace").split())
+        metin = vurgula(metin, [row[0] for row in rows], isaret)
+        if en_iyi > 0:
+            metin = "…" + metin
+        if en_iyi < pasaj_sayisi - 1:
+            metin += "…"
+        return {"metin": metin, "baslangic": baslangic, "bitis": bitis, "eslesen_terimler": [row[0] for row in rows]}
+
+    def _pasaj_satiri(self, conn, ad):
+        return conn.execute(
+            "SELECT doc_id, yol, size, mtime_ns, pasaj_boyu, pasaj_ofsetleri FROM docs WHERE ad = ?", (ad,)
+        ).fetchone()
+
+
+bm25_index = BM25Index()
@@ -0,0 +1,235 @@
+import time
+import queue
+import atexit
+import threading
+from config_module import config
+
+_KAPAT = object()    # Yazıcı thread'ine "bitir" sinyali
+_BOSALT = object()   # Tampon boşaltma isteği etiketi: kuyruğa (_BOSALT, olay) olarak konur
+
+
+class YazmaBileti:
+    """
+    📌 Bir `ekle` çağrısının (tek dosyanın chunk'ları) yazım durumunu izler.
+
+    - Tüm id'ler yazıldığında veya kalıcı olarak başarısız olduğunda `tamamlandi` olur ve
+      (verildiyse) `geri_cagri(bilet)` yazıcı thread'inde çağrılır.
+    - `basarisiz_ids` yazılamayan chunk id'lerini tutar; `basarili` yalnızca hepsi yazıldıysa True'dur.
+    """
+
+    def __init__(self, ids, geri_cagri=None):
+        self.ids = list(ids)
+        self.basarisiz_ids = []
+        self.geri_cagri = geri_cagri
+        self._bekleyen = len(self.ids)
+        self._olay = threading.Event()
+        if not self._bekleyen:
+            self._bitir()
+
+    @property
+    def tamamlandi(self):
+        return self._olay.is_set()
+
+    @property
+    def basarili(self):
+        return self.tamamlandi and not self.basarisiz_ids
+
+    def bekle(self, timeout=None):
+        """
+        📌 Bilet tamamlanana kadar bekler.
+
+        Returns:
+            bool: Süre dolmadan tamamlandıysa True.
+        """
+        return self._olay.wait(timeout)
+
+    def _isaretle(self, chunk_id, basarili):
+        # Yalnızca yazıcı thread'i çağırır
+        if not basarili:
+            self.basarisiz_ids.append(chunk_id)
+        self._bekleyen -= 1
+        if self._bekleyen == 0:
+            self._bitir()
+
+    def _bitir(self):
+        self._olay.set()
+        if self.geri_cagri is not None:
+            try:
+                self.geri_cagri(self)
+            except Exception as e:
+                config.logger.error(f"❌ Yazma bileti geri çağrısı başarısız: {e}", exc_info=True)
+
+
+class ChromaBatchWriter:
+    """
+    📌 **ChromaDB için tamponlu, tek thread'li toplu yazıcı.**
+
+    - `ekle` ile gelen chunk id/embedding/doküman/metadata kayıtları dosyalar arasında biriktirilir.
+    - Tampon `batch_size` kadar dolduğunda veya `flush_interval` saniye boyunca yeni kayıt gelmediğinde
+      `collection.upsert` ile yazılır; tek çağrı istemcinin `get_max_batch_size()` sınırını aşmaz.
+    - Koleksiyona yalnızca yazıcı thread'i erişir; pipeline işçileri veya süreç havuzu SQLite tabanlı
+      Chroma istemcisini hiçbir zaman eşzamanlı açmaz.
+    - Başarısız `upsert` artan beklemelerle `retries` kez yeniden denenir; yine başarısızsa dilim ikiye
+      bölünerek hatalı kayıtlar ayıklanır. Yalnızca yazılamayan chunk'lar başarısız sayılır ve
+      `ekle`'nin döndürdüğü `YazmaBileti` üzerinden bildirilir.
+
+    Örnek:
+        writer = ChromaBatchWriter(collection, client=chroma_client)
+        bilet = writer.ekle(ids, embeddings, documents, metadatas)
+        writer.bosalt()
+        bilet.basarili, bilet.basarisiz_ids
+    """
+
+    def __init__(self, collection, client=None, batch_size=None, flush_interval=None, queue_size=None,
+                 retries=None, backoff=None):
+        self.collection = collection
+        self.batch_size = batch_size or config.CHROMA_BATCH_SIZE
+        self.flush_interval = flush_interval or config.CHROMA_FLUSH_INTERVAL
+        self.retries = config.CHROMA_WRITE_RETRIES if retries is None else retries
+        self.backoff = config.CHROMA_RETRY_BACKOFF if backoff is None else backoff
+        max_batch = None
+        if client is not None and hasattr(client, "get_max_batch_size"):
+            try:
+                max_batch = client.get_max_batch_size()
+            except Exception as e:
+                config.logger.warning(f"⚠️ Chroma max batch boyutu okunamadı: {e}")
+        self.max_batch_size = min(self.batch_size, max_batch) if max_batch else self.batch_size
+        self._kuyruk = queue.Queue(maxsize=queue_size or config.PIPELINE_QUEUE_SIZE)
+        self._tampon = {"ids": [], "embeddings": [], "documents": [], "metadatas": [], "biletler": []}
+        self._thread = None
+        self._lock = threading.Lock()
+        self.yazilan = 0
+        self.upsert_sayisi = 0
+        self.basarisiz = 0
+        atexit.register(self.kapat)
+
+    def _baslat(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._calis, name="chroma-writer", daemon=True)
+                self._thread.start()
+
+    def ekle(self, ids, embeddings, documents=None, metadatas=None, geri_cagri=None):
+        """
+        📌 Kayıtları yazıcı kuyruğuna ekler (kuyruk doluysa bekler).
+
+        Args:
+            ids (list): Chunk kimlikleri.
+            embeddings (list): Chunk embedding vektörleri.
+            documents (list, optional): Chunk metinleri.
+            metadatas (list, optional): Chunk metadata sözlükleri.
+            geri_cagri (callable, optional): Tüm kayıtlar yazıldığında/başarısız olduğunda `YazmaBileti` ile çağrılır.
+
+        Returns:
+            YazmaBileti: Bu kayıtların yazım durumu (id listesi boşsa hemen tamamlanmış bilet).
+        """
+        bilet = YazmaBileti(ids, geri_cagri=geri_cagri)
+        if not ids:
+            return bilet
+        self._baslat()
+        self._kuyruk.put((list(ids), list(embeddings), documents, metadatas, bilet))
+        return bilet
+
+    def bosalt(self):
+        """
+        📌 Kuyruktaki ve tampondaki tüm kayıtların yazılmasını bekler.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        bitti = threading.Event()
+        self._kuyruk.put((_BOSALT, bitti))
+        bitti.wait()
+
+    def kapat(self):
+        """
+        📌 Tamponu yazar ve yazıcı thread'ini sonlandırır.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._kuyruk.put(_KAPAT)
+        self._thread.join()
+
+    def _calis(self):
+        while True:
+            try:
+                oge = self._kuyruk.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._yaz()
+                continue
+            if oge is _KAPAT:
+                self._yaz()
+                return
+            if oge[0] is _BOSALT:
+                self._yaz()
+                oge[1].set()
+                continue
+            ids, embeddings, documents, metadatas, bilet = oge
+            self._tampon["biletler"].extend([bilet] * len(ids))
+            self._tampon["ids"].extend(ids)
+            self._tampon["embeddings"].extend(embeddings)
+            self._tampon["documents"].extend(documents if documents is not None else [None] * len(ids))
+            self._tampon["metadatas"].extend(metadatas if metadatas is not None else [None] * len(ids))
+            if len(self._tampon["ids"]) >= self.batch_size:
+                self._yaz(yalnizca_tam=True)
+
+    def _yaz(self, yalnizca_tam=False):
+        """
+        📌 Tamponu `max_batch_size`'lık dilimler halinde `upsert` ile yazar (yalnızca yazıcı thread'i çağırır).
+
+        Args:
+            yalnizca_tam (bool): True ise yalnızca tam dilimler yazılır, artan kayıtlar tamponda bekler.
+        """
+        tampon = self._tampon
+        toplam = len(tampon["ids"])
+        if yalnizca_tam:
+            toplam -= toplam % self.max_batch_size
+        if not toplam:
+            return
+        self._tampon = {k: v[toplam:] for k, v in tampon.items()}
+        basarisiz = 0
+        for start in range(0, toplam, self.max_batch_size):
+            basarisiz += self._dilim_yaz(tampon, start, min(start + self.max_batch_size, toplam), self.retries)
+        self.basarisiz += basarisiz
+        config.logger.info(
+            f"💾 ChromaDB'ye {toplam - basarisiz} chunk yazıldı, {basarisiz} başarısız "
+            f"(toplam {self.yazilan}, {self.upsert_sayisi} upsert)."
+        )
+
+    def _dilim_yaz(self, tampon, bas, bit, yeniden_deneme=0):
+        """
+        📌 Tamponun [bas, bit) aralığını yazar; `yeniden_deneme` kez artan beklemeyle tekrar dener, yine
+        başarısızsa aralığı ikiye bölüp her yarıyı bir kez dener (tek kayda inildiğinde kayıt başarısız sayılır).
+        Geçici hatalar ilk denemelerle atlatılır; bölme yalnızca hatalı kayıtları ayıklamak içindir.
+        Her kaydın sonucu biletine işlenir.
+
+        Returns:
+            int: Yazılamayan kayıt sayısı.
+        """
+        kwargs = {"ids": tampon["ids"][bas:bit], "embeddings": tampon["embeddings"][bas:bit]}
+        if any(d is not None for d in tampon["documents"][bas:bit]):
+            kwargs["documents"] = tampon["documents"][bas:bit]
+        if any(m is not None for m in tampon["metadatas"][bas:bit]):
+            kwargs["metadatas"] = tampon["metadatas"][bas:bit]
+        for deneme in range(yeniden_deneme + 1):
+            try:
+                self.collection.upsert(**kwargs)
+                self.yazilan += bit - bas
+                self.upsert_sayisi += 1
+                for i in range(bas, bit):
+                    tampon["biletler"][i]._isaretle(tampon["ids"][i], True)
+                return 0
+            except Exception as e:
+                hata = e
+                if deneme < yeniden_deneme:
+                    bekleme = self.backoff * (2 ** deneme)
+                    config.logger.warning(
+                        f"⚠️ ChromaDB upsert hatası ({bit - bas} kayıt), {bekleme:.1f} sn sonra yeniden denenecek: {e}"
+                    )
+                    time.sleep(bekleme)
+        if bit - bas > 1:
+            orta = (bas + bit) // 2
+            config.logger.warning(f"⚠️ ChromaDB upsert {bit - bas} kayıtta başarısız; hatalı kayıtlar için dilim bölünüyor.")
+            return self._dilim_yaz(tampon, bas, orta) + self._dilim_yaz(tampon, orta, bit)
+        config.logger.error(f"❌ ChromaDB kaydı yazılamadı ({tampon['ids'][bas]}): {hata}")
+        tampon["biletler"][bas]._isaretle(tampon["ids"][bas], False)
+        return 1
@@ -33,6 +33,14 @@ class Config:
     # Log Dosyası
     LOG_FILE = LOG_DIR / "app.log"
 
+    # İşlem stack dosyası (eski JSON biçimi; varsa iş kuyruğuna taşınır)
+    STACK_DOSYASI = Path(os.getenv("STACK_DOSYASI", TEMP_DIR / "islem_stack.json"))
+
+    # SQLite iş kuyruğu (pending / in_progress / done / failed, kiralı işler)
+    WORK_QUEUE_PATH = Path(os.getenv("WORK_QUEUE_PATH", BASE_DIR / "processed" / "work_queue.sqlite3"))
+    WORK_QUEUE_LEASE_SECONDS = float(os.getenv("WORK_QUEUE_LEASE_SECONDS", 600))
+    WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", 3))
+
     # Loglama yapılandırması
     logging.basicConfig(
         filename=LOG_FILE,
@@ -43,12 +51,59 @@ class Config:
     logger = logging.getLogger(__name__)
 
     # PDF Metin Çıkarma Yöntemi (.env’den okunur)
-    PDF_TEXT_EXTRACTION_METHOD = os.getenv("PDF_TEXT_EXTRACTION_METHOD", "pdfplumber").lower()
+    PDF_TEXT_EXTRACTION_METHOD = os.getenv("PDF_TEXT_EXTRACTION_METHOD", "pymupdf").lower()
+
+    # Layout analizi için sayfa rasterleştirme çözünürlüğü (PubLayNet tespiti için 150 DPI çoğunlukla yeterli)
+    LAYOUT_DPI = int(os.getenv("LAYOUT_DPI", 150))
+    LAYOUT_BATCH_SIZE = int(os.getenv("LAYOUT_BATCH_SIZE", 4))  # Dedektöre birlikte verilen sayfa sayısı
+
+    # PyMuPDF sayfa kalite kontrolü (geçemeyen sayfalar pdfplumber ile yeniden çıkarılır)
+    PDF_MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", 50))
+    PDF_MAX_GARBAGE_RATIO = float(os.getenv("PDF_MAX_GARBAGE_RATIO", 0.1))
+
+    # Sayfa bazlı paralel PDF metin çıkarma ayarları
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 200))
+    PDF_PAGES_PER_SHARD = int(os.getenv("PDF_PAGES_PER_SHARD", 25))
+    PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", os.cpu_count() or 1))
+
+    # Aşamalı batch pipeline ayarları (her aşamanın işçi sayısı ayrı; kuyruklar sınırlı)
+    PIPELINE_EXTRACT_WORKERS = int(os.getenv("PIPELINE_EXTRACT_WORKERS", os.cpu_count() or 1))
+    PIPELINE_ZOTERO_WORKERS = int(os.getenv("PIPELINE_ZOTERO_WORKERS", 4))
+    PIPELINE_EMBED_WORKERS = int(os.getenv("PIPELINE_EMBED_WORKERS", 4))
+    PIPELINE_SAVE_WORKERS = int(os.getenv("PIPELINE_SAVE_WORKERS", 1))
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 8))
+    CHROMA_BATCH_SIZE = int(os.getenv("CHROMA_BATCH_SIZE", 1000))  # Tek upsert'teki en fazla chunk (istemci sınırıyla kırpılır)
+    CHROMA_FLUSH_INTERVAL = float(os.getenv("CHROMA_FLUSH_INTERVAL", 2.0))  # Boşta bekleyen tamponun yazılma süresi (sn)
+    CHROMA_WRITE_RETRIES = int(os.getenv("CHROMA_WRITE_RETRIES", 3))  # Başarısız upsert'in bölünmeden önceki deneme sayısı
+    CHROMA_RETRY_BACKOFF = float(os.getenv("CHROMA_RETRY_BACKOFF", 0.5))  # İlk bekleme (sn); her denemede iki katına çıkar
+    MANIFEST_PATH = Path(os.getenv("MANIFEST_PATH", BASE_DIR / "processed" / "manifest.sqlite3"))  # Artımlı işleme manifestosu
+    METADATA_STORE_PATH = Path(os.getenv("METADATA_STORE_PATH", BASE_DIR / "processed" / "metadata.sqlite3"))  # dosya_id anahtarlı metadata yan deposu
+    TFIDF_INDEX_DIR = Path(os.getenv("TFIDF_INDEX_DIR", BASE_DIR / "processed" / "tfidf_index"))  # Kalıcı TF-IDF indeksi (query_data)
+    TFIDF_REFRESH_INTERVAL = float(os.getenv("TFIDF_REFRESH_INTERVAL", 10))  # Temiz metin dizininin en sık taranma aralığı (sn)
+    BM25_INDEX_PATH = Path(os.getenv("BM25_INDEX_PATH", BASE_DIR / "processed" / "bm25_index.sqlite3"))  # Konumsal ters indeks
+    BM25_K1 = float(os.getenv("BM25_K1", 1.2))
+    BM25_B = float(os.getenv("BM25_B", 0.75))
+    SNIPPET_PASSAGE_TOKENS = int(os.getenv("SNIPPET_PASSAGE_TOKENS", 40))  # Arama sonucu pasajlarının token uzunluğu
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", 60))  # Reciprocal rank fusion sabiti
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", 50))  # Hibrit aramada her aşamadan alınan aday sayısı
 
     # Zotero API Ayarları
     ZOTERO_USER_ID = os.getenv("ZOTERO_USER_ID")
     ZOTERO_API_KEY = os.getenv("ZOTERO_API_KEY")
     ZOTERO_LIBRARY_TYPE = os.getenv("ZOTERO_LIBRARY_TYPE", "user")  # user veya group
+    ZOTERO_API_BASE_URL = os.getenv("ZOTERO_API_BASE_URL", "https://api.zotero.org").rstrip("/")
+    ZOTERO_TIMEOUT = float(os.getenv("ZOTERO_TIMEOUT", 30))
+    ZOTERO_MAX_CONCURRENCY = int(os.getenv("ZOTERO_MAX_CONCURRENCY", 8))  # Eşzamanlı istek / havuz bağlantı sınırı
+
+    # Zotero kütüphanesinin yerel SQLite aynası (artımlı `since=` senkronizasyonu)
+    ZOTERO_MIRROR_ENABLED = os.getenv("ZOTERO_MIRROR_ENABLED", "true").lower() == "true"
+    ZOTERO_MIRROR_PATH = Path(os.getenv("ZOTERO_MIRROR_PATH", BASE_DIR / "processed" / "zotero_mirror.sqlite3"))
+    ZOTERO_MIRROR_SYNC_INTERVAL = float(os.getenv("ZOTERO_MIRROR_SYNC_INTERVAL", 3600))  # saniye
+
+    # Metadata arka ucu: "api" (Zotero Web API + ayna) veya "local" (zotero.sqlite, salt okunur)
+    ZOTERO_BACKEND = os.getenv("ZOTERO_BACKEND", "api").lower()
+    ZOTERO_SQLITE_PATH = Path(os.getenv("ZOTERO_SQLITE_PATH", STORAGE_DIR.parent / "zotero.sqlite"))
+    ZOTERO_ATTACHMENT_INDEX_PATH = Path(os.getenv("ZOTERO_ATTACHMENT_INDEX_PATH", BASE_DIR / "processed" / "zotero_attachment_index.json"))
 
     # OpenAI API ve Embedding Ayarları
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -63,6 +118,15 @@ class Config:
         "universal_sentence_encoder": os.getenv("USE_MODEL", "universal-sentence-encoder"),
     }
 
+    # Alternatif model kayıt defteri ayarları
+    MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", 4096))
+    PRELOAD_MODELS = [m.strip() for m in os.getenv("PRELOAD_MODELS", "").split(",") if m.strip()]
+
+    # Kalıcı embedding cache ayarları (model_key + normalize edilmiş chunk sha256)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", EMBEDDINGS_DIR / "embedding_cache.sqlite3"))
+    EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", 2048))
+
     # Chunk ve Büyük Dosya İşleme Ayarları
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 256))
     LARGE_FILE_SPLIT_SIZE = int(os.getenv("LARGE_FILE_SPLIT_SIZE", 10000))
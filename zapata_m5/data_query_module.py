@@ -1,26 +1,236 @@
 import os
-from pathlib import Path
-import glob
 import json
+import time
+import threading
+from pathlib import Path
+from collections import Counter
 import numpy as np
+from scipy import sparse
 from config_module import config
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import CountVectorizer
+from bm25_index_module import bm25_index, CLEAN_SUFFIX
+
+MIN_SIMILARITY = 0.1  # Bu skorun altındaki sonuçlar döndürülmez
+
+
+class TfidfIndex:
+    """
+    📌 **Temiz metinler için kalıcı, artımlı güncellenen TF-IDF indeksi.**
+
+    - Diskte saklananlar: `vocab.json` (terim → sütun), `df.npy` (doküman frekansı),
+      `tf.npz` (doküman × terim ham sayım CSR matrisi), `docs.json` (dosya adı, boyut, mtime).
+    - `guncelle` yalnızca yeni/değişmiş/silinmiş dosyaları işler; sözlük yeni terimlerle büyür,
+      mevcut satırlar yeniden okunmaz.
+    - IDF ve L2 normalize TF-IDF matrisi (CSC) indeks değiştiğinde bir kez hesaplanıp bellekte tutulur;
+      sorgu yalnızca sorgu terimlerinin sütunlarıyla tek bir seyrek matris-vektör çarpımı yapar.
+    - Tokenizasyon, `TfidfVectorizer` varsayılanlarıyla aynıdır (küçük harf, `\\b\\w\\w+\\b`).
+
+    Örnek:
+        tfidf_index.guncelle()
+        tfidf_index.sorgula("protein folding", k=10)
+    """
+
+    def __init__(self, index_dir=None, txt_dir=None):
+        self.index_dir = Path(index_dir or config.TFIDF_INDEX_DIR)
+        self.txt_dir = Path(txt_dir or Path(config.CLEAN_TEXT_DIR) / "txt")
+        self.analyzer = CountVectorizer().build_analyzer()
+        self._lock = threading.RLock()
+        self._son_kontrol = 0.0
+        self._yuklendi = False
+        self.vocab = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        self.tf = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.docs = []
+        self._X = None
+        self._idf = None
+
+    def _yukle(self):
+        if self._yuklendi:
+            return
+        try:
+            with open(self.index_dir / "vocab.json", "r", encoding="utf-8") as f:
+                self.vocab = json.load(f)
+            with open(self.index_dir / "docs.json", "r", encoding="utf-8") as f:
+                # Eski indekslerdeki "snippet" alanı atılır; pasajlar sorgu anında dosyadan okunur
+                self.docs = [{k: v for k, v in d.items() if k != "snippet"} for d in json.load(f)]
+            self.df = np.load(self.index_dir / "df.npy")
+            self.tf = sparse.load_npz(self.index_dir / "tf.npz").tocsr()
+            config.logger.info(f"📂 TF-IDF indeksi yüklendi: {len(self.docs)} doküman, {len(self.vocab)} terim.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            config.logger.warning(f"⚠️ TF-IDF indeksi okunamadı, yeniden oluşturulacak: {e}")
+            self.vocab, self.docs = {}, []
+            self.df = np.zeros(0, dtype=np.int64)
+            self.tf = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._yuklendi = True
+
+    def _kaydet(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+        def _yaz(ad, yazici):
+            # Yarım yazılmış indeks okunmasın diye önce geçici dosyaya yazılır
+            gecici = self.index_dir / f"{ad}.tmp"
+            with open(gecici, "wb") as f:
+                yazici(f)
+            os.replace(gecici, self.index_dir / ad)
+
+        _yaz("tf.npz", lambda f: sparse.save_npz(f, self.tf))
+        _yaz("df.npy", lambda f: np.save(f, self.df))
+        _yaz("vocab.json", lambda f: f.write(json.dumps(self.vocab, ensure_ascii=False).encode("utf-8")))
+        _yaz("docs.json", lambda f: f.write(json.dumps(self.docs, ensure_ascii=False).encode("utf-8")))
+
+    def guncelle(self, zorla=False):
+        """
+        📌 Dizindeki yeni/değişmiş dosyaları indekse ekler, silinenleri çıkarır.
+        Dizin taraması en fazla `TFIDF_REFRESH_INTERVAL` saniyede bir yapılır (`zorla=True` hariç).
+
+        Returns:
+            int: Eklenen veya güncellenen doküman sayısı.
+        """
+        with self._lock:
+            self._yukle()
+            if not zorla and time.time() - self._son_kontrol < config.TFIDF_REFRESH_INTERVAL:
+                return 0
+            self._son_kontrol = time.time()
+            if not self.txt_dir.exists():
+                return 0
+
+            mevcut = {}
+            with os.scandir(self.txt_dir) as girdiler:
+                for girdi in girdiler:
+                    if girdi.is_file() and girdi.name.endswith(".txt"):
+                        stat = girdi.stat()
+                        mevcut[girdi.name] = (stat.st_size, stat.st_mtime_ns)
+            tut = [i for i, d in enumerate(self.docs) if mevcut.get(d["file"]) == (d["size"], d["mtime_ns"])]
+            bilinen = {self.docs[i]["file"] for i in tut}
+            yeni = sorted(ad for ad in mevcut if ad not in bilinen)
+            if len(tut) == len(self.docs) and not yeni:
+                return 0
+
+            # Silinen/değişen satırlar çıkarılır ve doküman frekanslarından düşülür
+            if len(tut) < len(self.docs):
+                cikan = np.setdiff1d(np.arange(len(self.docs)), tut)
+                self.df[:self.tf.shape[1]] -= np.asarray((self.tf[cikan] > 0).sum(axis=0)).ravel()
+                self.tf = self.tf[tut]
+                self.docs = [self.docs[i] for i in tut]
+
+            satirlar, sutunlar, degerler, eklenen = [], [], [], []
+            for ad in yeni:
+                try:
+                    with open(self.txt_dir / ad, "r", encoding="utf-8") as f:
+                        content = f.read()
+                except Exception as e:
+                    config.logger.error(f"Dosya okunamadı: {self.txt_dir / ad} Hata: {e}")
+                    continue
+                sayimlar = Counter(self.analyzer(content))
+                for terim in sayimlar:
+                    if terim not in self.vocab:
+                        self.vocab[terim] = len(self.vocab)
+                satir = len(eklenen)
+                for terim, n in sayimlar.items():
+                    satirlar.append(satir)
+                    sutunlar.append(self.vocab[terim])
+                    degerler.append(n)
+                size, mtime_ns = mevcut[ad]
+                eklenen.append({"file": ad, "size": size, "mtime_ns": mtime_ns})
+
+            n_terim = len(self.vocab)
+            yeni_tf = sparse.csr_matrix((degerler, (satirlar, sutunlar)), shape=(len(eklenen), n_terim), dtype=np.float32)
+            self.df = np.concatenate([self.df, np.zeros(n_terim - len(self.df), dtype=np.int64)])
+            self.df += np.asarray((yeni_tf > 0).sum(axis=0)).ravel()
+            self.tf.resize((self.tf.shape[0], n_terim))
+            self.tf = sparse.vstack([self.tf, yeni_tf], format="csr")
+            self.docs.extend(eklenen)
+            self._X = None
+            self._kaydet()
+            config.logger.info(f"🔄 TF-IDF indeksi güncellendi: +{len(eklenen)} doküman (toplam {len(self.docs)}, {n_terim} terim).")
+            return len(eklenen)
+
+    def _matris(self):
+        if self._X is None:
+            n = len(self.docs)
+            # TfidfVectorizer(smooth_idf=True) ile aynı formül
+            self._idf = (np.log((1 + n) / (1 + self.df)) + 1).astype(np.float32)
+            X = self.tf.multiply(self._idf).tocsr()
+            normlar = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            normlar[normlar == 0] = 1.0
+            # Sorgu yalnızca sorgu terimlerinin sütunlarını okur; CSC'de sütun seçimi korpus boyutundan bağımsızdır
+            self._X = sparse.diags(1.0 / normlar).dot(X).tocsc()
+        return self._X
+
+    def sorgula(self, query, k=None, min_skor=MIN_SIMILARITY):
+        """
+        📌 Sorguya en benzer dokümanları cosine similarity ile sıralar.
+
+        Args:
+            query (str): Sorgu metni.
+            k (int, optional): En fazla kaç sonuç döndürüleceği (None: eşiği geçen tüm sonuçlar).
+            min_skor (float): En düşük benzerlik skoru.
+
+        Returns:
+            list: [{"file": ..., "similarity": ...}]
+        """
+        with self._lock:
+            self._yukle()
+            if not self.docs:
+                return []
+            X = self._matris()
+            sayimlar = Counter(t for t in self.analyzer(query) if t in self.vocab)
+            if not sayimlar:
+                return []
+            sutunlar = np.fromiter((self.vocab[t] for t in sayimlar), dtype=np.int64, count=len(sayimlar))
+            q = np.fromiter(sayimlar.values(), dtype=np.float32, count=len(sayimlar)) * self._idf[sutunlar]
+            q /= np.linalg.norm(q)
+            skorlar = X[:, sutunlar].dot(q)
+            docs = self.docs
+
+        aday = np.flatnonzero(skorlar >= min_skor)
+        if k is not None and len(aday) > k:
+            aday = aday[np.argpartition(skorlar[aday], -k)[-k:]]
+        aday = aday[np.argsort(skorlar[aday])[::-1]]
+        return [{"file": docs[i]["file"], "similarity": round(float(skorlar[i]), 4)} for i in aday]
+
+
+def snippet_al(dosya, query):
+    """
+    📌 Sonuç dosyası için sorguya en iyi uyan, terimleri vurgulanmış pasajı döndürür.
+
+    Pasaj sınırları BM25 indeksinde saklanan bayt ofsetlerinden seçilir ve dosyadan yalnızca o aralık okunur;
+    böylece sorgu başına bellek kullanımı korpus boyutuna değil sonuç sayısına bağlıdır.
+
+    Args:
+        dosya (str): Temiz metin dosyasının adı (ör. "makale.clean.txt").
+        query (str): Sorgu metni.
+
+    Returns:
+        str: Pasaj metni; pasaj bulunamazsa boş string.
+    """
+    ad = dosya[:-len(CLEAN_SUFFIX)] if dosya.endswith(CLEAN_SUFFIX) else Path(dosya).stem
+    try:
+        pasaj = bm25_index.pasaj(ad, query)
+    except Exception as e:
+        config.logger.error(f"Pasaj okunamadı ({dosya}): {e}")
+        return ""
+    return pasaj["metin"] if pasaj else ""
+
+
+tfidf_index = TfidfIndex()
+
 
 def query_data(query_params):
     """
     📌 Gelişmiş veri sorgulama fonksiyonu.
     
-    Bu fonksiyon, config.CLEAN_TEXT_DIR / "txt" dizininde bulunan tüm temiz metin dosyalarını
-    tarayarak, kullanıcı tarafından girilen sorgu parametrelerine göre cosine similarity hesaplaması yapar.
+    Bu fonksiyon, config.CLEAN_TEXT_DIR / "txt" dizinindeki temiz metin dosyaları için tutulan kalıcı
+    TF-IDF indeksinde (`TfidfIndex`) sorgu parametrelerine göre cosine similarity hesaplaması yapar.
     
     İş Akışı:
-      1. Belirtilen dizindeki tüm .txt dosyaları okunur.
-      2. Her dosyadan elde edilen metinler, dosya adı ile birlikte bir corpus oluşturur.
-      3. TfidfVectorizer kullanılarak metinler vektörleştirilir.
-      4. Kullanıcının sorgusu da aynı şekilde vektörleştirilir.
-      5. Cosine similarity hesaplanarak en yüksek skorlu sonuçlar sıralanır.
-      6. Her sonuç için dosya adı, benzerlik skoru ve ilk 200 karakterlik bir özet (snippet) oluşturulur.
+      1. İndeks diskten (ilk çağrıda) yüklenir; yeni/değişmiş dosyalar artımlı olarak eklenir.
+      2. Kullanıcının sorgusu indeks sözlüğüyle vektörleştirilir (korpus yeniden okunmaz/fit edilmez).
+      3. Cosine similarity tek seyrek matris-vektör çarpımıyla hesaplanır ve sonuçlar sıralanır.
+      4. Her sonuç için dosya adı, benzerlik skoru ve sorgu terimlerinin en yoğun geçtiği, terimleri vurgulanmış
+         pasaj döndürülür (pasaj dosyadan bayt aralığı okunarak alınır; doküman metinleri bellekte tutulmaz).
     
     Args:
         query_params (str): Kullanıcının sorgu olarak girdiği metin.
@@ -37,81 +247,46 @@ def query_data(query_params):
               Hata durumunda {"results": []} döndürülür.
     """
     try:
-        # Clean text dosyalarının bulunduğu dizin
-        txt_dir = Path(config.CLEAN_TEXT_DIR) / "txt"
+        txt_dir = tfidf_index.txt_dir
         if not txt_dir.exists():
             config.logger.error(f"Clean text dizini bulunamadı: {txt_dir}")
             return {"results": []}
-        
-        # Tüm .txt dosyalarını topla
-        file_paths = list(txt_dir.glob("*.txt"))
-        corpus = []
-        file_names = []
-        for file_path in file_paths:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    corpus.append(content)
-                    file_names.append(file_path.name)
-            except Exception as e:
-                config.logger.error(f"Dosya okunamadı: {file_path} Hata: {e}")
-        
-        if not corpus:
+
+        tfidf_index.guncelle()
+        if not tfidf_index.docs:
             config.logger.error("Sorgulama için temiz metin dosyaları bulunamadı.")
             return {"results": []}
-        
-        # TF-IDF vektörleştirme
-        vectorizer = TfidfVectorizer(max_features=1000)
-        X = vectorizer.fit_transform(corpus)
-        
-        # Sorgu metnini vektörleştir
-        query_vec = vectorizer.transform([query_params])
-        
-        # Cosine similarity hesapla
-        similarities = cosine_similarity(X, query_vec).flatten()
-        
-        # Benzerlik skoruna göre en yüksek sonuçları sırala
-        top_indices = np.argsort(similarities)[::-1]
-        
-        results = []
-        for idx in top_indices:
-            sim_score = float(similarities[idx])
-            if sim_score < 0.1:
-                continue  # Çok düşük benzerlik, atla.
-            snippet = corpus[idx][:200].replace("\n", " ")  # İlk 200 karakter snippet olarak alınır
-            results.append({
-                "file": file_names[idx],
-                "similarity": round(sim_score, 4),
-                "snippet": snippet
-            })
-        
+
+        results = tfidf_index.sorgula(query_params)
+        for result in results:
+            result["snippet"] = snippet_al(result["file"], query_params)
         config.logger.info(f"Veri sorgulama tamamlandı, {len(results)} sonuç bulundu.")
         return {"results": results}
     except Exception as e:
         config.logger.error(f"Veri sorgulama sırasında hata: {e}", exc_info=True)
         return {"results": []}
 
-Aşağıda, tartışmalarımız ve güncellemeler doğrultusunda oluşturulmuş, 
-final versiyonu olan **`data_query_module.py`** modülünü bulabilirsiniz.
-Bu modül, "clean text" dosyalarının (TXT formatında) bulunduğu dizinde arama yaparak, 
-kullanıcı tarafından girilen sorgu parametrelerine göre benzerlik analizi gerçekleştiriyor.
-
-İş akışı şu şekildedir:
-
-1. **Veri Toplama:**  
-   Belirtilen (config üzerinden ayarlanan) "clean texts" dizininde bulunan tüm TXT dosyaları okunur.  
-2. **Vektörleştirme:**  
-   Tüm dosyalardan elde edilen metinler, TF-IDF yöntemiyle vektörleştirilir.  
-3. **Sorgu İşlemi:**  
-   Kullanıcı sorgusu da aynı TF-IDF modeli kullanılarak vektörleştirilir ve cosine similarity hesaplanır.  
-4. **Sonuçların Sıralanması:**  
-   Hesaplanan benzerlik skorlarına göre sonuçlar sıralanır.  
-5. **Özetleme:**  
-   Her dosyadan, ilk 200 karakterlik bir özet (snippet) alınarak sonuçlara eklenir.  
-6. **Raporlama:**  
-   Sonuçlar bir sözlük halinde döndürülür ve ilgili işlemler loglanır.
-
-Aşağıda final kodu bulabilirsiniz:
+# Aşağıda, tartışmalarımız ve güncellemeler doğrultusunda oluşturulmuş, 
+# final versiyonu olan **`data_query_module.py`** modülünü bulabilirsiniz.
+# Bu modül, "clean text" dosyalarının (TXT formatında) bulunduğu dizinde arama yaparak, 
+# kullanıcı tarafından girilen sorgu parametrelerine göre benzerlik analizi gerçekleştiriyor.
+
+# İş akışı şu şekildedir:
+
+# 1. **Veri Toplama:**  
+#    Belirtilen (config üzerinden ayarlanan) "clean texts" dizininde bulunan tüm TXT dosyaları okunur.  
+# 2. **Vektörleştirme:**  
+#    Tüm dosyalardan elde edilen metinler, TF-IDF yöntemiyle vektörleştirilir.  
+# 3. **Sorgu İşlemi:**  
+#    Kullanıcı sorgusu da aynı TF-IDF modeli kullanılarak vektörleştirilir ve cosine similarity hesaplanır.  
+# 4. **Sonuçların Sıralanması:**  
+#    Hesaplanan benzerlik skorlarına göre sonuçlar sıralanır.  
+# 5. **Özetleme:**  
+#    Her dosyadan, ilk 200 karakterlik bir özet (snippet) alınarak sonuçlara eklenir.  
+# 6. **Raporlama:**  
+#    Sonuçlar bir sözlük halinde döndürülür ve ilgili işlemler loglanır.
+
+# Aşağıda final kodu bulabilirsiniz:
 
 # ### Açıklamalar
 
@@ -0,0 +1,209 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from config_module import config
+
+
+def normalize_chunk(text):
+    """
+    📌 Cache anahtarı için metni normalize eder (Unicode boşluklar tek boşluğa indirgenir, kenarlar kırpılır).
+
+    Args:
+        text (str): Normalize edilecek metin.
+
+    Returns:
+        str: Normalize edilmiş metin.
+    """
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def chunk_hash(text):
+    """
+    📌 Normalize edilmiş metnin sha256 özetini döndürür.
+
+    Args:
+        text (str): Metin parçası.
+
+    Returns:
+        str: Hex formatında sha256 özeti.
+    """
+    return hashlib.sha256(normalize_chunk(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    📌 (model_key, sha256(normalize_chunk)) anahtarlı, SQLite tabanlı kalıcı embedding cache'i.
+
+    - Vektörler float32 blob olarak saklanır.
+    - Toplam boyut `max_mb` sınırını aşarsa en eski erişilen (LRU) kayıtlar silinir.
+    - hit/miss sayaçları `stats()` ile raporlanır.
+    - Bağlantı süreç (pid) başına açılır; WAL modu sayesinde birden fazla süreç aynı dosyayı kullanabilir.
+    """
+
+    EVICTION_CHECK_INTERVAL = 256  # Kaç yazmada bir boyut kontrolü yapılacağı
+
+    def __init__(self, db_path=None, max_mb=None, enabled=None):
+        self.db_path = str(db_path or config.EMBEDDING_CACHE_PATH)
+        self.max_bytes = int((max_mb if max_mb is not None else config.EMBEDDING_CACHE_MAX_MB) * 1024 ** 2)
+        self.enabled = config.EMBEDDING_CACHE_ENABLED if enabled is None else enabled
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _baglanti(self):
+        """
+        📌 Geçerli süreç için SQLite bağlantısını döndürür (gerekirse açar ve şemayı oluşturur).
+        """
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model_key TEXT NOT NULL,
+                    chunk_hash TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model_key, chunk_hash)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get_many(self, model_key, texts):
+        """
+        📌 Birden fazla metin için cache'ten vektör okur.
+
+        Args:
+            model_key (str): Embedding modeli anahtarı.
+            texts (list): Metin parçaları.
+
+        Returns:
+            list: Her metin için np.ndarray (float32) veya bulunamazsa None.
+        """
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+        hashes = [chunk_hash(t) for t in texts]
+        found = {}
+        try:
+            with self._lock:
+                conn = self._baglanti()
+                unique = list(set(hashes))
+                for start in range(0, len(unique), 500):
+                    part = unique[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT chunk_hash, vector FROM embeddings WHERE model_key = ? AND chunk_hash IN ({','.join('?' * len(part))})",
+                        [model_key, *part]
+                    ).fetchall()
+                    found.update(rows)
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE model_key = ? AND chunk_hash = ?",
+                        [(now, model_key, h) for h in found]
+                    )
+                    conn.commit()
+        except sqlite3.Error as e:
+            config.logger.error(f"❌ Embedding cache okuma hatası: {e}")
+            return [None] * len(texts)
+
+        results = [np.frombuffer(found[h], dtype=np.float32) if h in found else None for h in hashes]
+        hit_count = sum(1 for r in results if r is not None)
+        with self._lock:
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def get(self, model_key, text):
+        """
+        📌 Tek bir metin için cache'ten vektör okur.
+
+        Returns:
+            np.ndarray veya None: float32 vektör; cache'te yoksa None.
+        """
+        return self.get_many(model_key, [text])[0]
+
+    def put_many(self, model_key, texts, vectors):
+        """
+        📌 Metin/vektör çiftlerini cache'e yazar; gerekirse LRU temizliği tetikler.
+
+        Args:
+            model_key (str): Embedding modeli anahtarı.
+            texts (list): Metin parçaları.
+            vectors (list): Her metin için embedding vektörü (liste veya np.ndarray).
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            if vector is None:
+                continue
+            arr = np.asarray(vector, dtype=np.float32)
+            rows.append((model_key, chunk_hash(text), int(arr.shape[-1]), arr.tobytes(), now))
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._baglanti()
+                conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+                conn.commit()
+                self._writes += len(rows)
+                if self._writes >= self.EVICTION_CHECK_INTERVAL:
+                    self._writes = 0
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            config.logger.error(f"❌ Embedding cache yazma hatası: {e}")
+
+    def put(self, model_key, text, vector):
+        """
+        📌 Tek bir metin/vektör çiftini cache'e yazar.
+        """
+        self.put_many(model_key, [text], [vector])
+
+    def _evict(self, conn):
+        """
+        📌 Toplam boyut sınırı aşıldıysa en eski erişilen kayıtları siler (kilit altında çağrılır).
+        """
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        removed_bytes = 0
+        cursor = conn.execute("SELECT model_key, chunk_hash, LENGTH(vector) FROM embeddings ORDER BY last_access")
+        victims = []
+        for model_key, h, size in cursor:
+            victims.append((model_key, h))
+            removed_bytes += size
+            if removed_bytes >= excess:
+                break
+        conn.executemany("DELETE FROM embeddings WHERE model_key = ? AND chunk_hash = ?", victims)
+        conn.commit()
+        config.logger.info(f"♻️ Embedding cache LRU temizliği: {len(victims)} kayıt silindi (~{removed_bytes / 1024 ** 2:.1f} MB).")
+
+    def stats(self):
+        """
+        📌 Cache hit/miss sayaçlarını döndürür.
+
+        Returns:
+            dict: {"hits": ..., "misses": ..., "hit_rate": ...}
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+embedding_cache = EmbeddingCache()
@@ -4,11 +4,13 @@
 
 
 import os
+import re
 import time
 import numpy as np
 from openai import OpenAI
 from config_module import config
 from robust_embedding_module import robust_embed_text
+from embedding_cache_module import embedding_cache
 
 def split_text(text, chunk_size=256, method="words"):
     """
@@ -30,9 +32,28 @@ def split_text(text, chunk_size=256, method="words"):
         words = text.split()
         return [" ".join(words[i:i + chunk_size]) for i in range(0, len(words), chunk_size)]
 
+def split_text_with_offsets(text, chunk_size=256):
+    """
+    📌 Metni `split_text` ile aynı kelime bazlı parçalara böler ve her parçanın kaynak metindeki
+    karakter aralığını da döndürür (bölüm etiketi, snippet vb. için).
+
+    Args:
+        text (str): Parçalanacak metin.
+        chunk_size (int): Her parça için maksimum kelime sayısı (varsayılan: 256).
+
+    Returns:
+        list: (parça, başlangıç, bitiş) üçlüleri; parça metni `split_text` çıktısıyla aynıdır.
+    """
+    words = list(re.finditer(r"\S+", text))
+    return [
+        (" ".join(m.group() for m in words[i:i + chunk_size]), words[i].start(), words[min(i + chunk_size, len(words)) - 1].end())
+        for i in range(0, len(words), chunk_size)
+    ]
+
 def embed_text(text, model="text-embedding-ada-002"):
     """
     📌 OpenAI API kullanarak verilen metin için embedding oluşturur.
+    Aynı (model, normalize metin) için daha önce hesaplanmış vektör varsa kalıcı cache'ten döndürülür.
     
     Args:
         text (str): Embedding oluşturulacak metin.
@@ -41,6 +62,9 @@ def embed_text(text, model="text-embedding-ada-002"):
     Returns:
         list veya None: Oluşturulan embedding vektörü (örneğin, 1536 boyutlu liste) veya hata durumunda None.
     """
+    cached = embedding_cache.get(model, text)
+    if cached is not None:
+        return cached.tolist()
     try:
         client_instance = OpenAI(api_key=config.OPENAI_API_KEY)
         response = client_instance.embeddings.create(
@@ -48,6 +72,7 @@ def embed_text(text, model="text-embedding-ada-002"):
             model=model
         )
         config.logger.info(f"✅ Embedding oluşturuldu (model: {model})")
+        embedding_cache.put(model, text, response.data[0].embedding)
         return response.data[0].embedding
     except Exception as e:
         config.logger.error(f"❌ OpenAI embedding hatası (model: {model}): {e}")
@@ -97,20 +122,37 @@ def process_large_text(text, pdf_id, chunk_size=10000):
 # ve büyük dosya işleme desteği sunuyor. Eğer başka bir geliştirme veya ekleme talebiniz varsa lütfen belirtin.
 
 import os
+import json
 import time
 import numpy as np
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from openai import OpenAI
 from sentence_transformers import SentenceTransformer
 from config_module import config
-from alternative_embedding_module import get_sentence_transformer, embed_text_with_model, get_available_models
+from alternative_embedding_module import get_sentence_transformer, embed_text_with_model, embed_texts_with_model, get_available_models
+from embedding_cache_module import embedding_cache
 
 # Varsayılan ayarlar
 DEFAULT_MODEL_PRIORITY = ["contriever_large", "specter_large", "all_mpnet", "paraphrase_mpnet"]
-OPENAI_MODEL = "text-embedding-ada-002"
+OPENAI_MODEL = config.EMBEDDING_MODEL  # Ingest ve sorgu modeli; manifestodaki embedding parmak izi de bu ayardan türetilir
 MAX_RETRIES = 3
 BACKOFF_FACTOR = 1.5
 RATE_LIMIT_DELAY = 1  # API rate limit koruması için sabit gecikme
+LOCAL_BATCH_SIZE = 32  # Yerel modellerde model.encode iç batch boyutu
+BATCH_MAX_INPUTS = 512  # Tek bir OpenAI isteğine konulacak en fazla chunk sayısı (API sınırı: 2048)
+BATCH_MAX_TOKENS = 100000  # Tek bir OpenAI isteğindeki tahmini toplam token sınırı (API sınırı: 300k)
+
+
+def tahmini_token_sayisi(text):
+    """
+    📌 Metnin token sayısını kaba olarak tahmin eder (~4 karakter = 1 token).
+
+    Args:
+        text (str): Token sayısı tahmin edilecek metin.
+
+    Returns:
+        int: Tahmini token sayısı (en az 1).
+    """
+    return max(1, len(text) // 4)
 
 class EmbeddingManager:
     """
@@ -163,13 +205,19 @@ class EmbeddingManager:
         if model_priority is None:
             model_priority = self.model_priority
 
+        # Kalıcı cache yalnızca çağrılmak üzere olan model için okunur; böylece OpenAI sağlıklıyken
+        # yedek modelin (farklı boyutlu) eski bir vektörü dönmez.
         # Öncelikle OpenAI API ile embedding oluşturmaya çalış
         if OPENAI_MODEL not in self.circuit_breaker or not self.circuit_breaker[OPENAI_MODEL]:
+            cached = embedding_cache.get(OPENAI_MODEL, text)
+            if cached is not None:
+                return {"embedding": cached.tolist(), "model": OPENAI_MODEL}
             try:
                 response = self.openai_client.embeddings.create(
                     input=text,
                     model=OPENAI_MODEL
                 )
+                embedding_cache.put(OPENAI_MODEL, text, response.data[0].embedding)
                 return {"embedding": response.data[0].embedding, "model": OPENAI_MODEL}
             except Exception as e:
                 config.logger.warning(f"⚠️ OpenAI modeli başarısız ({OPENAI_MODEL}), alternatif modellere geçiliyor. Hata: {e}")
@@ -180,10 +228,14 @@ class EmbeddingManager:
             if model_key in self.circuit_breaker and self.circuit_breaker[model_key]:
                 continue  # Circuit breaker açık olan modeller atlanır
 
+            cached = embedding_cache.get(model_key, text)
+            if cached is not None:
+                return {"embedding": cached.tolist(), "model": model_key}
             for attempt in range(1, max_retries + 1):
                 try:
                     embedding = embed_text_with_model(text, model_key)
                     if embedding:
+                        embedding_cache.put(model_key, text, embedding)
                         return {"embedding": embedding, "model": model_key}
                 except Exception as e:
                     wait_time = backoff_factor ** attempt
@@ -196,9 +248,143 @@ class EmbeddingManager:
         config.logger.critical(f"🚨 Embedding işlemi tamamen başarısız oldu! (PDF: {pdf_id}, Chunk: {chunk_index}/{total_chunks})")
         return {"embedding": None, "model": "failed"}
 
+    def _batchlere_ayir(self, chunks, max_inputs=BATCH_MAX_INPUTS, max_tokens=BATCH_MAX_TOKENS):
+        """
+        📌 Chunk listesini, token ve adet sınırlarını aşmayan indeks gruplarına ayırır.
+
+        Args:
+            chunks (list): Metin parçalarının listesi.
+            max_inputs (int): Bir gruptaki en fazla chunk sayısı.
+            max_tokens (int): Bir gruptaki tahmini toplam token sınırı.
+
+        Returns:
+            list: Her biri chunk indekslerinden oluşan listelerin listesi.
+        """
+        batches = []
+        current, current_tokens = [], 0
+        for i, chunk in enumerate(chunks):
+            tokens = tahmini_token_sayisi(chunk)
+            if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed_batch(self, chunks, pdf_id, max_inputs=BATCH_MAX_INPUTS, max_tokens=BATCH_MAX_TOKENS):
+        """
+        📌 Chunk listesini token sınırlı çoklu-girdi OpenAI istekleriyle embedding'e dönüştürür.
+
+        Yanıtlar `index` alanı üzerinden chunk sırasına geri eşlenir. Batch isteği başarısız olursa
+        veya yanıtta eksik indeks varsa, yalnızca o chunk'lar için `robust_embed_text` (tekil deneme
+        ve alternatif model geçişi) kullanılır.
+
+        Args:
+            chunks (list): Embedding oluşturulacak metin parçaları.
+            pdf_id (str): PDF dosya kimliği.
+            max_inputs (int): Bir istekteki en fazla chunk sayısı.
+            max_tokens (int): Bir istekteki tahmini toplam token sınırı.
+
+        Returns:
+            list: Chunk sırasıyla {"embedding": list veya None, "model": ...} sözlükleri
+                  (vektörler cache'ten, API'den veya yerel modelden gelse de float listesidir).
+        """
+        total_chunks = len(chunks)
+        results = [None] * total_chunks
+
+        # Kalıcı cache'te bulunan chunk'lar API'ye gönderilmez
+        for i, cached in enumerate(embedding_cache.get_many(OPENAI_MODEL, chunks)):
+            if cached is not None:
+                results[i] = {"embedding": cached.tolist(), "model": OPENAI_MODEL}
+        pending = [i for i, result in enumerate(results) if result is None]
+        batches = [
+            [pending[j] for j in batch]
+            for batch in self._batchlere_ayir([chunks[i] for i in pending], max_inputs, max_tokens)
+        ]
+
+        for batch_no, batch in enumerate(batches):
+            if self.circuit_breaker.get(OPENAI_MODEL):
+                break
+            if batch_no > 0:
+                time.sleep(RATE_LIMIT_DELAY)  # API rate limit koruması (istek başına)
+            try:
+                response = self.openai_client.embeddings.create(
+                    input=[chunks[i] for i in batch],
+                    model=OPENAI_MODEL
+                )
+                for item in response.data:
+                    if 0 <= item.index < len(batch):
+                        results[batch[item.index]] = {"embedding": item.embedding, "model": OPENAI_MODEL}
+                embedding_cache.put_many(
+                    OPENAI_MODEL,
+                    [chunks[i] for i in batch],
+                    [results[i]["embedding"] if results[i] else None for i in batch]
+                )
+                config.logger.info(f"✅ Batch embedding oluşturuldu: PDF {pdf_id}, {len(batch)} chunk ({batch_no + 1}/{len(batches)})")
+            except Exception as e:
+                config.logger.warning(f"⚠️ Batch embedding başarısız (PDF: {pdf_id}, Batch: {batch_no + 1}/{len(batches)}), chunk bazlı denemeye geçiliyor. Hata: {e}")
+
+        # Yalnızca başarısız olan chunk'lar için tekil fallback
+        failed = [i for i, result in enumerate(results) if result is None]
+        if failed:
+            config.logger.warning(f"⚠️ {len(failed)}/{total_chunks} chunk için tekil embedding denenecek (PDF: {pdf_id}).")
+        while failed and not self.circuit_breaker.get(OPENAI_MODEL):
+            i = failed.pop(0)
+            results[i] = self.robust_embed_text(chunks[i], pdf_id, i, total_chunks)
+
+        # OpenAI devre dışıysa kalan chunk'lar yerel modellerle toplu olarak işlenir
+        if failed:
+            self._embed_local_batch(chunks, pdf_id, failed, results)
+        config.logger.info(f"📊 Embedding cache durumu: {embedding_cache.stats()}")
+        return results
+
+    def _embed_local_batch(self, chunks, pdf_id, indices, results, model_priority=None, max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR):
+        """
+        📌 OpenAI circuit breaker açıkken, verilen chunk'ları alternatif modellerle tek `encode` çağrısında işler.
+
+        Args:
+            chunks (list): Tüm metin parçaları.
+            pdf_id (str): PDF dosya kimliği.
+            indices (list): İşlenecek chunk indeksleri.
+            results (list): Sonuçların yazılacağı liste (yerinde güncellenir).
+            model_priority (list, optional): Kullanılacak model sırası.
+            max_retries (int): Her model için en fazla deneme sayısı.
+            backoff_factor (float): Bekleme süresini artıran katsayı.
+        """
+        if model_priority is None:
+            model_priority = self.model_priority
+        for model_key in model_priority:
+            if self.circuit_breaker.get(model_key):
+                continue
+            for i, cached in zip(indices, embedding_cache.get_many(model_key, [chunks[i] for i in indices])):
+                if cached is not None:
+                    results[i] = {"embedding": cached.tolist(), "model": model_key}
+            indices = [i for i in indices if results[i] is None]
+            if not indices:
+                return
+            texts = [chunks[i] for i in indices]
+            for attempt in range(1, max_retries + 1):
+                vectors = embed_texts_with_model(texts, model_key, batch_size=LOCAL_BATCH_SIZE)
+                if vectors is not None and len(vectors) == len(texts):
+                    for i, vector in zip(indices, vectors):
+                        results[i] = {"embedding": np.asarray(vector, dtype=np.float32).tolist(), "model": model_key}
+                    embedding_cache.put_many(model_key, texts, vectors)
+                    return
+                config.logger.error(f"❌ {model_key} ile toplu embedding başarısız! ({attempt}/{max_retries})")
+                time.sleep(backoff_factor ** attempt)
+            self.circuit_breaker[model_key] = True
+
+        config.logger.critical(f"🚨 Embedding işlemi tamamen başarısız oldu! (PDF: {pdf_id}, {len(indices)} chunk)")
+        for i in indices:
+            results[i] = {"embedding": None, "model": "failed"}
+
     def process_large_text(self, text, pdf_id, chunk_size=256, method="words"):
         """
         📌 Büyük metinleri parçalara ayırarak her bir parça için embedding oluşturur.
+        Parçalar `embed_batch` ile çoklu-girdi isteklerinde gönderilir; sonuçlar parça sırasını korur.
+        OpenAI circuit breaker açıksa parçalar yerel modellerle toplu olarak işlenir.
         
         Args:
             text (str): İşlenecek büyük metin.
@@ -210,25 +396,7 @@ class EmbeddingManager:
             list: Oluşturulan embedding vektörlerinin listesi.
         """
         chunks = self.split_text(text, chunk_size, method)
-        embeddings = []
-        total_chunks = len(chunks)
-
-        with ThreadPoolExecutor() as executor:
-            futures = {
-                executor.submit(
-                    self.robust_embed_text,
-                    chunk,
-                    pdf_id,
-                    i,
-                    total_chunks
-                ): chunk for i, chunk in enumerate(chunks)
-            }
-            for future in as_completed(futures):
-                result = future.result()
-                embeddings.append(result)
-                time.sleep(RATE_LIMIT_DELAY)  # API rate limit koruması
-
-        return embeddings
+        return self.embed_batch(chunks, pdf_id)
 
     def save_embeddings(self, embeddings, output_path):
         """
@@ -240,7 +408,8 @@ class EmbeddingManager:
         """
         try:
             with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(embeddings, f, ensure_ascii=False, indent=4)
+                json.dump(embeddings, f, ensure_ascii=False, indent=4,
+                          default=lambda o: o.tolist() if isinstance(o, np.ndarray) else str(o))
             config.logger.info(f"✅ Embedding verileri başarıyla kaydedildi: {output_path}")
         except Exception as e:
             config.logger.error(f"❌ Embedding verileri kaydedilemedi: {e}")
@@ -261,8 +430,12 @@ class EmbeddingManager:
 # Birden Fazla Model Desteği:
 # alternative_embedding_module.py'den gelen alternatif modeller desteklenir.
 # Model sırası (model_priority) değiştirilebilir.
+# Batch Embedding:
+# embed_batch, chunk'ları token sınırlı çoklu-girdi isteklerinde gönderir; yalnızca başarısız chunk'lar tekil fallback'e düşer.
+# Kalıcı Embedding Cache:
+# (model, sha256(normalize chunk)) anahtarlı SQLite cache'i; aynı metin tekrar embedding'e gönderilmez.
 # API Rate Limit Koruması:
-# Sabit time.sleep(1) ile API rate limit koruması sağlanır.
+# Her batch isteği arasında sabit RATE_LIMIT_DELAY beklemesi uygulanır.
 # Loglama ve Hata Yönetimi:
 # Güçlü loglama sistemi ile tüm işlemler izlenir.
 # Hatalar detaylı olarak loglanır.
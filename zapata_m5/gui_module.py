@@ -8,13 +8,17 @@ from citation_mapping_module import load_citation_mapping
 from embedding_module import embed_text  # Temel embedding oluşturma (arama için kullanılabilir)
 from clustering_module import perform_clustering  # Kümeleme analizi fonksiyonu
 from fine_tuning_module import train_custom_model  # Fine-tuning model eğitimi
-from data_query_module import query_data  # Gelişmiş veri sorgulama fonksiyonu
+from vector_search_module import VectorSearch  # pdf_embeddings üzerinde en yakın komşu araması
+from hybrid_search_module import HybridSearch  # BM25 + vektör araması, RRF ile birleştirme
 from config_module import config
 
 class AnaArayuz(ctk.CTk):
     def __init__(self, islem_yoneticisi):
         super().__init__()
         self.islem_yoneticisi = islem_yoneticisi
+        # Arama, işlem yöneticisinin açtığı koleksiyonu kullanır (ikinci bir Chroma istemcisi açılmaz)
+        self.vektor_arama = VectorSearch(collection=islem_yoneticisi.koleksiyon, client=islem_yoneticisi.chroma_client)
+        self.hibrit_arama = HybridSearch(vector=self.vektor_arama)
         self.title("📑 Zotero Entegre PDF İşleyici")
         self.geometry("1200x800")
         self._arayuzu_hazirla()
@@ -116,18 +120,18 @@ class AnaArayuz(ctk.CTk):
 
     def _embedding_arama(self):
         """
-        Kullanıcının girdiği metinle en yakın embeddingleri arar.
+        Kullanıcının girdiği metinle en yakın chunk'ları `pdf_embeddings` koleksiyonunda arar.
         """
         query = self._kullanici_girdisi_al("Embedding Arama", "Aranacak metni girin:")
         if query:
-            # search_embedding fonksiyonu, embedding modülünden veya alternatif embedding modülünden çağrılabilir.
-            # Örneğin: search_embedding(query) şeklinde.
             try:
-                from alternative_embedding_module import get_available_models, embed_text_with_model
-                # Örnek: ilk model ile dene, gerçek uygulamada daha gelişmiş bir arama algoritması kullanılabilir.
-                model_list = get_available_models()
-                embedding = embed_text_with_model(query, model_list[0])
-                result_text = f"Arama sonucu (Model: {model_list[0]}): {embedding[:10]} ... (embedding vektörü)"
+                sonuclar = self.vektor_arama.search(query, k=10)
+                satirlar = [
+                    f"{s['sira']}. {s['dosya']} [{s.get('bolum') or '-'}] chunk {s['chunk_index']} "
+                    f"(mesafe: {s['mesafe']:.4f})\n   {(s['metin'] or '')[:200]}"
+                    for s in sonuclar
+                ]
+                result_text = "\n".join(satirlar) if satirlar else "Sonuç bulunamadı."
             except Exception as e:
                 result_text = f"Embedding arama hatası: {e}"
             self._sonuc_goster("🔍 Embedding Arama Sonuçları", result_text)
@@ -154,12 +158,23 @@ class AnaArayuz(ctk.CTk):
 
     def _veri_sorgu(self):
         """
-        Gelişmiş veri sorgulama yapar.
+        Gelişmiş veri sorgulama yapar: birebir terim (BM25) ve anlamsal (embedding) eşleşmeleri
+        hibrit aramayla birlikte sıralar.
         """
         query_params = self._kullanici_girdisi_al("Veri Sorgulama", "Sorgu parametrelerini girin:")
         if query_params:
             try:
-                results = query_data(query_params)  # data_query_module.py'den fonksiyon
+                sonuclar = self.hibrit_arama.search(query_params, k=10)
+                satirlar = []
+                for s in sonuclar:
+                    kaynak = ", ".join(
+                        f"{ad} #{sira}" for ad, sira in (("BM25", s["bm25_sira"]), ("vektör", s["vektor_sira"])) if sira
+                    )
+                    satir = f"{s['sira']}. {s['dosya'] or s['ad']} (skor: {s['skor']:.4f}; {kaynak})"
+                    if s["pasaj"]:
+                        satir += f"\n   [{s.get('bolum') or '-'}] {s['pasaj']}"
+                    satirlar.append(satir)
+                results = "\n".join(satirlar) if satirlar else "Sonuç bulunamadı."
                 self._sonuc_goster("🔎 Veri Sorgulama Sonuçları", results)
             except Exception as e:
                 self._sonuc_goster("🔎 Veri Sorgulama Hatası", str(e))
@@ -3,9 +3,9 @@ import os
 import re
 import json
 import psutil
-import threading
 from rapidfuzz import fuzz
 from config_module import config
+from work_queue_module import work_queue, is_anahtari, IN_PROGRESS
 
 def memory_usage():
     """
@@ -75,44 +75,55 @@ def fuzzy_match(text1, text2):
     return fuzz.ratio(text1, text2)
 
 # --- Stack Yönetimi (İşlem Listesi) ---
+# Stack artık SQLite tabanlı iş kuyruğunda (work_queue_module) tutulur: işlenen dosyalar
+# in_progress, tamamlananlar done, hata alanlar failed durumundadır. Kuyruk süreçler arası
+# güvenlidir; ayrıca bir kilit gerekmez.
 
-# Stack dosyasının yolu config üzerinden belirleniyor.
-STACK_DOSYASI = config.STACK_DOSYASI
-stack_lock = threading.Lock()
+def eski_stack_tasi():
+    """
+    Eski JSON stack dosyasındaki (çökme anında yarım kalmış) kayıtları iş kuyruğuna pending olarak taşır.
+    Eski stack yalnızca dosya adlarını tuttuğundan adlar `STORAGE_DIR` altında aranıp yol anahtarına çevrilir.
+    Pipeline başlangıcında açıkça çağrılır.
+    """
+    stack_dosyasi = config.STACK_DOSYASI
+    if not os.path.exists(stack_dosyasi):
+        return
+    try:
+        with open(stack_dosyasi, "r", encoding="utf-8") as f:
+            stack = json.load(f)
+        if stack:
+            yollar = {ad: next(config.STORAGE_DIR.rglob(ad), None) for ad in stack}
+            work_queue.enqueue([is_anahtari(yol) if yol else ad for ad, yol in yollar.items()], yeniden=True)
+            config.logger.info(f"♻️ Eski stack dosyasından {len(stack)} kayıt iş kuyruğuna taşındı.")
+        os.replace(stack_dosyasi, f"{stack_dosyasi}.migrated")
+    except (OSError, json.JSONDecodeError) as e:
+        config.logger.error(f"❌ Eski stack dosyası taşınamadı: {e}")
 
 def stack_yukle():
     """
-    Stack dosyasını (işlem listesi) yükler.
+    İşlenmekte olan (in_progress) dosyaların listesini döndürür.
 
     Returns:
         list: İşlenen dosyaların listesini içeren liste.
     """
-    if os.path.exists(STACK_DOSYASI):
-        try:
-            with open(STACK_DOSYASI, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            config.logger.error("❌ Stack dosyası bozuk, sıfırlanıyor.")
-    return []
-
-def stack_guncelle(dosya_adi, islem):
+    return work_queue.listele(IN_PROGRESS)
+
+def stack_guncelle(dosya_yolu, islem):
     """
-    Stack dosyasını günceller. İşlem "ekle" ise dosya adını ekler; "sil" ise çıkarır.
+    İş kuyruğunu günceller. İşlem "ekle" ise dosya in_progress (kiralı) olur; "sil" ise done,
+    "hata" ise failed (deneme hakkı kaldıysa yeniden pending) olarak işaretlenir.
 
     Args:
-        dosya_adi (str): Güncellenecek dosya adı.
-        islem (str): "ekle" veya "sil".
+        dosya_yolu (str or Path): Güncellenecek dosyanın yolu (iş anahtarı çözümlenmiş yoldur).
+        islem (str): "ekle", "sil" veya "hata".
     """
-    with stack_lock:
-        stack = stack_yukle()
-        if islem == "ekle":
-            if dosya_adi not in stack:
-                stack.append(dosya_adi)
-        elif islem == "sil":
-            if dosya_adi in stack:
-                stack.remove(dosya_adi)
-        with open(STACK_DOSYASI, "w", encoding="utf-8") as f:
-            json.dump(stack, f, ensure_ascii=False, indent=2)
+    key = is_anahtari(dosya_yolu)
+    if islem == "ekle":
+        work_queue.baslat(key)
+    elif islem == "sil":
+        work_queue.tamamla(key)
+    elif islem == "hata":
+        work_queue.basarisiz(key)
 
 # Aşağıda, önceki tartışmalarımız ve yapılan güncellemeler doğrultusunda oluşturulmuş, final versiyonu olan 
 # **`helper_module.py`** modülünü bulabilirsiniz. Bu modül, genel yardımcı fonksiyonları içerir; metin temizleme,
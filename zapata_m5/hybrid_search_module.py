@@ -0,0 +1,225 @@
+import time
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from config_module import config
+from vector_search_module import VectorSearch
+from bm25_index_module import bm25_index, tokenize, vurgula
+from metadata_store_module import metadata_store
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hibrit_arama")
+BELGE_ALANLARI = ("dosya_id", "dosya")  # Doküman düzeyinde (MetadataStore'da) bilinen filtre alanları
+
+
+def belge_filtresine_uyar(kayit, filters):
+    """
+    📌 Doküman kaydının filtreyi doküman düzeyinde karşılayıp karşılamadığını döndürür.
+
+    Yalnızca `BELGE_ALANLARI` üzerindeki eşitlik / liste (`$in`) filtreleri değerlendirilebilir;
+    chunk alanları (ör. "bolum") veya `$` ile başlayan Chroma ifadeleri içeren filtrelerde False döner.
+
+    Args:
+        kayit (dict or None): `MetadataStore` kaydı.
+        filters (dict): `chroma_where`'e verilen filtre sözlüğü.
+
+    Returns:
+        bool: Kayıt filtreyi kesin olarak karşılıyorsa True.
+    """
+    if not kayit:
+        return False
+    for alan, deger in filters.items():
+        if alan not in BELGE_ALANLARI:
+            return False
+        if isinstance(deger, (list, tuple, set)):
+            if kayit.get(alan) not in deger:
+                return False
+        elif kayit.get(alan) != deger:
+            return False
+    return True
+
+
+def reciprocal_rank_fusion(siralamalar, rrf_k=None):
+    """
+    📌 Birden çok sıralamayı reciprocal rank fusion ile birleştirir: skor(d) = Σ 1 / (rrf_k + sıra(d)).
+
+    Args:
+        siralamalar (list): Her biri en iyiden en kötüye sıralı anahtar listesi.
+        rrf_k (int, optional): Fusion sabiti (varsayılan `config.HYBRID_RRF_K`).
+
+    Returns:
+        list: Skora göre azalan [(anahtar, skor)]
+    """
+    rrf_k = rrf_k or config.HYBRID_RRF_K
+    skorlar = {}
+    for siralama in siralamalar:
+        for sira, anahtar in enumerate(siralama, start=1):
+            skorlar[anahtar] = skorlar.get(anahtar, 0.0) + 1.0 / (rrf_k + sira)
+    return sorted(skorlar.items(), key=lambda x: x[1], reverse=True)
+
+
+class HybridSearch:
+    """
+    📌 **Sözcüksel (BM25) ve vektör (ANN) aramayı eşzamanlı çalıştırıp sıralamaları RRF ile birleştirir.**
+
+    - Gen adları, kimyasal tanımlayıcılar gibi birebir terim eşleşmeleri BM25 indeksinden,
+      anlamsal eşleşmeler `pdf_embeddings` koleksiyonundan gelir; iki sorgu aynı anda çalışır.
+    - Birleştirme doküman düzeyindedir (anahtar: temiz metin dosyası kökü = kaynak dosya adı kökü);
+      vektör tarafında dokümanın sırası en iyi chunk'ının sırasıdır ve bu chunk sonuçla birlikte döner.
+    - Aşamalardan biri hata verirse diğerinin sonuçlarıyla devam edilir.
+    - Her sonuç, sorgu terimleri vurgulanmış bir pasaj içerir: BM25 ile bulunan dokümanlarda indeksteki
+      pasaj ofsetlerinden okunan en iyi pasaj, yalnızca vektörle bulunanlarda en iyi chunk'ın metni.
+    - Aşama süreleri (ms) çağrıya özeldir: `sureler` sözlüğü verilirse doldurulur, `son_sureler` çağıran
+      thread'in son aramasının sürelerini döndürür; her arama loglanır.
+
+    Örnek:
+        sonuclar = HybridSearch().search("BRCA1 DNA repair", k=10)
+    """
+
+    def __init__(self, vector=None, lexical=None, store=None, rrf_k=None, aday_sayisi=None):
+        self.vector = vector or VectorSearch()
+        self.lexical = lexical or bm25_index
+        self.store = store or metadata_store
+        self.rrf_k = rrf_k or config.HYBRID_RRF_K
+        self.aday_sayisi = aday_sayisi or config.HYBRID_CANDIDATES
+        self._lock = threading.Lock()
+        self._yerel = threading.local()
+        self._indeks_hazir = False
+
+    @property
+    def son_sureler(self):
+        """Bu thread'de yapılan son aramanın aşama süreleri (ms)."""
+        return getattr(self._yerel, "sureler", {})
+
+    def _sozcuksel_hazirla(self):
+        # Pipeline her kaydedilen dokümanı indekse ekler; dizin taraması yalnızca ilk aramada
+        # (indeks oluşturulmadan önce işlenmiş temiz metinler için) yapılır.
+        with self._lock:
+            if not self._indeks_hazir:
+                self.lexical.guncelle()
+                self._indeks_hazir = True
+
+    def _zamanla(self, fonksiyon, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            sonuc = fonksiyon(*args, **kwargs)
+        except Exception as e:
+            config.logger.error(f"❌ Hibrit arama aşaması başarısız ({getattr(fonksiyon, '__name__', fonksiyon)}): {e}")
+            sonuc = []
+        return sonuc, (time.perf_counter() - start) * 1000
+
+    def _sozcuksel(self, query, n):
+        self._sozcuksel_hazirla()
+        return self.lexical.search(query, k=n)
+
+    def _pasaj(self, sonuc, query, terimler):
+        if sonuc["bm25_sira"]:
+            try:
+                pasaj = self.lexical.pasaj(sonuc["ad"], query)
+                if pasaj:
+                    return pasaj["metin"]
+            except Exception as e:
+                config.logger.error(f"❌ Pasaj okunamadı ({sonuc['ad']}): {e}")
+        return vurgula(" ".join((sonuc["metin"] or "").split()), terimler)
+
+    def search(self, query, k=10, filters=None, sureler=None):
+        """
+        📌 **Sorgu için en iyi `k` dokümanı hibrit (BM25 + vektör) sıralamayla döndürür.**
+
+        Args:
+            query (str): Arama metni.
+            k (int): Döndürülecek sonuç sayısı.
+            filters (dict, optional): Chunk metadata filtreleri. Vektör aşamasında Chroma'ya verilir; BM25
+                sonuçlarından yalnızca vektör aşamasında da bulunan (filtreye uyan chunk'ı olan) ya da
+                `dosya_id`/`dosya` filtresini doküman kaydıyla karşılayan dokümanlar birleştirmeye alınır.
+            sureler (dict, optional): Verilirse bu çağrının aşama süreleri (ms) içine yazılır.
+
+        Returns:
+            list: [{"sira", "ad", "skor", "dosya_id", "dosya", "vektor_sira", "bm25_sira", "bm25_skor",
+                    "mesafe", "chunk_index", "bolum", "baslangic", "bitis", "metin", "pasaj", "zotero_meta"}]
+                  Yalnızca BM25 ile bulunan dokümanlarda chunk alanları None'dır.
+        """
+        start = time.perf_counter()
+        n = max(k, self.aday_sayisi)
+        vektor_alt_sureler = {}  # Vektör aramasının kendi aşama süreleri; yalnızca bu çağrıya aittir
+        vektor_is = _executor.submit(self._zamanla, self.vector.search, query, k=n, filters=filters, sureler=vektor_alt_sureler)
+        bm25_is = _executor.submit(self._zamanla, self._sozcuksel, query, n)
+        chunklar, vektor_ms = vektor_is.result()
+        bm25_sonuclari, bm25_ms = bm25_is.result()
+
+        en_iyi_chunk = {}
+        for chunk in chunklar:
+            ad = Path(chunk["dosya"] or "").stem
+            if ad and ad not in en_iyi_chunk:
+                en_iyi_chunk[ad] = chunk
+
+        # Yalnızca BM25 ile bulunan dokümanlar metadata deposundan dosya_id'ye bağlanır (ve filtrelenir)
+        meta_start = time.perf_counter()
+        kayitlar = self.store.getir_adlarla(s["ad"] for s in bm25_sonuclari if s["ad"] not in en_iyi_chunk)
+        if filters:
+            bm25_sonuclari = [
+                s for s in bm25_sonuclari
+                if s["ad"] in en_iyi_chunk or belge_filtresine_uyar(kayitlar.get(s["ad"]), filters)
+            ]
+        meta_ms = (time.perf_counter() - meta_start) * 1000
+
+        fusion_start = time.perf_counter()
+        vektor_sira = {ad: i for i, ad in enumerate(en_iyi_chunk, start=1)}
+        bm25 = {s["ad"]: (i, s["skor"]) for i, s in enumerate(bm25_sonuclari, start=1)}
+        birlesik = reciprocal_rank_fusion([list(en_iyi_chunk), list(bm25)], rrf_k=self.rrf_k)[:k]
+        fusion_ms = (time.perf_counter() - fusion_start) * 1000
+
+        sonuclar = []
+        for sira, (ad, skor) in enumerate(birlesik, start=1):
+            chunk = en_iyi_chunk.get(ad) or {}
+            kayit = kayitlar.get(ad) or {}
+            bm25_sira, bm25_skor = bm25.get(ad, (None, None))
+            sonuclar.append({
+                "sira": sira,
+                "ad": ad,
+                "skor": round(skor, 6),
+                "dosya_id": chunk.get("dosya_id") or kayit.get("dosya_id"),
+                "dosya": chunk.get("dosya") or kayit.get("dosya"),
+                "vektor_sira": vektor_sira.get(ad),
+                "bm25_sira": bm25_sira,
+                "bm25_skor": bm25_skor,
+                "mesafe": chunk.get("mesafe"),
+                "chunk_index": chunk.get("chunk_index"),
+                "bolum": chunk.get("bolum"),
+                "baslangic": chunk.get("baslangic"),
+                "bitis": chunk.get("bitis"),
+                "metin": chunk.get("metin"),
+                "zotero_meta": chunk.get("zotero_meta") or kayit.get("zotero_meta"),
+            })
+
+        pasaj_start = time.perf_counter()
+        terimler = tokenize(query)
+        for sonuc in sonuclar:
+            sonuc["pasaj"] = self._pasaj(sonuc, query, terimler)
+        pasaj_ms = (time.perf_counter() - pasaj_start) * 1000
+
+        sureler = {} if sureler is None else sureler
+        sureler.update({
+            "vektor": round(vektor_ms, 2),
+            **{f"vektor_{ad}": sure for ad, sure in vektor_alt_sureler.items()},
+            "bm25": round(bm25_ms, 2),
+            "fusion": round(fusion_ms, 2),
+            "metadata": round(meta_ms, 2),
+            "pasaj": round(pasaj_ms, 2),
+            "toplam": round((time.perf_counter() - start) * 1000, 2),
+        })
+        self._yerel.sureler = sureler
+        config.logger.info(
+            f"🔀 Hibrit arama: {len(sonuclar)} sonuç (vektör: {len(en_iyi_chunk)} doküman, "
+            f"BM25: {len(bm25)} doküman), süreler (ms): {sureler}"
+        )
+        return sonuclar
+
+
+hybrid_search = HybridSearch()
+
+
+def search(query, k=10, filters=None, sureler=None):
+    """
+    📌 Varsayılan `HybridSearch` örneği üzerinden arama yapar (bkz. `HybridSearch.search`).
+    """
+    return hybrid_search.search(query, k=k, filters=filters, sureler=sureler)
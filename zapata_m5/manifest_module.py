@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from config_module import config
+
+# Pipeline aşamaları (sırayla) ve her aşamanın çıktısını etkileyen ayarlar.
+# Bir aşamanın parmak izi kendi ayarlarına ek olarak bir önceki aşamanın parmak izini de içerir;
+# böylece çıkarma ayarı değişince sonraki tüm aşamalar, yalnızca model değişince embedding ve
+# kaydetme yeniden çalışır.
+ASAMALAR = ("cikarma", "zotero", "embedding", "kaydetme")
+ASAMA_AYARLARI = {
+    "cikarma": ("PDF_TEXT_EXTRACTION_METHOD", "PDF_MIN_CHARS_PER_PAGE", "PDF_MAX_GARBAGE_RATIO", "LAYOUT_DPI"),
+    "zotero": ("ZOTERO_BACKEND", "ZOTERO_USER_ID", "ZOTERO_LIBRARY_TYPE"),
+    "embedding": ("EMBEDDING_MODEL", "CHUNK_SIZE"),  # EMBEDDING_MODEL = embedding_module.OPENAI_MODEL
+    "kaydetme": (),
+}
+ASAMA_BAGIMLILIGI = {"cikarma": None, "zotero": None, "embedding": "cikarma", "kaydetme": "embedding"}
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def dosya_icerik_hash(path):
+    """
+    📌 Dosya içeriğinin sha256 özetini 1 MB'lık bloklar halinde okuyarak hesaplar.
+
+    Args:
+        path (str or Path): Dosya yolu.
+
+    Returns:
+        str: Hex formatında sha256 özeti.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ProcessingManifest:
+    """
+    📌 **Artımlı işleme manifestosu** (içerik hash'i + aşama parmak izi anahtarlı, SQLite).
+
+    - Her dosya içerik hash'i ile tanınır; dosya taşınsa veya JSON sırası değişse de kayıt korunur.
+    - Her aşama için (durum, parmak izi, hata, çıktı) saklanır: pending/done/failed.
+    - `gerekli_asamalar` yalnızca yeni/değişmiş dosyalar ve ayarı değişmiş aşamaları döndürür.
+    - (yol, boyut, mtime) → hash önbelleği sayesinde değişmemiş dosyalar yeniden okunmaz.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or config.MANIFEST_PATH)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._fingerprints = None
+
+    def _baglanti(self):
+        if self._conn is None or self._pid != os.getpid():
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stages (
+                    content_hash TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    dosya TEXT,
+                    cikti TEXT,
+                    hata TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (content_hash, stage)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def fingerprint(self, stage):
+        """
+        📌 Aşamanın güncel ayarlardan (ve bağlı olduğu aşamadan) türetilen parmak izini döndürür.
+        """
+        if self._fingerprints is None:
+            fps = {}
+            for asama in ASAMALAR:
+                ayarlar = {k: str(getattr(config, k, None)) for k in ASAMA_AYARLARI[asama]}
+                onceki = ASAMA_BAGIMLILIGI[asama]
+                ayarlar["_onceki"] = fps[onceki] if onceki else ""
+                fps[asama] = hashlib.sha256(json.dumps(ayarlar, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+            self._fingerprints = fps
+        return self._fingerprints[stage]
+
+    def dosya_hash(self, path):
+        """
+        📌 Dosyanın içerik hash'ini döndürür; boyut ve mtime değişmediyse önbellekten okur.
+        """
+        path = Path(path)
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            row = self._baglanti().execute(
+                "SELECT size, mtime_ns, content_hash FROM files WHERE path = ?", (key,)
+            ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        content_hash = dosya_icerik_hash(path)
+        with self._lock:
+            conn = self._baglanti()
+            conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (key, stat.st_size, stat.st_mtime_ns, content_hash))
+            conn.commit()
+        return content_hash
+
+    def gerekli_asamalar(self, content_hash):
+        """
+        📌 Güncel ayarlarla tamamlanmamış aşamaları döndürür.
+        Herhangi bir aşama yeniden çalışacaksa kaydetme aşaması da listeye eklenir.
+
+        Returns:
+            list: Çalıştırılması gereken aşama adları (sıralı); boşsa dosya atlanabilir.
+        """
+        with self._lock:
+            rows = self._baglanti().execute(
+                "SELECT stage, fingerprint, status FROM stages WHERE content_hash = ?", (content_hash,)
+            ).fetchall()
+        tamam = {stage for stage, fp, status in rows if status == "done" and fp == self.fingerprint(stage)}
+        gerekli = [a for a in ASAMALAR if a not in tamam]
+        if gerekli and "kaydetme" not in gerekli:
+            gerekli.append("kaydetme")
+        return gerekli
+
+    def isaretle(self, content_hash, stage, status, dosya=None, cikti=None, hata=None):
+        """
+        📌 Bir aşamanın durumunu (pending/done/failed) güncel parmak iziyle kaydeder.
+
+        Args:
+            content_hash (str): Dosya içerik hash'i.
+            stage (str): Aşama adı.
+            status (str): "pending", "done" veya "failed".
+            dosya (str, optional): Dosya adı (raporlama için).
+            cikti (dict, optional): Aşamanın sonraki çalıştırmalarda yeniden kullanılacak küçük çıktısı.
+            hata (str, optional): Hata mesajı.
+        """
+        with self._lock:
+            conn = self._baglanti()
+            conn.execute(
+                "INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (content_hash, stage, self.fingerprint(stage), status, dosya,
+                 json.dumps(cikti, ensure_ascii=False) if cikti is not None else None, hata, time.time())
+            )
+            conn.commit()
+
+    def cikti(self, content_hash, stage):
+        """
+        📌 Aşamanın kaydedilmiş çıktısını döndürür (yoksa None).
+        """
+        with self._lock:
+            row = self._baglanti().execute(
+                "SELECT cikti FROM stages WHERE content_hash = ? AND stage = ?", (content_hash, stage)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def ozet(self):
+        """
+        📌 Aşama ve durum bazında kayıt sayılarını döndürür.
+
+        Returns:
+            dict: {aşama: {durum: sayı}}
+        """
+        with self._lock:
+            rows = self._baglanti().execute(
+                "SELECT stage, status, COUNT(*) FROM stages GROUP BY stage, status"
+            ).fetchall()
+        sonuc = {}
+        for stage, status, n in rows:
+            sonuc.setdefault(stage, {})[status] = n
+        return sonuc
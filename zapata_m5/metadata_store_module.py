@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from config_module import config
+
+
+class MetadataStore:
+    """
+    📌 **Doküman metadata'sı için ilişkisel yan depo (SQLite, `dosya_id` anahtarlı).**
+
+    - Zotero bibliyografik verisi vektör koleksiyonuna sahte (sıfır) embedding ile eklenmez;
+      `documents` tablosunda tutulur ve arama sonuçlarına `dosya_id` ile birleştirilir.
+    - Embedding'i oluşturulamayan chunk'lar indekslenmez; `missing_chunks` tablosuna eksik olarak yazılır
+      ve sonraki çalıştırmalarda yeniden denenebilir.
+
+    Örnek:
+        metadata_store.kaydet("ABCD1234", "makale.pdf", zotero_meta={...}, chunk_sayisi=12)
+        metadata_store.getir_coklu(["ABCD1234"])
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or config.METADATA_STORE_PATH)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _baglanti(self):
+        if self._conn is None or self._pid != os.getpid():
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    dosya_id TEXT PRIMARY KEY,
+                    dosya TEXT NOT NULL,
+                    zotero_meta TEXT,
+                    chunk_sayisi INTEGER,
+                    islem_tarihi TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS missing_chunks (
+                    dosya_id TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    hata TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (dosya_id, chunk_index)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_dosya ON documents (dosya)")
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def kaydet(self, dosya_id, dosya, zotero_meta=None, chunk_sayisi=None, islem_tarihi=None):
+        """
+        📌 Dokümanın metadata kaydını ekler veya günceller.
+        `zotero_meta` veya `chunk_sayisi` verilmezse mevcut değer korunur.
+
+        Args:
+            dosya_id (str): Doküman kimliği (chunk id'lerinin öneki).
+            dosya (str): Dosya adı.
+            zotero_meta (dict, optional): Zotero bibliyografik verisi.
+            chunk_sayisi (int, optional): Dokümanın toplam chunk sayısı.
+            islem_tarihi (str, optional): İşlem zamanı (ISO).
+        """
+        meta = json.dumps(zotero_meta, ensure_ascii=False) if zotero_meta is not None else None
+        with self._lock:
+            conn = self._baglanti()
+            conn.execute(
+                "INSERT INTO documents (dosya_id, dosya, zotero_meta, chunk_sayisi, islem_tarihi, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(dosya_id) DO UPDATE SET dosya = excluded.dosya, "
+                "zotero_meta = COALESCE(excluded.zotero_meta, zotero_meta), "
+                "chunk_sayisi = COALESCE(excluded.chunk_sayisi, chunk_sayisi), "
+                "islem_tarihi = COALESCE(excluded.islem_tarihi, islem_tarihi), updated_at = excluded.updated_at",
+                (dosya_id, dosya, meta, chunk_sayisi, islem_tarihi, time.time())
+            )
+            conn.commit()
+
+    def eksik_chunklari_kaydet(self, dosya_id, chunk_indeksleri, hata=None):
+        """
+        📌 Dokümanın eksik (embedding'i oluşturulamamış) chunk listesini yeniler.
+        Boş liste verilirse dokümanın önceki eksik kayıtları silinir.
+
+        Args:
+            dosya_id (str): Doküman kimliği.
+            chunk_indeksleri (list): Eksik chunk indeksleri.
+            hata (str, optional): Hata açıklaması.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._baglanti()
+            conn.execute("DELETE FROM missing_chunks WHERE dosya_id = ?", (dosya_id,))
+            conn.executemany(
+                "INSERT INTO missing_chunks VALUES (?, ?, ?, ?)",
+                [(dosya_id, int(i), hata, now) for i in chunk_indeksleri]
+            )
+            conn.commit()
+        if chunk_indeksleri:
+            config.logger.warning(f"⚠️ {dosya_id}: {len(chunk_indeksleri)} chunk embedding'siz, eksik olarak kaydedildi.")
+
+    def _satir(self, row):
+        dosya_id, dosya, meta, chunk_sayisi, islem_tarihi = row
+        return {
+            "dosya_id": dosya_id,
+            "dosya": dosya,
+            "zotero_meta": json.loads(meta) if meta else None,
+            "chunk_sayisi": chunk_sayisi,
+            "islem_tarihi": islem_tarihi,
+        }
+
+    def getir(self, dosya_id):
+        """
+        📌 Tek bir dokümanın metadata kaydını döndürür (yoksa None).
+        """
+        return self.getir_coklu([dosya_id]).get(dosya_id)
+
+    def getir_coklu(self, dosya_idleri):
+        """
+        📌 Birden çok dokümanın metadata kaydını tek sorguda döndürür (arama sonuçlarıyla birleştirme için).
+
+        Args:
+            dosya_idleri (iterable): Doküman kimlikleri.
+
+        Returns:
+            dict: {dosya_id: kayıt}
+        """
+        ids = list(dict.fromkeys(dosya_idleri))
+        sonuc = {}
+        with self._lock:
+            conn = self._baglanti()
+            for start in range(0, len(ids), 500):  # SQLite parametre sınırı
+                parca = ids[start:start + 500]
+                rows = conn.execute(
+                    "SELECT dosya_id, dosya, zotero_meta, chunk_sayisi, islem_tarihi FROM documents "
+                    f"WHERE dosya_id IN ({','.join('?' * len(parca))})", parca
+                ).fetchall()
+                sonuc.update((row[0], self._satir(row)) for row in rows)
+        return sonuc
+
+    def getir_adlarla(self, adlar):
+        """
+        📌 Dosya adı köküyle (uzantısız, ör. "makale" → "makale.pdf") metadata kayıtlarını döndürür.
+        Temiz metin dosyası adıyla anahtarlanan sonuçları (BM25) `dosya_id`'ye bağlamak için kullanılır.
+
+        Args:
+            adlar (iterable): Dosya adı kökleri.
+
+        Returns:
+            dict: {ad: kayıt}
+        """
+        sonuc = {}
+        with self._lock:
+            conn = self._baglanti()
+            for ad in dict.fromkeys(adlar):
+                # "ad." ile başlayan adlar için indeksli aralık sorgusu ('/' karakteri '.' karakterinden hemen sonra gelir)
+                rows = conn.execute(
+                    "SELECT dosya_id, dosya, zotero_meta, chunk_sayisi, islem_tarihi FROM documents "
+                    "WHERE dosya >= ? AND dosya < ?", (ad + ".", ad + "/")
+                ).fetchall()
+                for row in rows:
+                    if Path(row[1]).stem == ad:
+                        sonuc[ad] = self._satir(row)
+                        break
+        return sonuc
+
+    def eksik_chunklar(self, dosya_id=None):
+        """
+        📌 Eksik chunk kayıtlarını döndürür.
+
+        Args:
+            dosya_id (str, optional): Verilirse yalnızca bu dokümanın kayıtları.
+
+        Returns:
+            list: [(dosya_id, chunk_index)] çiftleri.
+        """
+        sql = "SELECT dosya_id, chunk_index FROM missing_chunks"
+        params = ()
+        if dosya_id is not None:
+            sql += " WHERE dosya_id = ?"
+            params = (dosya_id,)
+        with self._lock:
+            return self._baglanti().execute(sql + " ORDER BY dosya_id, chunk_index", params).fetchall()
+
+
+metadata_store = MetadataStore()
@@ -2,6 +2,8 @@ import layoutparser as lp
 import fitz  # PyMuPDF kütüphanesi
 import json
 import os
+from config_module import config
+from pdf_processing import get_layout_model, render_page_images
 
 def haritala_bilimsel_yayin_yapisi(pdf_dosya_yolu, cikti_dosyasi_yolu):
     """
@@ -19,25 +21,22 @@ def haritala_bilimsel_yayin_yapisi(pdf_dosya_yolu, cikti_dosyasi_yolu):
         Yapı bilgileri belirtilen JSON dosyasına kaydedilir.
     """
 
-    model = lp.models.PaddleDetectionLayoutModel(config_path="lp://PP-OCRv3/ppyolov2_r50vd_dcn_365e_publaynet_infer",
-                                        label_map={0: "Text", 1: "Title", 2: "List", 3:"Table", 4:"Figure", 5:"Formula", 6:"Caption", 7:"Page-Number", 8:"Section-Header", 9:"Footnote", 10:"Body-Text"})
+    # Model süreç başına bir kez yüklenir (pdf_processing.get_layout_model)
+    model = get_layout_model()
+    if model is None:
+        print("Layout-parser modeli yüklenemedi.")
+        return
 
     doc = fitz.open(pdf_dosya_yolu)
     yayin_yapisi = []
 
-    for sayfa_numarasi in range(doc.page_count):
-        sayfa = doc.load_page(sayfa_numarasi)
+    dpi = config.LAYOUT_DPI
+    # Sayfalar geçici PNG dosyası yerine bellekte NumPy dizisi olarak rasterleştirilir
+    for sayfa_numarasi, sayfa, sayfa_goruntusu in render_page_images(doc, dpi=dpi):
         sayfa_boyutlari = sayfa.rect
-        goruntuler = sayfa.get_images(full=True)
-
-        # Sayfayı görüntüye dönüştürme (layout-parser için)
-        sayfa_goruntusu = sayfa.get_pixmap(matrix=fitz.Matrix(300/72, 300/72)) # Yüksek çözünürlük için DPI 300
-        sayfa_goruntusu.save(f"sayfa_{sayfa_numarasi}.png") # Geçici görüntü dosyası
-        sayfa_goruntu_lp = lp.িও.load_image(f"sayfa_{sayfa_numarasi}.png")
-
 
         # Layout Parser ile düzen analizi
-        layout = model.detect(sayfa_goruntu_lp)
+        layout = model.detect(sayfa_goruntusu)
 
 
         sayfa_bilgisi = {
@@ -58,7 +57,9 @@ def haritala_bilimsel_yayin_yapisi(pdf_dosya_yolu, cikti_dosyasi_yolu):
 
             # Blok tipine göre metin çıkarma (Şimdilik sadece 'Text' ve 'Table' için)
             if blok.type in ['Text', 'Table']:
-                alan = [blok.coordinates[0], blok.coordinates[1], blok.coordinates[2], blok.coordinates[3]]
+                # Piksel koordinatları PDF noktasına çevrilir (72 / dpi)
+                olcek = 72 / dpi
+                alan = [koordinat * olcek for koordinat in blok.coordinates]
                 metin_bloklari = sayfa.get_text("blocks", clip=alan)
                 blok_metni = ""
                 for metin_blok in metin_bloklari:
@@ -69,7 +70,6 @@ def haritala_bilimsel_yayin_yapisi(pdf_dosya_yolu, cikti_dosyasi_yolu):
             sayfa_bilgisi["bloklar"].append(blok_bilgisi)
 
         yayin_yapisi.append(sayfa_bilgisi)
-        os.remove(f"sayfa_{sayfa_numarasi}.png") # Geçici görüntü dosyasını sil
 
     # Yapı bilgilerini JSON dosyasına kaydet
     with open(cikti_dosyasi_yolu, 'w', encoding='utf-8') as f:
@@ -2,24 +2,45 @@
 
 import os
 import re
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor
 from config_module import config
 
-def extract_text_from_pdf(pdf_path, method=None):
+def extract_text_from_pdf(pdf_path, method=None, parallel=None):
     """
     PDF'den ham metni çıkarır.
     Eğer method parametresi verilmezse, .env dosyasından "PDF_TEXT_EXTRACTION_METHOD" okunur 
-    (varsayılan: "pdfplumber"). Eğer pdfplumber ile metin çıkarma hatası alınırsa, otomatik olarak 
-    pdfminer yöntemi devreye girer.
+    (varsayılan: "pymupdf"). PyMuPDF ile çıkarılan sayfalardan kalite kontrolünü geçemeyenler
+    (çok az karakter veya yüksek bozuk glif oranı) sayfa bazında pdfplumber ile yeniden çıkarılır.
+    Eğer pdfplumber ile metin çıkarma hatası alınırsa, otomatik olarak pdfminer yöntemi devreye girer.
+    
+    Sayfa sayısı config.PDF_PARALLEL_MIN_PAGES değerine ulaşan belgeler (tüm yöntemlerde, varsayılan
+    PyMuPDF dahil), sayfa aralıklarına bölünüp `extract_text_from_pdf_parallel` ile süreç havuzunda çıkarılır.
     
     Args:
         pdf_path (str or Path): PDF dosyasının yolu.
-        method (str, optional): Kullanılacak metin çıkarma yöntemi ("pdfplumber" veya "pdfminer").
+        method (str, optional): Kullanılacak metin çıkarma yöntemi ("pymupdf", "pdfplumber" veya "pdfminer").
+        parallel (bool, optional): True ise her zaman, False ise hiçbir zaman sayfa bazlı paralel çıkarım yapılır.
+            None (varsayılan) ise sayfa sayısına göre karar verilir.
     
     Returns:
         str or None: Çıkarılan metin; hata durumunda None.
     """
     if method is None:
-        method = os.getenv("PDF_TEXT_EXTRACTION_METHOD", "pdfplumber").lower()
+        method = os.getenv("PDF_TEXT_EXTRACTION_METHOD", "pymupdf").lower()
+
+    if method == "pymupdf":
+        text = _extract_text_with_pymupdf(pdf_path, parallel=parallel)
+        if text is not None:
+            return text
+        method = "pdfplumber"
+
+    if parallel is not False and method in ("pdfplumber", "pdfminer"):
+        page_count = get_pdf_page_count(pdf_path)
+        if page_count and (parallel or page_count >= config.PDF_PARALLEL_MIN_PAGES):
+            text = extract_text_from_pdf_parallel(pdf_path, method=method, page_count=page_count)
+            if text is not None:
+                return text
 
     text = None
     if method == "pdfplumber":
@@ -44,10 +65,303 @@ def extract_text_from_pdf(pdf_path, method=None):
         except Exception as e:
             config.logger.error(f"❌ pdfminer ile metin çıkarma hatası: {e}")
     else:
-        config.logger.error("Geçersiz method belirtildi. 'pdfplumber' veya 'pdfminer' kullanılabilir.")
+        config.logger.error("Geçersiz method belirtildi. 'pymupdf', 'pdfplumber' veya 'pdfminer' kullanılabilir.")
     return text
 
-def detect_columns(text, min_gap=4):
+def page_text_quality_ok(text, min_chars=None, max_garbage_ratio=None):
+    """
+    Bir sayfadan çıkarılan metnin kullanılabilir olup olmadığını sezgisel olarak kontrol eder.
+    - Sayfada en az `min_chars` görünür karakter olmalıdır.
+    - Bozuk glif oranı (U+FFFD, özel kullanım alanı, yazdırılamayan karakterler) `max_garbage_ratio` değerini aşmamalıdır.
+
+    Args:
+        text (str): Sayfa metni.
+        min_chars (int, optional): En az karakter sayısı (varsayılan: config.PDF_MIN_CHARS_PER_PAGE).
+        max_garbage_ratio (float, optional): En yüksek bozuk glif oranı (varsayılan: config.PDF_MAX_GARBAGE_RATIO).
+
+    Returns:
+        bool: Metin kaliteli ise True.
+    """
+    min_chars = config.PDF_MIN_CHARS_PER_PAGE if min_chars is None else min_chars
+    max_garbage_ratio = config.PDF_MAX_GARBAGE_RATIO if max_garbage_ratio is None else max_garbage_ratio
+    visible = [ch for ch in (text or "") if not ch.isspace()]
+    if len(visible) < min_chars:
+        return False
+    garbage = sum(1 for ch in visible if ch == "\ufffd" or "\ue000" <= ch <= "\uf8ff" or not ch.isprintable())
+    return garbage / len(visible) <= max_garbage_ratio
+
+def _pymupdf_page_range(pdf_path, start=0, end=None):
+    """
+    [start, end) aralığındaki sayfaları PyMuPDF ile çıkarır; kalite kontrolünü geçemeyen sayfalar
+    yalnızca o sayfalar için pdfplumber ile yeniden çıkarılır. PyMuPDF hataları çağırana iletilir.
+
+    Args:
+        pdf_path (str or Path): PDF dosyasının yolu.
+        start (int): İlk sayfa indeksi (0 tabanlı, dahil).
+        end (int, optional): Son sayfa indeksi (0 tabanlı, hariç); verilmezse belgenin sonu.
+
+    Returns:
+        tuple: (sayfa metinlerinin listesi, pdfplumber ile yeniden çıkarılan sayfa sayısı)
+    """
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        end = doc.page_count if end is None else end
+        pages_text = [doc[i].get_text("text").rstrip("\n") for i in range(start, end)]
+
+    weak_pages = [i for i, page_text in enumerate(pages_text) if not page_text_quality_ok(page_text)]
+    if weak_pages:
+        try:
+            import pdfplumber
+            with pdfplumber.open(pdf_path, pages=[start + i + 1 for i in weak_pages]) as pdf:
+                for i, page in zip(weak_pages, pdf.pages):
+                    plumber_text = page.extract_text() or ""
+                    if page_text_quality_ok(plumber_text) or len(plumber_text.strip()) > len(pages_text[i].strip()):
+                        pages_text[i] = plumber_text
+        except Exception as e:
+            config.logger.error(f"❌ pdfplumber sayfa geri dönüşü başarısız: {e}")
+    return pages_text, len(weak_pages)
+
+def _extract_text_with_pymupdf(pdf_path, parallel=None):
+    """
+    PyMuPDF (fitz) ile hızlı metin çıkarımı yapar. Kalite kontrolünü geçemeyen sayfalar
+    yalnızca o sayfalar için pdfplumber ile yeniden çıkarılır. Sayfa sayısı config.PDF_PARALLEL_MIN_PAGES
+    değerine ulaşan belgeler sayfa aralıklarına bölünüp süreç havuzunda çıkarılır.
+
+    Args:
+        pdf_path (str or Path): PDF dosyasının yolu.
+        parallel (bool, optional): True ise her zaman, False ise hiçbir zaman paralel çıkarım yapılır.
+
+    Returns:
+        str or None: Çıkarılan metin; PyMuPDF kullanılamazsa None.
+    """
+    try:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+        if parallel is not False and page_count and (parallel or page_count >= config.PDF_PARALLEL_MIN_PAGES):
+            text = extract_text_from_pdf_parallel(pdf_path, method="pymupdf", page_count=page_count)
+            if text is not None:
+                return text
+        pages_text, weak_count = _pymupdf_page_range(pdf_path, 0, page_count)
+    except Exception as e:
+        config.logger.error(f"❌ PyMuPDF ile metin çıkarma hatası: {e}. pdfplumber deneniyor.")
+        return None
+
+    text = "\n".join(page_text for page_text in pages_text if page_text)
+    config.logger.info(f"✅ PyMuPDF ile metin çıkarıldı ({weak_count}/{len(pages_text)} sayfa pdfplumber ile): {pdf_path}")
+    return text
+
+def get_pdf_page_count(pdf_path):
+    """
+    PDF'nin sayfa sayısını döndürür (PyMuPDF ile; sayfa içerikleri ayrıştırılmaz).
+
+    Args:
+        pdf_path (str or Path): PDF dosyasının yolu.
+
+    Returns:
+        int or None: Sayfa sayısı; okunamazsa None.
+    """
+    try:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception as e:
+        config.logger.error(f"❌ PDF sayfa sayısı okunamadı: {pdf_path}, Hata: {e}")
+        return None
+
+def _extract_page_range(pdf_path, start, end, method="pdfplumber"):
+    """
+    [start, end) aralığındaki sayfaların metnini çıkarır (süreç havuzunda çalışan işçi fonksiyonu).
+    pdfplumber başarısız olursa yalnızca bu sayfa aralığı için pdfminer denenir. PyMuPDF hataları
+    çağırana iletilir (belge bütünüyle pdfplumber'a düşer).
+
+    Args:
+        pdf_path (str): PDF dosyasının yolu.
+        start (int): İlk sayfa indeksi (0 tabanlı, dahil).
+        end (int): Son sayfa indeksi (0 tabanlı, hariç).
+        method (str): "pymupdf", "pdfplumber" veya "pdfminer".
+
+    Returns:
+        tuple: (start, sayfa metinlerinin listesi)
+    """
+    if method == "pymupdf":
+        pages_text, _ = _pymupdf_page_range(pdf_path, start, end)
+        return start, [page_text for page_text in pages_text if page_text]
+    if method == "pdfplumber":
+        try:
+            import pdfplumber
+            with pdfplumber.open(pdf_path, pages=list(range(start + 1, end + 1))) as pdf:
+                pages_text = []
+                for page in pdf.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        pages_text.append(page_text)
+                return start, pages_text
+        except Exception as e:
+            config.logger.error(f"❌ pdfplumber hatası (sayfa {start + 1}-{end}): {e}. pdfminer deneniyor.")
+    try:
+        from pdfminer.high_level import extract_text
+        text = extract_text(pdf_path, page_numbers=list(range(start, end)))
+        return start, [text] if text else []
+    except Exception as e:
+        config.logger.error(f"❌ pdfminer hatası (sayfa {start + 1}-{end}): {e}")
+        return start, []
+
+def extract_text_from_pdf_parallel(pdf_path, method="pdfplumber", page_count=None, max_workers=None, pages_per_shard=None):
+    """
+    PDF'nin sayfa aralığını parçalara (shard) bölerek metni ProcessPoolExecutor ile paralel çıkarır.
+    Her parça bağımsız çıkarılır (pdfplumber -> pdfminer geri dönüşü parça bazında) ve metin
+    sayfa sırasına göre yeniden birleştirilir.
+
+    Args:
+        pdf_path (str or Path): PDF dosyasının yolu.
+        method (str): "pymupdf", "pdfplumber" veya "pdfminer".
+        page_count (int, optional): Bilinen sayfa sayısı; verilmezse okunur.
+        max_workers (int, optional): İşçi süreç sayısı (varsayılan: config.PDF_EXTRACTION_WORKERS).
+        pages_per_shard (int, optional): Parça başına sayfa sayısı (varsayılan: config.PDF_PAGES_PER_SHARD).
+
+    Returns:
+        str or None: Çıkarılan metin; hata durumunda None.
+    """
+    page_count = page_count or get_pdf_page_count(pdf_path)
+    if not page_count:
+        return None
+    max_workers = max_workers or config.PDF_EXTRACTION_WORKERS
+    pages_per_shard = pages_per_shard or config.PDF_PAGES_PER_SHARD
+    shards = [(start, min(start + pages_per_shard, page_count)) for start in range(0, page_count, pages_per_shard)]
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+            futures = [executor.submit(_extract_page_range, str(pdf_path), start, end, method) for start, end in shards]
+            results = sorted(future.result() for future in futures)
+    except Exception as e:
+        config.logger.error(f"❌ Paralel metin çıkarma hatası: {e}. Seri çıkarıma geçiliyor.")
+        return None
+
+    text = "\n".join(page_text for _, pages_text in results for page_text in pages_text)
+    config.logger.info(f"✅ {page_count} sayfa {len(shards)} parçada paralel çıkarıldı ({method}): {pdf_path}")
+    return text
+
+# Bilimsel bölüm başlıkları için derlenmiş regex desenleri (modül yüklenirken bir kez derlenir)
+SECTION_PATTERNS = {
+    "Abstract": r"(?:^|\n)(Abstract|Özet)(?::)?\s*\n",
+    "Introduction": r"(?:^|\n)(Introduction|Giriş)(?::)?\s*\n",
+    "Methods": r"(?:^|\n)(Methods|Materials and Methods|Yöntemler|Metot)(?::)?\s*\n",
+    "Results": r"(?:^|\n)(Results|Bulgular)(?::)?\s*\n",
+    "Discussion": r"(?:^|\n)(Discussion|Tartışma)(?::)?\s*\n",
+    "Conclusion": r"(?:^|\n)(Conclusion|Sonuç)(?::)?\s*\n"
+}
+ADDITIONAL_SECTION_PATTERNS = {
+    "İçindekiler": r"(?:^|\n)(İçindekiler)(?::)?\s*\n",
+    "Tablolar": r"(?:^|\n)(Tablolar|Tables)(?::)?\s*\n",
+    "Çizelgeler": r"(?:^|\n)(Çizelgeler|Charts)(?::)?\s*\n",
+    "Resimler/Figürler": r"(?:^|\n)(Resimler|Figures)(?::)?\s*\n",
+    "İndeks": r"(?:^|\n)(İndeks|Index)(?::)?\s*\n"
+}
+_COMPILED_SECTION_PATTERNS = {
+    section: re.compile(pattern, flags=re.IGNORECASE)
+    for section, pattern in {**SECTION_PATTERNS, **ADDITIONAL_SECTION_PATTERNS}.items()
+}
+_REFERENCE_HEADING_PATTERN = re.compile(r'(?i)(?:KAYNAKÇA|KAYNAKLAR|REFERENCES|BIBLIOGRAPHY).*?\n(.*?)(?=\n\s*\n|\Z)', re.DOTALL)
+_NUMBERED_REFERENCE_PATTERN = re.compile(r'\[\d+\]\s.*?(?=\n|$)', re.DOTALL)
+
+class DocumentAnalysis:
+    """
+    Tek bir doküman için paylaşılan analiz bağlamı.
+
+    Satır bölme, sütun sinyali, bölüm başlangıç indeksleri ve kaynakça bloğu ilk erişimde bir kez
+    hesaplanır ve önbelleğe alınır; `map_scientific_sections_extended`, `detect_columns` ve
+    `extract_references_enhanced` aynı bağlamı alarak bu sonuçları yeniden kullanır.
+
+    Args:
+        text (str): Analiz edilecek ham metin.
+        min_gap (int): Sütun tespiti için minimum boşluk sayısı.
+    """
+
+    def __init__(self, text, min_gap=4):
+        self.text = text
+        self.min_gap = min_gap
+
+    @cached_property
+    def lines(self):
+        return self.text.split('\n')
+
+    @cached_property
+    def column_info(self):
+        gap = ' ' * self.min_gap
+        column_line_count = sum(1 for line in self.lines if gap in line)
+        return {'sutunlu': column_line_count > len(self.lines) * 0.2}
+
+    @cached_property
+    def section_offsets(self):
+        # Her bölüm için yalnızca ilk eşleşme aranır (re.search); bulunamayanlar None
+        offsets = {}
+        for section, pattern in _COMPILED_SECTION_PATTERNS.items():
+            match = pattern.search(self.text)
+            offsets[section] = match.start() if match else None
+        return offsets
+
+    @cached_property
+    def sections(self):
+        text = self.text
+        sorted_sections = sorted(
+            ((sec, pos) for sec, pos in self.section_offsets.items() if pos is not None),
+            key=lambda x: x[1]
+        )
+        mapped_sections = {}
+        for i, (section, start_idx) in enumerate(sorted_sections):
+            end_idx = sorted_sections[i + 1][1] if i + 1 < len(sorted_sections) else len(text)
+            content = text[start_idx:end_idx].strip()
+            mapped_sections[section] = {"start": start_idx, "end": end_idx, "content": content}
+        # Ek olarak, sütun yapısı bilgisi ekleyelim
+        mapped_sections["Column Structure"] = self.column_info
+
+        # Eğer bazı bölümler bulunamazsa, onları None olarak ekleyelim
+        for sec in _COMPILED_SECTION_PATTERNS:
+            if sec not in mapped_sections:
+                mapped_sections[sec] = None
+        return mapped_sections
+
+    @cached_property
+    def reference_block(self):
+        match = _REFERENCE_HEADING_PATTERN.search(self.text)
+        return match.group(1) if match else ""
+
+    @cached_property
+    def references(self):
+        references = []
+        for pattern in (_REFERENCE_HEADING_PATTERN, _NUMBERED_REFERENCE_PATTERN):
+            for match in pattern.finditer(self.text):
+                ref = match.group(0).strip()
+                if ref not in references:
+                    references.append(ref)
+        return [re.sub(r'\s+', ' ', ref).strip() for ref in references if len(ref) > 10 and any(c.isdigit() for c in ref)]
+
+    def section_positions_in(self, derived_text):
+        """
+        Bölüm başlıklarının, bu metinden türetilmiş bir metindeki (ör. `reflow_columns` çıktısı)
+        konumlarını döndürür. Satır sonları kaybolduğundan başlık kelimesi, önceki bölümün
+        konumundan itibaren sırayla aranır.
+
+        Returns:
+            list: Konuma göre sıralı (konum, bölüm adı) çiftleri.
+        """
+        found = []
+        for section, pattern in _COMPILED_SECTION_PATTERNS.items():
+            match = pattern.search(self.text)
+            if match:
+                found.append((match.start(), section, match.group(1)))
+        found.sort()
+        positions = []
+        cursor = 0
+        for _, section, heading in found:
+            match = re.compile(rf"\b{re.escape(heading)}\b").search(derived_text, cursor)
+            if match:
+                positions.append((match.start(), section))
+                cursor = match.end()
+        return positions
+
+def detect_columns(text, min_gap=4, analysis=None):
     """
     Metindeki sütun yapısını tespit eder.
     Belirli bir boşluk sayısına göre metnin sütunlu olup olmadığını belirler.
@@ -55,15 +369,16 @@ def detect_columns(text, min_gap=4):
     Args:
         text (str): İşlenecek metin.
         min_gap (int): Bir satırda sütunları ayırmak için gereken minimum boşluk sayısı.
+        analysis (DocumentAnalysis, optional): Aynı metin için paylaşılan analiz bağlamı.
     
     Returns:
         dict: Örnek: {'sutunlu': True} veya {'sutunlu': False}
     """
-    lines = text.split('\n')
-    column_line_count = sum(1 for line in lines if re.search(r' {' + str(min_gap) + r',}', line))
-    return {'sutunlu': column_line_count > len(lines) * 0.2}
+    if analysis is None or analysis.min_gap != min_gap:
+        analysis = DocumentAnalysis(text, min_gap=min_gap)
+    return analysis.column_info
 
-def map_scientific_sections_extended(text):
+def map_scientific_sections_extended(text, analysis=None):
     """
     Bilimsel dokümanların bölümlerini haritalar.
     Örneğin: Abstract, Introduction, Methods, Results, Discussion, Conclusion,
@@ -72,95 +387,190 @@ def map_scientific_sections_extended(text):
     
     Args:
         text (str): İşlenecek ham metin.
+        analysis (DocumentAnalysis, optional): Aynı metin için paylaşılan analiz bağlamı;
+            verilirse bölüm indeksleri ve sütun bilgisi yeniden hesaplanmaz.
         
     Returns:
         dict: Haritalanmış bölümler; her bölüm için "start", "end" ve "content" bilgileri.
     """
-    section_patterns = {
-        "Abstract": r"(?:^|\n)(Abstract|Özet)(?::)?\s*\n",
-        "Introduction": r"(?:^|\n)(Introduction|Giriş)(?::)?\s*\n",
-        "Methods": r"(?:^|\n)(Methods|Materials and Methods|Yöntemler|Metot)(?::)?\s*\n",
-        "Results": r"(?:^|\n)(Results|Bulgular)(?::)?\s*\n",
-        "Discussion": r"(?:^|\n)(Discussion|Tartışma)(?::)?\s*\n",
-        "Conclusion": r"(?:^|\n)(Conclusion|Sonuç)(?::)?\s*\n"
-    }
-    additional_patterns = {
-        "İçindekiler": r"(?:^|\n)(İçindekiler)(?::)?\s*\n",
-        "Tablolar": r"(?:^|\n)(Tablolar|Tables)(?::)?\s*\n",
-        "Çizelgeler": r"(?:^|\n)(Çizelgeler|Charts)(?::)?\s*\n",
-        "Resimler/Figürler": r"(?:^|\n)(Resimler|Figures)(?::)?\s*\n",
-        "İndeks": r"(?:^|\n)(İndeks|Index)(?::)?\s*\n"
-    }
-    sections_map = {}
-    # Her bölüm için ilk eşleşmenin başlangıç indeksini alıyoruz.
-    for section, pattern in {**section_patterns, **additional_patterns}.items():
-        matches = list(re.finditer(pattern, text, flags=re.IGNORECASE))
-        sections_map[section] = matches[0].start() if matches else None
-
-    # Sadece bulunan bölümleri ayıkla
-    detected_sections = {sec: pos for sec, pos in sections_map.items() if pos is not None}
-    sorted_sections = sorted(detected_sections.items(), key=lambda x: x[1])
-    mapped_sections = {}
-    for i, (section, start_idx) in enumerate(sorted_sections):
-        end_idx = sorted_sections[i + 1][1] if i + 1 < len(sorted_sections) else len(text)
-        content = text[start_idx:end_idx].strip()
-        mapped_sections[section] = {"start": start_idx, "end": end_idx, "content": content}
-    # Ek olarak, sütun yapısı bilgisi ekleyelim
-    column_info = detect_columns(text)
-    mapped_sections["Column Structure"] = column_info
-
-    # Eğer bazı bölümler bulunamazsa, onları None olarak ekleyelim
-    for sec in list(section_patterns.keys()) + list(additional_patterns.keys()):
-        if sec not in mapped_sections:
-            mapped_sections[sec] = None
-
-    return mapped_sections
+    if analysis is None:
+        analysis = DocumentAnalysis(text)
+    return analysis.sections
+
+def extract_references_enhanced(text, analysis=None):
+    """
+    Gelişmiş kaynakça çıkarımı:
+    PDF veya TXT dosyalarında bulunan kaynakça bölümünü, çeşitli pattern'lerle tespit eder.
+    
+    Args:
+        text (str): İşlenecek ham metin.
+        analysis (DocumentAnalysis, optional): Aynı metin için paylaşılan analiz bağlamı.
+    
+    Returns:
+        list: Temizlenmiş kaynakça kayıtları.
+    """
+    if analysis is None:
+        analysis = DocumentAnalysis(text)
+    return analysis.references
 
 import layoutparser as lp
 import fitz  # PyMuPDF
 import os
 import json
+import threading
+import numpy as np
 from config_module import config
 
-def map_pdf_before_extraction(pdf_path, method='pdfplumber'):
+# Layout-parser model ayarları (PubLayNet tabanlı PaddleDetection modeli)
+LAYOUT_MODEL_CONFIG_PATH = "lp://PP-OCRv3/ppyolov2_r50vd_dcn_365e_publaynet_infer"
+LAYOUT_LABEL_MAP = {
+    0: "Text",
+    1: "Title",
+    2: "List",
+    3: "Table",
+    4: "Figure",
+    5: "Formula",
+    6: "Caption",
+    7: "Page-Number",
+    8: "Section-Header",
+    9: "Footnote",
+    10: "Body-Text"
+}
+
+# Süreç başına tek layout modeli (lazy); fork edilen işçi süreçler kendi modelini oluşturur
+_layout_model = None
+_layout_model_pid = None
+_layout_model_lock = threading.Lock()
+
+def get_layout_model():
+    """
+    Layout-parser tespit modelini süreç başına bir kez oluşturur ve sonraki çağrılarda aynı örneği döndürür.
+    Böylece N PDF'lik bir toplu işlemde model yükleme maliyeti işçi süreç başına yalnızca bir kez ödenir.
+
+    Returns:
+        lp.models.PaddleDetectionLayoutModel or None: Model; yüklenemezse None.
+    """
+    global _layout_model, _layout_model_pid
+    if _layout_model is not None and _layout_model_pid == os.getpid():
+        return _layout_model
+    with _layout_model_lock:
+        if _layout_model is None or _layout_model_pid != os.getpid():
+            try:
+                _layout_model = lp.models.PaddleDetectionLayoutModel(
+                    config_path=LAYOUT_MODEL_CONFIG_PATH,
+                    label_map=LAYOUT_LABEL_MAP
+                )
+                _layout_model_pid = os.getpid()
+                config.logger.info(f"Layout-parser modeli yüklendi (pid: {_layout_model_pid}).")
+            except Exception as e:
+                config.logger.error(f"Layout-parser model yüklenirken hata: {e}")
+                _layout_model = None
+                return None
+    return _layout_model
+
+def render_page_images(doc, dpi=None):
+    """
+    PDF sayfalarını sırayla, diske yazmadan NumPy görüntü dizisi olarak üretir (generator).
+
+    Görüntü, pixmap belleği üzerinde (mümkünse `samples_mv` ile kopyasız) oluşturulan (yükseklik, genişlik, 3)
+    boyutlu uint8 RGB dizidir. Dizi bir sonraki sayfaya geçilene kadar geçerlidir; böylece işçi başına
+    bellekte aynı anda yalnızca bir sayfa görüntüsü bulunur.
+
+    Args:
+        doc (fitz.Document): Açık PDF belgesi.
+        dpi (int, optional): Rasterleştirme çözünürlüğü (varsayılan: config.LAYOUT_DPI).
+
+    Yields:
+        tuple: (page_number, page, image) — page_number 0 tabanlıdır.
+    """
+    dpi = dpi or config.LAYOUT_DPI
+    zoom = dpi / 72
+    mat = fitz.Matrix(zoom, zoom)
+    for page_number in range(doc.page_count):
+        page = doc.load_page(page_number)
+        pix = page.get_pixmap(matrix=mat, alpha=False, colorspace=fitz.csRGB)
+        samples = getattr(pix, "samples_mv", None) or pix.samples
+        image = np.frombuffer(samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        yield page_number, page, image
+        del image, samples, pix
+
+def detect_layout_batch(model, images):
+    """
+    Birden fazla sayfa görüntüsünü layout dedektöründen tek bir çıkarım çağrısıyla geçirir.
+
+    PaddleDetection modelinde her görüntü `model.preprocess` ile hazırlanır, girdiler batch ekseninde
+    birleştirilir ve predictor bir kez çalıştırılır; çıktı kutuları `boxes_num` ile sayfalara bölünüp
+    `model.gather_output` ile sayfa başına Layout nesnesine dönüştürülür. Model bu arayüzü sunmuyorsa
+    veya girdi boyutları farklıysa sayfalar tek tek `model.detect` ile işlenir.
+
+    Args:
+        model: layout-parser tespit modeli.
+        images (list): Sayfa görüntüleri (NumPy dizileri).
+
+    Returns:
+        list: Her görüntü için Layout nesnesi (kutu bulunamayan sayfalar için boş Layout);
+              tespit başarısız olan sayfalar için None.
+    """
+    if len(images) > 1:
+        try:
+            inputs = [model.preprocess(model.image_loader(image)) for image in images]
+            input_names = model.predictor.get_input_names()
+            if all(inp[name].shape[1:] == inputs[0][name].shape[1:] for inp in inputs for name in input_names):
+                for name in input_names:
+                    model.predictor.get_input_handle(name).copy_from_cpu(
+                        np.concatenate([inp[name] for inp in inputs], axis=0)
+                    )
+                model.predictor.run()
+                output_names = model.predictor.get_output_names()
+                np_boxes = model.predictor.get_output_handle(output_names[0]).copy_to_cpu()
+                boxes_num = model.predictor.get_output_handle(output_names[1]).copy_to_cpu()
+                if len(boxes_num) == len(images):
+                    offsets = np.concatenate([[0], np.cumsum(boxes_num)]).astype(int)
+                    # Kutusu olmayan sayfanın dilimi (0, 6) boyutludur; model.detect'teki gibi boş Layout döner
+                    return [
+                        model.gather_output(np_boxes[offsets[i]:offsets[i + 1]]) if boxes_num[i] > 0 else lp.Layout()
+                        for i in range(len(images))
+                    ]
+        except Exception as e:
+            config.logger.warning(f"Batch düzen analizi kullanılamadı, sayfa bazlı tespite geçiliyor: {e}")
+
+    layouts = []
+    for image in images:
+        try:
+            layouts.append(model.detect(image))
+        except Exception as e:
+            config.logger.error(f"Düzen analizi hatası: {e}")
+            layouts.append(None)
+    return layouts
+
+def map_pdf_before_extraction(pdf_path, method='pdfplumber', dpi=None, batch_size=None):
   
 
     """
     PDF'den metin çıkarılmadan önce, layout-parser kullanarak bilimsel yayın yapısını analiz eder.
     
     Bu fonksiyon, PDF dosyasının her sayfasını inceler, sayfa boyutlarını ve blok yapılarını tespit eder 
-    ve bu bilgileri bir sözlük olarak döndürür.
+    ve bu bilgileri bir sözlük olarak döndürür. Sayfalar geçici PNG dosyası yerine bellekte
+    NumPy dizisi olarak rasterleştirilir (`render_page_images`).
     
     Args:
         pdf_path (str or Path): PDF dosyasının yolu.
         method (str): Bu parametre gelecekte farklı metot seçenekleri için kullanılabilir; 
                       şimdilik layout-parser ile çalışıyor (varsayılan "pdfplumber" değeri korunuyor).
+        dpi (int, optional): Rasterleştirme çözünürlüğü (varsayılan: config.LAYOUT_DPI). Blok koordinatları
+                      bu çözünürlükteki piksel cinsindendir; PDF noktasına çevirmek için 72 / dpi ile çarpılır.
+        batch_size (int, optional): Dedektöre birlikte verilecek sayfa sayısı (varsayılan: config.LAYOUT_BATCH_SIZE).
+                      Bellekte aynı anda en fazla bu kadar sayfa görüntüsü tutulur.
     
     Returns:
         dict or None: PDF'nin layout analizi bilgilerini içeren sözlük; hata durumunda None.
     """
-    # Layout-parser modelini yükle
-    try:
-        model = lp.models.PaddleDetectionLayoutModel(
-            config_path="lp://PP-OCRv3/ppyolov2_r50vd_dcn_365e_publaynet_infer",
-            label_map={
-                0: "Text",
-                1: "Title",
-                2: "List",
-                3: "Table",
-                4: "Figure",
-                5: "Formula",
-                6: "Caption",
-                7: "Page-Number",
-                8: "Section-Header",
-                9: "Footnote",
-                10: "Body-Text"
-            }
-        )
-    except Exception as e:
-        config.logger.error(f"Layout-parser model yüklenirken hata: {e}")
+    # Layout-parser modeli (süreç başına bir kez yüklenir)
+    model = get_layout_model()
+    if model is None:
         return None
 
+    dpi = dpi or config.LAYOUT_DPI
     try:
         doc = fitz.open(pdf_path)
     except Exception as e:
@@ -168,52 +578,41 @@ def map_pdf_before_extraction(pdf_path, method='pdfplumber'):
         return None
 
     layout_info = []
+    batch_size = max(1, batch_size or config.LAYOUT_BATCH_SIZE)
+    pending = []  # (page_number, dimensions, image)
 
-    for page_number in range(doc.page_count):
-        try:
-            page = doc.load_page(page_number)
-            page_rect = page.rect
-            # Yüksek çözünürlük (DPI 300) için ölçeklendirme
-            zoom = 300 / 72
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat)
-            temp_img_path = f"temp_page_{page_number}.png"
-            pix.save(temp_img_path)
-
-            # Geçici görüntü dosyasını layout-parser için yükle
-            try:
-                image = lp.io.read(temp_img_path)
-            except Exception as e:
-                config.logger.error(f"Sayfa {page_number+1} için görüntü yüklenirken hata: {e}")
-                os.remove(temp_img_path)
+    def _flush():
+        # Biriken sayfalar tek seferde tespit edilir ve sayfa sırasıyla eklenir
+        layouts = detect_layout_batch(model, [image for _, _, image in pending])
+        for (page_number, dimensions, _), layout in zip(pending, layouts):
+            if layout is None:
+                config.logger.error(f"Sayfa {page_number+1} düzen analizi başarısız.")
                 continue
-
-            # Layout analizi: Blokları tespit et
-            try:
-                layout = model.detect(image)
-            except Exception as e:
-                config.logger.error(f"Sayfa {page_number+1} düzen analizi hatası: {e}")
-                os.remove(temp_img_path)
-                continue
-
-            blocks = []
-            for block in layout:
-                blocks.append({
-                    "type": block.type,
-                    "coordinates": block.coordinates,
-                    "score": block.score
-                })
-
-            page_info = {
+            layout_info.append({
                 "page_number": page_number + 1,
-                "dimensions": {"width": page_rect.width, "height": page_rect.height},
-                "blocks": blocks
-            }
-            layout_info.append(page_info)
-            os.remove(temp_img_path)
-        except Exception as e:
-            config.logger.error(f"Sayfa {page_number+1} işlenirken hata: {e}")
-            continue
+                "dimensions": dimensions,
+                "dpi": dpi,
+                "blocks": [
+                    {"type": block.type, "coordinates": block.coordinates, "score": block.score}
+                    for block in layout
+                ]
+            })
+        pending.clear()
+
+    try:
+        for page_number, page, image in render_page_images(doc, dpi=dpi):
+            # Görüntü bir sonraki sayfada geçersizleşeceği için batch > 1 ise kopyalanır
+            if batch_size > 1:
+                image = image.copy()
+            pending.append((page_number, {"width": page.rect.width, "height": page.rect.height}, image))
+            if len(pending) >= batch_size:
+                _flush()
+        if pending:
+            _flush()
+    except Exception as e:
+        config.logger.error(f"Sayfa görüntüsü oluşturulurken hata: {e}")
+    finally:
+        doc.close()
 
     return {"layout": layout_info}
 
@@ -0,0 +1,392 @@
+import queue
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from config_module import config
+from processing_manager import IslemYoneticisi, belge_metnini_cikar
+from manifest_module import ProcessingManifest
+from work_queue_module import work_queue, is_anahtari, dosya_yolunu_coz
+from helper_module import eski_stack_tasi
+
+_SON = object()  # Aşama işçilerine "kuyruk bitti" sinyali
+
+
+class _Asama:
+    """
+    📌 Pipeline'daki tek bir aşama: kendi işçi havuzu, girdi kuyruğu ve (varsa) çıktı kuyruğu.
+    İşçiler girdi kuyruğundan öğe alır, `fonksiyon` ile işler ve sonucu bir sonraki kuyruğa koyar.
+    Çıktı kuyruğu sınırlı olduğundan, sonraki aşama yavaşsa `put` bloklanır (backpressure).
+    """
+
+    def __init__(self, ad, fonksiyon, isci_sayisi, girdi, cikti, hata_bildir):
+        self.ad = ad
+        self.fonksiyon = fonksiyon
+        self.isci_sayisi = max(1, int(isci_sayisi))
+        self.girdi = girdi
+        self.cikti = cikti
+        self.hata_bildir = hata_bildir
+        self.islenen = 0
+        self.sure = 0.0
+        self._lock = threading.Lock()
+        self._thread_listesi = []
+
+    def baslat(self):
+        for i in range(self.isci_sayisi):
+            t = threading.Thread(target=self._calis, name=f"{self.ad}-{i}", daemon=True)
+            t.start()
+            self._thread_listesi.append(t)
+
+    def _calis(self):
+        while True:
+            oge = self.girdi.get()
+            if oge is _SON:
+                break
+            start = time.perf_counter()
+            try:
+                sonuc = self.fonksiyon(oge)
+            except Exception as e:
+                self.hata_bildir(self.ad, oge, e)
+                continue
+            finally:
+                with self._lock:
+                    self.islenen += 1
+                    self.sure += time.perf_counter() - start
+            if sonuc is not None and self.cikti is not None:
+                self.cikti.put(sonuc)
+
+    def bitir(self):
+        """
+        📌 Tüm işçilere bitiş sinyali gönderir ve kuyruktaki işler tükenene kadar bekler.
+        """
+        for _ in self._thread_listesi:
+            self.girdi.put(_SON)
+        for t in self._thread_listesi:
+            t.join()
+
+
+class BatchPipeline:
+    """
+    📌 **Tüm kütüphaneyi işlemek için aşamalı, sınırlı kuyruklu batch pipeline.**
+
+    Aşamalar `IslemYoneticisi` üzerine kuruludur ve birbirine sınırlı (`queue_size`) kuyruklarla bağlanır:
+      1️⃣ **Çıkarma (CPU):** `belge_metnini_cikar` süreç havuzunda çalışır.
+      2️⃣ **Zotero (ağ):** `IslemYoneticisi.zotero_zenginlestir`
+      3️⃣ **Embedding (ağ/CPU):** `IslemYoneticisi.embedding_olustur`
+      4️⃣ **Kaydetme (disk):** `IslemYoneticisi.sonuc_kaydet` (ChromaDB yazımı tek yazıcı thread'inde, toplu)
+
+    Her aşamanın işçi sayısı ayrı ayarlanır; böylece CPU ve ağ aynı anda doyurulurken,
+    bellekte en fazla (kuyruk boyutu × aşama sayısı + işçi sayısı) kadar doküman tutulur.
+
+    `ProcessingManifest` sayesinde yeniden çalıştırmada yalnızca yeni/değişmiş dosyalar ve
+    ayarı değişmiş aşamalar işlenir; diğer aşamaların çıktıları kayıtlı sonuçlardan okunur.
+    Embedding ve kaydetme aşamaları ancak dosyanın tüm chunk'ları ChromaDB'ye yazıldığında "done"
+    olur; eksik embedding'li veya yazılamayan chunk'ı olan dosyalar "failed" işaretlenir ve
+    sonraki çalıştırmada yeniden işlenir.
+
+    Dosyalar iş kuyruğuna (`work_queue`, anahtar: çözümlenmiş yol) eklenir ve çıkarma aşaması
+    `claim` ile kiralanan işlerle beslenir; işlenen dosyaların kiraları arka planda `heartbeat` ile
+    uzatılır. Böylece çöken bir sürecin işleri kira süresi dolunca (veya `recover` ile) başka bir
+    çalıştırmada yeniden alınır; önceki çalıştırmalardan kalan pending işler de işlenir.
+
+    Örnek:
+        pipeline = BatchPipeline(IslemYoneticisi())
+        ozet = pipeline.run(config.STORAGE_DIR)
+    """
+
+    DESTEKLENEN_UZANTILAR = (".pdf", ".txt")
+
+    def __init__(self, islem_yoneticisi=None, extract_workers=None, zotero_workers=None,
+                 embed_workers=None, save_workers=None, queue_size=None, manifest=None):
+        self.islem_yoneticisi = islem_yoneticisi or IslemYoneticisi()
+        self.manifest = manifest or ProcessingManifest()
+        self.extract_workers = extract_workers or config.PIPELINE_EXTRACT_WORKERS
+        self.zotero_workers = zotero_workers or config.PIPELINE_ZOTERO_WORKERS
+        self.embed_workers = embed_workers or config.PIPELINE_EMBED_WORKERS
+        self.save_workers = save_workers or config.PIPELINE_SAVE_WORKERS
+        self.queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+        self.hatalar = []
+        self.basarili = 0
+        self.atlanan = 0
+        self.kurtarilan = 0
+        self._hata_lock = threading.Lock()
+        self._aktif = set()  # Bu çalıştırmada kiralanmış, henüz bitmemiş iş anahtarları
+        self._ertelenen = set()  # Bu çalıştırmada yeniden kiralanmayacak iş anahtarları (başarısız veya bırakılmış)
+        self._isleniyor = {}  # İşlenen içerik hash'i -> ilk kopyanın bitmesini bekleyen aynı içerikli iş anahtarları
+        self._is_hash = {}  # İşlenen iş anahtarı -> içerik hash'i
+        self._tamamlanan_hashler = set()
+        self._basarisiz_hashler = set()
+        self._aktif_lock = threading.Lock()
+
+    def _is_bitir(self, key, basarili, hata=None):
+        """
+        📌 Kiralanan işi kuyrukta done veya failed (deneme hakkı kaldıysa pending) olarak işaretler.
+        Başarısız iş bu çalıştırmada yeniden kiralanmaz; pending kalırsa sonraki çalıştırmada denenir.
+        Aynı içeriğin ilk kopyasını bekleyen işler, ilk kopya başarılıysa done yapılır (atlanan);
+        başarısızsa işlenmeden pending'e bırakılır.
+        """
+        with self._aktif_lock:
+            self._aktif.discard(key)
+            content_hash = self._is_hash.pop(key, None)
+            kopyalar = self._isleniyor.pop(content_hash, []) if content_hash else []
+            self._aktif.difference_update(kopyalar)
+            if basarili:
+                if content_hash:
+                    self._tamamlanan_hashler.add(content_hash)
+                self.atlanan += len(kopyalar)
+            else:
+                self._ertelenen.add(key)
+                self._ertelenen.update(kopyalar)
+                if content_hash:
+                    self._basarisiz_hashler.add(content_hash)
+        if basarili:
+            work_queue.tamamla(key)
+            for kopya in kopyalar:
+                work_queue.tamamla(kopya)
+        else:
+            work_queue.basarisiz(key, hata)
+            for kopya in kopyalar:
+                work_queue.birak(kopya)
+
+    def _kaynaga_al(self, key, content_hash, plan):
+        """
+        📌 Kiralanan işin ne olacağına karar verir (kaynak döngüsünde çağrılır).
+
+        Returns:
+            str: "isle" (ilk kopya, pipeline'a verilir), "atla" (manifestoya göre güncel veya aynı içerik
+                 bu çalıştırmada başarıyla işlendi), "bekle" (ilk kopya hâlâ işleniyor; sonucu `_is_bitir`'de uygulanır) veya
+                 "birak" (ilk kopya başarısız oldu; iş pending'e bırakılır).
+        """
+        with self._aktif_lock:
+            if not plan or content_hash in self._tamamlanan_hashler:
+                self.atlanan += 1
+                return "atla"
+            if content_hash in self._basarisiz_hashler:
+                self._ertelenen.add(key)
+                return "birak"
+            self._aktif.add(key)
+            if content_hash in self._isleniyor:
+                self._isleniyor[content_hash].append(key)
+                return "bekle"
+            self._isleniyor[content_hash] = []
+            self._is_hash[key] = content_hash
+            return "isle"
+
+    def _kira_yenile(self, dur):
+        """
+        📌 Aktif işlerin kiralarını kira süresinin üçte birinde bir uzatır (ayrı thread'de çalışır).
+        """
+        aralik = max(1.0, work_queue.lease_seconds / 3)
+        while not dur.wait(aralik):
+            with self._aktif_lock:
+                keys = list(self._aktif)
+            if not keys:
+                continue
+            try:
+                uzatilan = set(work_queue.heartbeat_coklu(keys))
+            except Exception as e:
+                config.logger.error(f"❌ İş kirası uzatılamadı: {e}")
+                continue
+            kaybedilen = [k for k in keys if k not in uzatilan]
+            if kaybedilen:
+                config.logger.warning(f"⚠️ {len(kaybedilen)} işin kirası başka bir işçiye geçmiş: {kaybedilen[:3]}")
+
+    def _yazim_tamamlandi(self, result, bilet):
+        """
+        📌 Dosyanın ChromaDB yazımı bittiğinde (yazıcı thread'inde) embedding/kaydetme aşamalarını işaretler.
+        """
+        embeddingler = result.get("chunk_embeddings")
+        eksik = [i for i, v in enumerate(embeddingler) if v is None] if embeddingler is not None else []
+        hatalar = []
+        if eksik:
+            hatalar.append(f"{len(eksik)}/{len(embeddingler)} chunk embedding'i oluşturulamadı")
+        if bilet.basarisiz_ids:
+            hatalar.append(f"{len(bilet.basarisiz_ids)} chunk ChromaDB'ye yazılamadı")
+        if hatalar:
+            hata = "; ".join(hatalar)
+            for asama in ("embedding", "kaydetme"):
+                if asama in result["_plan"]:
+                    self.manifest.isaretle(result["_hash"], asama, "failed", dosya=result["dosya"], hata=hata)
+            with self._hata_lock:
+                self.hatalar.append({"asama": "kaydetme", "dosya": result["dosya"], "hata": hata})
+            self.islem_yoneticisi.sayac_artir('hata')
+            self._is_bitir(result["_is_anahtari"], False, hata)
+            config.logger.error(f"❌ Pipeline [kaydetme] {result['dosya']}: {hata}")
+            return
+        for asama in ("embedding", "kaydetme"):
+            if asama in result["_plan"]:
+                self.manifest.isaretle(result["_hash"], asama, "done", dosya=result["dosya"])
+        self._is_bitir(result["_is_anahtari"], True)
+        self.islem_yoneticisi.sayac_artir('başarılı')
+        with self._hata_lock:
+            self.basarili += 1
+
+    def _hata_bildir(self, asama, oge, hata):
+        dosya = Path(oge.get("dosya_yolu", "")).name if isinstance(oge, dict) else oge
+        with self._hata_lock:
+            self.hatalar.append({"asama": asama, "dosya": dosya, "hata": str(hata)})
+        if isinstance(oge, dict) and "_hash" in oge:
+            self.manifest.isaretle(oge["_hash"], asama, "failed", dosya=dosya, hata=str(hata))
+        if isinstance(oge, dict) and "_is_anahtari" in oge:
+            self._is_bitir(oge["_is_anahtari"], False, str(hata))
+        self.islem_yoneticisi.sayac_artir('hata')
+        config.logger.error(f"❌ Pipeline [{asama}] {dosya} işlenirken hata: {hata}")
+
+    def dosyalari_bul(self, directory):
+        """
+        📌 Dizindeki (alt dizinler dahil) desteklenen dosyaları listeler.
+        """
+        return sorted(
+            p for p in Path(directory).rglob("*")
+            if p.is_file() and p.suffix.lower() in self.DESTEKLENEN_UZANTILAR
+        )
+
+    def run(self, directory):
+        """
+        📌 **Dizindeki tüm PDF/TXT dosyalarını aşamalı pipeline ile işler.**
+
+        Args:
+            directory (str or Path): İşlenecek dosyaların bulunduğu dizin.
+
+        Returns:
+            dict: {"toplam": ..., "başarılı": ..., "atlanan": ..., "kurtarilan": ..., "hata": ..., "sure": ...,
+                   "asamalar": {...}, "hatalar": [...]}
+                  ("kurtarilan": dizinde olmayıp önceki çalıştırmalardan kuyrukta kalan işler)
+        """
+        dosyalar = self.dosyalari_bul(directory)
+        yonetici = self.islem_yoneticisi
+        eski_stack_tasi()  # Eski JSON stack dosyası varsa kayıtları kuyruğa taşınır
+        work_queue.recover()  # Önceki çalıştırmada çökme nedeniyle yarım kalan işler
+        manifest = self.manifest
+        yonetici.sayaçlar['toplam'] += len(dosyalar)
+        config.logger.info(
+            f"🚀 BatchPipeline başladı: {len(dosyalar)} dosya "
+            f"(çıkarma={self.extract_workers}, zotero={self.zotero_workers}, "
+            f"embedding={self.embed_workers}, kaydetme={self.save_workers}, kuyruk={self.queue_size})"
+        )
+
+        kuyruklar = [queue.Queue(maxsize=self.queue_size) for _ in range(4)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.extract_workers) as havuz:
+            def cikar(is_):
+                dosya_yolu = is_["dosya_yolu"]
+                result = None if "cikarma" in is_["_plan"] else yonetici.kayitli_sonucu_yukle(dosya_yolu)
+                if result is not None:
+                    result.update(manifest.cikti(is_["_hash"], "cikarma") or {})
+                if result is None:
+                    # Thread havuzu süreç havuzunu besler; thread sayısı süreç sayısına eşit olduğundan
+                    # aynı anda en fazla `extract_workers` doküman çıkarılır.
+                    result = havuz.submit(belge_metnini_cikar, dosya_yolu).result()
+                    if result is None:
+                        raise ValueError(f"Desteklenmeyen dosya: {dosya_yolu.name}")
+                    if "cikarma" not in is_["_plan"]:
+                        is_["_plan"] = ["cikarma"] + is_["_plan"]
+                result.update(is_)
+                return result
+
+            def zotero(result):
+                kayitli = None if "zotero" in result["_plan"] else manifest.cikti(result["_hash"], "zotero")
+                if kayitli is None:
+                    return yonetici.zotero_zenginlestir(result)
+                result.update(kayitli)
+                return result
+
+            def embedding(result):
+                if "embedding" in result["_plan"]:
+                    return yonetici.embedding_olustur(result)
+                # Embedding ayarları değişmedi: vektörler koleksiyonda zaten güncel
+                result["chunk_embeddings"] = None
+                return result
+
+            def kaydet(result):
+                yonetici.sonuc_kaydet(result, geri_cagri=lambda bilet: self._yazim_tamamlandi(result, bilet))
+                # Çıkarma ve Zotero çıktıları diske/metadata deposuna eşzamanlı yazıldı; embedding ve
+                # kaydetme aşamaları ChromaDB yazımı onaylandığında `_yazim_tamamlandi` içinde işaretlenir.
+                for asama in result["_plan"]:
+                    if asama == "zotero":
+                        cikti = {"dosya_id": result["dosya_id"], "zotero_meta": result["zotero_meta"]}
+                    elif asama == "cikarma":
+                        cikti = {"bolum_konumlari": result.get("bolum_konumlari") or []}
+                    else:
+                        continue
+                    manifest.isaretle(result["_hash"], asama, "done", dosya=result["dosya"], cikti=cikti)
+                return None
+
+            asamalar = [
+                _Asama("cikarma", cikar, self.extract_workers, kuyruklar[0], kuyruklar[1], self._hata_bildir),
+                _Asama("zotero", zotero, self.zotero_workers, kuyruklar[1], kuyruklar[2], self._hata_bildir),
+                _Asama("embedding", embedding, self.embed_workers, kuyruklar[2], kuyruklar[3], self._hata_bildir),
+                _Asama("kaydetme", kaydet, self.save_workers, kuyruklar[3], None, self._hata_bildir),
+            ]
+            for asama in asamalar:
+                asama.baslat()
+
+            # Manifestoya göre tüm aşamaları güncel olan dosyalar kuyruğa hiç eklenmez
+            kesfedilen = set()
+            eklenecek = []
+            for dosya_yolu in dosyalar:
+                key = is_anahtari(dosya_yolu)
+                kesfedilen.add(key)
+                if manifest.gerekli_asamalar(manifest.dosya_hash(dosya_yolu)):
+                    eklenecek.append(key)
+                else:
+                    self.atlanan += 1
+            work_queue.enqueue(eklenecek, yeniden=True)
+
+            dur = threading.Event()
+            kira_thread = threading.Thread(target=self._kira_yenile, args=(dur,), name="is-kirasi", daemon=True)
+            kira_thread.start()
+            try:
+                # Kaynak: kuyruktan kiralanan işler (önceki çalıştırmalardan kalanlar dahil) ilk aşamaya verilir;
+                # ilk kuyruk dolduğunda burada beklenir (backpressure). Aynı içeriğin kopyaları işlenmez;
+                # ilk kopyanın sonucuna göre done yapılır veya pending'e bırakılır (bkz. `_kaynaga_al`).
+                while True:
+                    with self._aktif_lock:
+                        haric = list(self._ertelenen)
+                    isler = work_queue.claim(limit=self.queue_size, haric=haric)
+                    if not isler:
+                        break
+                    for key, _ in isler:
+                        if key not in kesfedilen:
+                            self.kurtarilan += 1
+                        dosya_yolu = dosya_yolunu_coz(key)
+                        if dosya_yolu is None:
+                            self._is_bitir(key, False, "dosya bulunamadı")
+                            continue
+                        content_hash = manifest.dosya_hash(dosya_yolu)
+                        plan = manifest.gerekli_asamalar(content_hash)
+                        karar = self._kaynaga_al(key, content_hash, plan)
+                        if karar == "atla":
+                            work_queue.tamamla(key)
+                            continue
+                        if karar == "birak":
+                            work_queue.birak(key)
+                            continue
+                        if karar == "bekle":
+                            continue
+                        kuyruklar[0].put({"dosya_yolu": dosya_yolu, "_hash": content_hash, "_plan": plan, "_is_anahtari": key})
+
+                # Aşamalar sırayla kapatılır: bir aşama bittiğinde sonraki aşamanın girdisi de tamamlanmış olur
+                for asama in asamalar:
+                    asama.bitir()
+                yonetici.chroma_writer.bosalt()  # Son tamponu da ChromaDB'ye yaz
+            finally:
+                dur.set()
+                kira_thread.join()
+
+        sure = time.perf_counter() - start
+        ozet = {
+            "toplam": len(dosyalar) + self.kurtarilan,
+            "başarılı": self.basarili,
+            "atlanan": self.atlanan,
+            "kurtarilan": self.kurtarilan,
+            "hata": len(self.hatalar),
+            "sure": round(sure, 2),
+            "asamalar": {
+                a.ad: {"islenen": a.islenen, "isci": a.isci_sayisi, "ortalama_sure": round(a.sure / a.islenen, 3) if a.islenen else 0.0}
+                for a in asamalar
+            },
+            "hatalar": list(self.hatalar)
+        }
+        config.logger.info(f"✅ BatchPipeline tamamlandı: {ozet['toplam']} dosya, {ozet['atlanan']} atlandı, {ozet['hata']} hata, {ozet['sure']} sn.")
+        return ozet
@@ -1,14 +1,11 @@
 
-b.py
-import os
-import re
+import json
+import bisect
 import threading
 from datetime import datetime
 from pathlib import Path
-import multiprocessing
-from tqdm import tqdm
+import numpy as np
 import chromadb
-from openai import OpenAI
 
 from config_module import config
 from zotero_module import ZoteroEntegratoru  # Zotero modülü entegrasyonu
@@ -16,11 +13,84 @@ from pdf_processing import (
     extract_text_from_pdf,
     reflow_columns,
     map_pdf_before_extraction,  # Yeni adlandırma
+    map_scientific_sections_extended,
     detect_columns,
-    extract_references_enhanced  # Referans çıkarma
+    extract_references_enhanced,  # Referans çıkarma
+    DocumentAnalysis  # Tek geçişlik paylaşılan analiz bağlamı
 )
-from embedding_module import embed_text
-from helper_module import stack_yukle, stack_guncelle, shorten_title
+from embedding_module import EmbeddingManager, split_text_with_offsets
+from chroma_writer_module import ChromaBatchWriter, YazmaBileti
+from metadata_store_module import metadata_store
+from bm25_index_module import bm25_index
+from file_save_module import save_clean_text_files, save_json_file
+from alternative_embedding_module import preload
+from helper_module import stack_guncelle, shorten_title
+
+def belge_metnini_cikar(dosya_yolu):
+    """
+    📌 **Metin çıkarma ve analiz aşaması (CPU).**
+    PDF için yapısal haritalama + metin çıkarma, TXT için doğrudan okuma yapılır; ardından
+    metin tek akışa dönüştürülür ve bölüm/sütun/kaynakça analizi paylaşılan `DocumentAnalysis`
+    bağlamıyla tek geçişte tamamlanır. Modül seviyesinde tanımlıdır, böylece süreç havuzunda çalışabilir.
+
+    Args:
+        dosya_yolu (Path): İşlenecek PDF veya TXT dosyası.
+
+    Returns:
+        dict veya None: Çıkarılan metin ve analiz sonuçları; desteklenmeyen uzantıda None.
+    """
+    dosya_yolu = Path(dosya_yolu)
+    ext = dosya_yolu.suffix.lower()
+    if ext == ".pdf":
+        # 📌 **PDF için işlem akışı**
+        harita = map_pdf_before_extraction(dosya_yolu, method=config.PDF_TEXT_EXTRACTION_METHOD)
+        ham_metin = extract_text_from_pdf(dosya_yolu, method=config.PDF_TEXT_EXTRACTION_METHOD)
+    elif ext == ".txt":
+        # 📌 **TXT için işlem akışı**
+        with open(dosya_yolu, "r", encoding="utf-8") as f:
+            ham_metin = f.read()
+        harita = None
+    else:
+        config.logger.error(f"❌ Desteklenmeyen dosya uzantısı: {dosya_yolu}")
+        return None
+
+    if not ham_metin:
+        raise ValueError("❌ Ham metin çıkarılamadı.")
+
+    # 📌 **Paylaşılan analiz bağlamı**: satırlar, bölüm indeksleri ve kaynakça bloğu bir kez hesaplanır
+    analiz = DocumentAnalysis(ham_metin)
+
+    # 📌 **Metni tek akışa dönüştürme**
+    temiz_metin = reflow_columns(ham_metin)
+
+    # 📌 **Bilimsel bölümlerin haritalanması**
+    bolum_haritasi = map_scientific_sections_extended(ham_metin, analysis=analiz)
+    if harita is None:
+        # TXT dosyalarında yapısal harita, bölüm haritasının kendisidir (ikinci kez hesaplanmaz)
+        harita = bolum_haritasi
+
+    # 📌 **Sütun yapısı tespiti**
+    sutun_bilgisi = detect_columns(ham_metin, analysis=analiz)
+
+    # 📌 **Kaynakça çıkarımı**
+    try:
+        references = extract_references_enhanced(ham_metin, analysis=analiz)
+    except Exception as e:
+        config.logger.error(f"❌ Kaynakça çıkarım hatası: {e}")
+        references = []
+
+    return {
+        "dosya": dosya_yolu.name,
+        "dosya_yolu": str(dosya_yolu),
+        "ham_metin": ham_metin,
+        "temiz_metin": temiz_metin,
+        "harita": harita,
+        "bolum_haritasi": bolum_haritasi,
+        # Bölüm başlıklarının temiz metindeki konumları (chunk'lara bölüm etiketi vermek için)
+        "bolum_konumlari": analiz.section_positions_in(temiz_metin),
+        "sutun_bilgisi": sutun_bilgisi,
+        "kaynakca": references
+    }
 
 class IslemYoneticisi:
     """
@@ -36,14 +106,14 @@ class IslemYoneticisi:
          - Dosya doğrudan okunur.
          - `map_scientific_sections_extended` ile bölümler haritalanır.
       5️⃣ **Metin tek akışa dönüştürülür (`reflow_columns`).**
-      6️⃣ **Bilimsel bölümler (`map_scientific_sections_extended`) yeniden tespit edilir.**
-      7️⃣ **Sütun yapısı (`detect_columns`) belirlenir.**
-      8️⃣ **Kaynakça (`extract_references_enhanced`) çıkarılır.**
+      6️⃣ **Bilimsel bölümler (`map_scientific_sections_extended`) paylaşılan `DocumentAnalysis` bağlamından alınır.**
+      7️⃣ **Sütun yapısı (`detect_columns`) aynı bağlamdan belirlenir.**
+      8️⃣ **Kaynakça (`extract_references_enhanced`) aynı bağlamdan çıkarılır.**
       9️⃣ **Zotero entegrasyonu:**
-         - `dokuman_id_al` ile temel dosya ID'si alınır.
+         - `dokuman_id_al` ile ek anahtar dizininden ana öğe anahtarı çözülür.
          - `shorten_title` ile kısaltılır.
-         - `fetch_zotero_metadata` ile bibliyografik veriler çekilir.
-     🔟 **Embedding oluşturma (`embed_text`).**
+         - `fetch_zotero_metadata` ile bibliyografik veriler çekilir (anahtar çözülemezse atlanır).
+     🔟 **Embedding oluşturma (`EmbeddingManager.embed_batch`, chunk bazlı).**
      🔟 **İşlenen veriler kaydedilir.**
      🔟 **Stack'ten kaldırılır ve sayaçlar güncellenir.**
 
@@ -51,102 +121,201 @@ class IslemYoneticisi:
     """
 
     def __init__(self):
-        self.stack_lock = threading.Lock()
+        self.sayac_lock = threading.Lock()
         self.kume_sonuclari = []
         self.sayaçlar = {'toplam': 0, 'başarılı': 0, 'hata': 0}
 
         # ChromaDB bağlantısı ve koleksiyonlarının oluşturulması
         self.chroma_client = chromadb.PersistentClient(path="chroma_db")
         self.koleksiyon = self.chroma_client.get_or_create_collection(name="pdf_embeddings")
-        self.zotero_koleksiyon = self.chroma_client.get_or_create_collection(name="zotero_meta")
+        # Zotero metadata'sı vektör koleksiyonuna değil, dosya_id anahtarlı yan depoya yazılır
+        self.metadata_store = metadata_store
+        # Koleksiyona yalnızca bu yazıcının thread'i yazar (dosyalar arası toplu upsert)
+        self.chroma_writer = ChromaBatchWriter(self.koleksiyon, client=self.chroma_client)
+        self.embedding_manager = EmbeddingManager()
         self.zotero = ZoteroEntegratoru()
         self.secili_dosya = None
 
+        # Alternatif embedding modellerinin önceden yüklenmesi (PRELOAD_MODELS)
+        if config.PRELOAD_MODELS:
+            preload(config.PRELOAD_MODELS)
+
     def pdf_txt_isle(self, dosya_yolu):
         """
         📌 **Bir PDF veya TXT dosyasını işler ve tüm verileri çıkarır.**
+        Aşamalar (`belge_metnini_cikar` → `zotero_zenginlestir` → `embedding_olustur`) sırayla çalıştırılır;
+        aynı aşamalar `BatchPipeline` tarafından eşzamanlı olarak da kullanılır.
         """
         try:
             # İşleme başlamadan önce stack güncellemesi
-            self.stack_guncelle(dosya_yolu.name, "ekle")
+            self.stack_guncelle(dosya_yolu, "ekle")
             config.logger.info(f"📄 {dosya_yolu.name} işleme başladı.")
 
-            ext = dosya_yolu.suffix.lower()
-            if ext == ".pdf":
-                # 📌 **PDF için işlem akışı**
-                harita = map_pdf_before_extraction(dosya_yolu, method=config.PDF_TEXT_EXTRACTION_METHOD)
-                ham_metin = extract_text_from_pdf(dosya_yolu, method=config.PDF_TEXT_EXTRACTION_METHOD)
-            elif ext == ".txt":
-                # 📌 **TXT için işlem akışı**
-                with open(dosya_yolu, "r", encoding="utf-8") as f:
-                    ham_metin = f.read()
-                harita = map_scientific_sections_extended(ham_metin)
-            else:
-                config.logger.error(f"❌ Desteklenmeyen dosya uzantısı: {dosya_yolu}")
+            result = belge_metnini_cikar(dosya_yolu)
+            if result is None:
                 return None
-
-            if not ham_metin:
-                raise ValueError("❌ Ham metin çıkarılamadı.")
-
-            # 📌 **Metni tek akışa dönüştürme**
-            temiz_metin = reflow_columns(ham_metin)
-
-            # 📌 **Bilimsel bölümlerin haritalanması**
-            bolum_haritasi = map_scientific_sections_extended(ham_metin)
-
-            # 📌 **Sütun yapısı tespiti**
-            sutun_bilgisi = detect_columns(ham_metin)
-
-            # 📌 **Kaynakça çıkarımı**
-            try:
-                references = extract_references_enhanced(ham_metin)
-            except Exception as e:
-                config.logger.error(f"❌ Kaynakça çıkarım hatası: {e}")
-                references = []
-
-            # 📌 **Zotero entegrasyonu**
-            dosya_id = self.zotero.dokuman_id_al(dosya_yolu.name)
-            if not dosya_id:
-                dosya_id = dosya_yolu.stem
-            dosya_id = shorten_title(dosya_id, max_length=80)
-            zotero_meta = self.zotero.fetch_zotero_metadata(dosya_id)
-
-            # 📌 **Embedding oluşturma**
-            embedding = embed_text(temiz_metin)
-
-            # 📌 **Sonuç sözlüğü hazırlanıyor**
-            result = {
-                "dosya": dosya_yolu.name,
-                "ham_metin": ham_metin,
-                "temiz_metin": temiz_metin,
-                "harita": harita,
-                "bolum_haritasi": bolum_haritasi,
-                "sutun_bilgisi": sutun_bilgisi,
-                "kaynakca": references,
-                "zotero_meta": zotero_meta,
-                "embedding": embedding,
-                "islem_tarihi": datetime.now().isoformat()
-            }
+            result = self.zotero_zenginlestir(result)
+            result = self.embedding_olustur(result)
 
             # 📌 **Stack güncelleme ve sayaç artırma**
-            self.stack_guncelle(dosya_yolu.name, "sil")
-            self.sayaçlar['başarılı'] += 1
+            self.stack_guncelle(dosya_yolu, "sil")
+            self.sayac_artir('başarılı')
             config.logger.info(f"✅ {dosya_yolu.name} başarıyla işlendi.")
             return result
         except Exception as e:
-            self.sayaçlar['hata'] += 1
+            self.sayac_artir('hata')
+            self.stack_guncelle(dosya_yolu, "hata")
             config.logger.error(f"❌ {dosya_yolu.name} işlenirken hata: {e}", exc_info=True)
             return None
 
-    def stack_guncelle(self, dosya_adi, islem):
+    def zotero_zenginlestir(self, result):
+        """
+        📌 **Zotero aşaması (ağ):** Dosya ID'sini belirler ve bibliyografik metadatayı ekler.
+        Dosya, ek anahtar dizininde (storage klasörü / dosya adı) çözülemezse ağ isteği yapılmaz.
+
+        Args:
+            result (dict): `belge_metnini_cikar` çıktısı.
+
+        Returns:
+            dict: "dosya_id" ve "zotero_meta" alanları eklenmiş sonuç.
+        """
+        dosya_adi = result["dosya"]
+        item_key = self.zotero.dokuman_id_al(result.get("dosya_yolu", dosya_adi))
+        result["dosya_id"] = shorten_title(item_key or Path(dosya_adi).stem, max_length=80)
+        result["zotero_meta"] = self.zotero.fetch_zotero_metadata(item_key) if item_key else None
+        return result
+
+    def embedding_olustur(self, result):
+        """
+        📌 **Embedding aşaması (ağ/CPU):** Temiz metni `CHUNK_SIZE` kelimelik parçalara böler ve
+        parçaların embedding'lerini `EmbeddingManager.embed_batch` ile toplu olarak oluşturur.
+        Doküman embedding'i, başarılı chunk vektörlerinin ortalamasıdır. Her chunk için temiz metindeki
+        karakter aralığı, içinde başladığı bilimsel bölüm ve embedding modeli de kaydedilir.
+
+        Args:
+            result (dict): Zotero aşamasından gelen sonuç.
+
+        Returns:
+            dict: "chunks", "chunk_araliklari", "chunk_bolumleri", "chunk_modelleri", "chunk_embeddings",
+            "embedding" ve "islem_tarihi" alanları eklenmiş sonuç.
+        """
+        temiz_metin = result["temiz_metin"]
+        parcalar = split_text_with_offsets(temiz_metin, chunk_size=config.CHUNK_SIZE)
+        chunks = [c for c, _, _ in parcalar]
+        sonuclar = self.embedding_manager.embed_batch(chunks, result["dosya_id"]) if chunks else []
+        vektorler = [s["embedding"] if s else None for s in sonuclar]
+        basarili = [v for v in vektorler if v is not None]
+
+        # Bölüm konumları temiz metne göredir (chunk aralıkları da bu metne göre hesaplanır)
+        bolumler = [tuple(b) for b in result.get("bolum_konumlari") or []]
+        baslangiclar = [pos for pos, _ in bolumler]
+        result["chunks"] = chunks
+        result["chunk_araliklari"] = [(bas, bit) for _, bas, bit in parcalar]
+        chunk_bolumleri = []
+        for _, bas, _ in parcalar:
+            j = bisect.bisect_right(baslangiclar, bas) - 1
+            chunk_bolumleri.append(bolumler[j][1] if j >= 0 else None)
+        result["chunk_bolumleri"] = chunk_bolumleri
+        result["chunk_modelleri"] = [s["model"] if s else None for s in sonuclar]
+        result["chunk_embeddings"] = vektorler
+        result["embedding"] = np.mean(np.asarray(basarili, dtype=np.float32), axis=0).tolist() if basarili else None
+        result["islem_tarihi"] = datetime.now().isoformat()
+        return result
+
+    def sonuc_kaydet(self, result, geri_cagri=None):
+        """
+        📌 **Kaydetme aşaması (disk):** Temiz metni ve kaynakçayı dosyaya yazar; chunk embedding'lerini
+        `ChromaBatchWriter` kuyruğuna ekler (yazma, dosyalar arasında biriktirilip toplu yapılır).
+        Zotero metadata'sı `MetadataStore`'a yazılır; embedding'i oluşturulamayan chunk'lar
+        indekslenmez, eksik olarak kaydedilir. Temiz metin BM25 ters indeksine de eklenir.
+
+        ChromaDB yazımı bu fonksiyon döndükten sonra yazıcı thread'inde yapılır; yazımın sonucu
+        `result["yazma_bileti"]` ile izlenir ve (verildiyse) `geri_cagri(bilet)` tamamlanınca çağrılır.
+
+        Args:
+            result (dict): Embedding aşamasından gelen sonuç.
+            geri_cagri (callable, optional): Dosyanın tüm chunk'ları yazıldığında/başarısız olduğunda çağrılır.
+
+        Returns:
+            dict: "yazma_bileti" alanı eklenmiş aynı sonuç sözlüğü.
+        """
+        bib_info = result.get("zotero_meta") or {}
+        yollar = save_clean_text_files(result["dosya"], result["temiz_metin"], bib_info)
+        if yollar["txt"]:
+            bm25_index.dosya_ekle(yollar["txt"], ad=Path(result["dosya"]).stem)
+        save_json_file(config.CITATIONS_DIR, f"{Path(result['dosya']).stem}.references", result["kaynakca"])
+        self.metadata_store.kaydet(
+            result["dosya_id"], result["dosya"], zotero_meta=result.get("zotero_meta"),
+            chunk_sayisi=len(result["chunks"]) if result.get("chunks") is not None else None,
+            islem_tarihi=result.get("islem_tarihi")
+        )
+        if result.get("chunk_embeddings") is not None:
+            self.metadata_store.eksik_chunklari_kaydet(
+                result["dosya_id"], [i for i, v in enumerate(result["chunk_embeddings"]) if v is None],
+                hata="embedding oluşturulamadı"
+            )
+        if result.get("chunk_embeddings"):
+            kayitlar = [(i, c, v) for i, (c, v) in enumerate(zip(result["chunks"], result["chunk_embeddings"])) if v is not None]
+            result["yazma_bileti"] = self.chroma_writer.ekle(
+                ids=[f"{result['dosya_id']}_{i}" for i, _, _ in kayitlar],
+                embeddings=[list(v) for _, _, v in kayitlar],
+                documents=[c for _, c, _ in kayitlar],
+                metadatas=[self._chunk_metadata(result, i) for i, _, _ in kayitlar],
+                geri_cagri=geri_cagri
+            )
+        else:
+            result["yazma_bileti"] = YazmaBileti([], geri_cagri=geri_cagri)
+        return result
+
+    def _chunk_metadata(self, result, i):
+        """
+        📌 Bir chunk için ChromaDB metadata sözlüğünü oluşturur (Chroma None değer kabul etmediğinden boş alanlar eklenmez).
+        """
+        metadata = {"dosya": result["dosya"], "dosya_id": result["dosya_id"], "chunk_index": i, "islem_tarihi": result["islem_tarihi"]}
+        if result.get("chunk_araliklari"):
+            metadata["baslangic"], metadata["bitis"] = result["chunk_araliklari"][i]
+        if result.get("chunk_bolumleri") and result["chunk_bolumleri"][i]:
+            metadata["bolum"] = result["chunk_bolumleri"][i]
+        if result.get("chunk_modelleri") and result["chunk_modelleri"][i]:
+            metadata["embedding_model"] = result["chunk_modelleri"][i]
+        return metadata
+
+    def kayitli_sonucu_yukle(self, dosya_yolu):
+        """
+        📌 **Daha önce `sonuc_kaydet` ile yazılmış çıkarma çıktılarını (temiz metin, kaynakça) okur.**
+        Çıkarma ayarları değişmemiş dosyalarda metni yeniden çıkarmak yerine kullanılır.
+
+        Args:
+            dosya_yolu (Path): Kaynak PDF/TXT dosyası.
+
+        Returns:
+            dict veya None: "dosya", "dosya_yolu", "temiz_metin", "kaynakca" alanları; dosyalar yoksa None.
+        """
+        dosya_yolu = Path(dosya_yolu)
+        txt_path = config.CLEAN_TEXT_DIR / "txt" / f"{dosya_yolu.stem}.clean.txt"
+        ref_path = config.CITATIONS_DIR / f"{dosya_yolu.stem}.references.json"
+        if not txt_path.exists() or not ref_path.exists():
+            return None
+        with open(txt_path, "r", encoding="utf-8") as f:
+            temiz_metin = f.read()
+        with open(ref_path, "r", encoding="utf-8") as f:
+            references = json.load(f)
+        return {"dosya": dosya_yolu.name, "dosya_yolu": str(dosya_yolu), "temiz_metin": temiz_metin, "kaynakca": references}
+
+    def sayac_artir(self, anahtar):
+        """
+        📌 **Sayaçları thread-safe biçimde artırır.**
+        """
+        with self.sayac_lock:
+            self.sayaçlar[anahtar] += 1
+
+    def stack_guncelle(self, dosya_yolu, islem):
         """
         📌 **Stack güncelleme işlemini `helper_module` üzerinden gerçekleştirir.**
+        İş kuyruğu SQLite işlemleriyle süreçler arası güvenli olduğundan ek kilit kullanılmaz.
         """
-        from helper_module import stack_guncelle
-        with self.stack_lock:
-            stack_guncelle(dosya_adi, islem)
+        stack_guncelle(dosya_yolu, islem)
 
-a.py
 # import os
 # import re
 # import threading
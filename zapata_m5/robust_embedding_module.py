@@ -3,13 +3,14 @@
 import time
 from config_module import config
 from alternative_embedding_module import embed_text_with_model, get_available_models
+from embedding_cache_module import embedding_cache
 
 def robust_embed_text(text, pdf_id, chunk_index, total_chunks, model_priority=None, max_retries=3, backoff_factor=1.0):
     """
     Robust embedding oluşturma fonksiyonu.
     
     Bu fonksiyon, verilen metin için öncelikle model_priority listesinde yer alan modelleri
-    sırasıyla dener. Her model için maksimum max_retries deneme yapılır; başarısız olursa
+    sırasıyla dener. Her model denenmeden önce o modelin kalıcı embedding cache'i kontrol edilir. Her model için maksimum max_retries deneme yapılır; başarısız olursa
     exponential backoff uygulanır ve sonraki modele geçilir.
     
     Args:
@@ -28,6 +29,10 @@ def robust_embed_text(text, pdf_id, chunk_index, total_chunks, model_priority=No
         model_priority = get_available_models()
     
     for model in model_priority:
+        # Cache yalnızca denenecek model için okunur (modeller arasında vektör boyutları farklıdır)
+        cached = embedding_cache.get(model, text)
+        if cached is not None:
+            return cached.tolist()
         config.logger.info(f"Denenecek model: {model} (PDF: {pdf_id}, Chunk: {chunk_index+1}/{total_chunks})")
         attempt = 0
         while attempt < max_retries:
@@ -35,7 +40,7 @@ def robust_embed_text(text, pdf_id, chunk_index, total_chunks, model_priority=No
                 embedding = embed_text_with_model(text, model)
                 if embedding is not None:
                     config.logger.info(f"✅ Model {model} başarılı: PDF {pdf_id}, Chunk {chunk_index+1}/{total_chunks}")
-                    # Burada, istenirse yerel cache (örn. embedding_cache.json) güncellenebilir.
+                    embedding_cache.put(model, text, embedding)
                     return embedding
             except Exception as e:
                 config.logger.error(f"❌ Hata: Model {model}, Deneme {attempt+1}/{max_retries}: {e}")
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Modüller düz içe aktarılır (from config_module import config); testler zapata_m5 dizininden bağımsız çalışsın
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# config_module içe aktarılırken dizinleri oluşturur; testler (SQLite depoları dahil) geçici bir dizin altında çalışır
+_TEST_DIR = Path(tempfile.mkdtemp(prefix="zapata_test_"))
+for _ad in ("STORAGE_DIR", "SUCCESS_DIR", "CITATIONS_DIR", "TABLES_DIR", "TEMIZMETIN_DIR",
+            "EMBEDDING_PARCA_DIZIN", "TEMP_DIR", "LOG_DIR"):
+    os.environ.setdefault(_ad, str(_TEST_DIR / _ad.lower()))
+for _ad, _dosya in (("WORK_QUEUE_PATH", "work_queue.sqlite3"), ("MANIFEST_PATH", "manifest.sqlite3"),
+                   ("METADATA_STORE_PATH", "metadata.sqlite3"), ("BM25_INDEX_PATH", "bm25_index.sqlite3"),
+                   ("TFIDF_INDEX_DIR", "tfidf_index"), ("ZOTERO_MIRROR_PATH", "zotero_mirror.sqlite3"),
+                   ("ZOTERO_ATTACHMENT_INDEX_PATH", "zotero_attachment_index.json")):
+    os.environ.setdefault(_ad, str(_TEST_DIR / _dosya))
+os.environ.setdefault("ZOTERO_MIRROR_ENABLED", "false")
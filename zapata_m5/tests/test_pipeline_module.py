@@ -0,0 +1,113 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import pipeline_module
+from pipeline_module import BatchPipeline
+from manifest_module import ProcessingManifest
+from work_queue_module import WorkQueue, is_anahtari, PENDING, DONE
+
+
+class _SahteYonetici:
+    """
+    📌 Pipeline aşamalarını ağ/ChromaDB olmadan çalıştıran sahte `IslemYoneticisi`.
+    `hatali` içindeki dosyaların Zotero aşaması bir kez hata verir.
+    """
+
+    def __init__(self, hatali=()):
+        self.sayaçlar = {'toplam': 0, 'başarılı': 0, 'hata': 0}
+        self.hatali = set(hatali)
+        self.hata_olustu = threading.Event()
+        self.chroma_writer = SimpleNamespace(bosalt=lambda: None)
+
+    def sayac_artir(self, anahtar):
+        self.sayaçlar[anahtar] += 1
+
+    def kayitli_sonucu_yukle(self, dosya_yolu):
+        return None
+
+    def zotero_zenginlestir(self, result):
+        if result["dosya"] in self.hatali:
+            self.hatali.discard(result["dosya"])
+            self.hata_olustu.set()
+            raise RuntimeError("geçici Zotero hatası")
+        result.update(dosya_id=result["dosya"], zotero_meta=None)
+        return result
+
+    def embedding_olustur(self, result):
+        result["chunk_embeddings"] = [[0.0]]
+        return result
+
+    def sonuc_kaydet(self, result, geri_cagri=None):
+        geri_cagri(SimpleNamespace(basarisiz_ids=[]))
+
+
+@pytest.fixture
+def kuyruk(tmp_path, monkeypatch):
+    wq = WorkQueue(db_path=tmp_path / "wq.sqlite3")
+    monkeypatch.setattr(pipeline_module, "work_queue", wq)
+    return wq
+
+
+def _dosyalar(dizin, adlar):
+    dizin.mkdir()
+    for ad in adlar:
+        (dizin / ad).write_text(f"Introduction\n{ad} metni. " * 20, encoding="utf-8")
+    return [dizin / ad for ad in adlar]
+
+
+def test_basarisiz_is_ayni_calistirmada_done_yapilmaz(tmp_path, kuyruk, monkeypatch):
+    dosyalar = _dosyalar(tmp_path / "in", ["a.txt", "b.txt", "c.txt"])
+    yonetici = _SahteYonetici(hatali={"a.txt"})
+
+    # İlk claim'den sonra kaynak döngüsü, a.txt'nin hatası (ve pending'e dönmesi) gerçekleşene kadar bekletilir
+    asil_claim = kuyruk.claim
+    cagrilar = []
+
+    def claim(*args, **kwargs):
+        if cagrilar:
+            yonetici.hata_olustu.wait(10)
+        cagrilar.append(1)
+        return asil_claim(*args, **kwargs)
+
+    monkeypatch.setattr(kuyruk, "claim", claim)
+    pipeline = BatchPipeline(yonetici, extract_workers=1, zotero_workers=1, embed_workers=1, save_workers=1,
+                             queue_size=1, manifest=ProcessingManifest(tmp_path / "manifest.sqlite3"))
+    ozet = pipeline.run(tmp_path / "in")
+
+    assert yonetici.hata_olustu.is_set()
+    assert (ozet["başarılı"], ozet["hata"], ozet["atlanan"]) == (2, 1, 0)
+    assert is_anahtari(dosyalar[0]) in kuyruk.listele(PENDING)
+    assert is_anahtari(dosyalar[0]) not in kuyruk.listele(DONE)
+    assert sorted(kuyruk.listele(DONE)) == sorted(is_anahtari(p) for p in dosyalar[1:])
+
+    # Sonraki çalıştırmada iş yeniden denenir ve tamamlanır
+    ozet = BatchPipeline(yonetici, extract_workers=1, queue_size=1,
+                         manifest=ProcessingManifest(tmp_path / "manifest.sqlite3")).run(tmp_path / "in")
+    assert (ozet["başarılı"], ozet["hata"]) == (1, 0)
+    assert kuyruk.sayac() == {DONE: 3}
+
+
+def test_ayni_icerigin_kopyasi_ilk_kopya_basarisizsa_done_yapilmaz(tmp_path, kuyruk):
+    dizin = tmp_path / "in"
+    dizin.mkdir()
+    for ad in ("a.txt", "b.txt"):
+        (dizin / ad).write_text("Introduction\nAynı içerik. " * 20, encoding="utf-8")
+    anahtarlar = [is_anahtari(dizin / "a.txt"), is_anahtari(dizin / "b.txt")]
+    manifest = ProcessingManifest(tmp_path / "manifest.sqlite3")
+    yonetici = _SahteYonetici(hatali={"a.txt"})
+
+    ozet = BatchPipeline(yonetici, extract_workers=1, queue_size=1, manifest=manifest).run(dizin)
+
+    # İlk kopya başarısız: kopya işlenmez, done da yapılmaz; içerik hâlâ işlenmeyi bekler
+    assert (ozet["başarılı"], ozet["hata"], ozet["atlanan"]) == (0, 1, 0)
+    assert sorted(kuyruk.listele(PENDING)) == sorted(anahtarlar)
+    assert manifest.gerekli_asamalar(manifest.dosya_hash(dizin / "b.txt"))
+
+    ozet = BatchPipeline(yonetici, extract_workers=1, queue_size=1, manifest=manifest).run(dizin)
+
+    # İlk kopya başarılı: kopya işlenmeden done yapılır
+    assert (ozet["başarılı"], ozet["hata"], ozet["atlanan"]) == (1, 0, 1)
+    assert kuyruk.sayac() == {DONE: 2}
+    assert not manifest.gerekli_asamalar(manifest.dosya_hash(dizin / "b.txt"))
@@ -0,0 +1,103 @@
+import time
+import asyncio
+
+from benchmark_module import ZoteroStubServer
+from zotero_module import AsyncZoteroClient, ZOTERO_ITEMKEY_LIMIT
+
+
+def _cek(base_url, keys, **kwargs):
+    async def _calistir():
+        async with AsyncZoteroClient(base_url=f"{base_url}/users/1/items", api_key="", **kwargs) as client:
+            return await client.fetch_items(keys)
+    return asyncio.run(_calistir())
+
+
+def _cek_tekil(base_url, keys, **kwargs):
+    async def _calistir():
+        async with AsyncZoteroClient(base_url=f"{base_url}/users/1/items", api_key="", **kwargs) as client:
+            return [await client.fetch_item(k) for k in keys]
+    return asyncio.run(_calistir())
+
+
+def test_fetch_items_50_anahtarlik_gruplar():
+    keys = [f"K{i:07d}" for i in range(120)]
+    stub = ZoteroStubServer(latency=0, missing={"K0000007"})
+    with stub as base_url:
+        sonuc = _cek(base_url, keys + keys[:10])  # Tekrarlanan anahtarlar bir kez istenir
+
+    assert sorted(stub.state["itemKey_sayilari"], reverse=True) == [ZOTERO_ITEMKEY_LIMIT, ZOTERO_ITEMKEY_LIMIT, 20]
+    assert stub.state["requests"] == 3
+    assert list(sonuc) == keys
+    assert sonuc["K0000007"] is None
+    assert all(sonuc[k]["key"] == k for k in keys if k != "K0000007")
+
+
+def test_eszamanlilik_siniri():
+    keys = [f"K{i:07d}" for i in range(8 * ZOTERO_ITEMKEY_LIMIT)]
+    stub = ZoteroStubServer(latency=0.1)
+    with stub as base_url:
+        sonuc = _cek(base_url, keys, max_concurrency=3)
+
+    assert stub.state["requests"] == 8
+    assert stub.state["en_fazla_aktif"] == 3
+    assert all(sonuc.values())
+
+
+def test_429_retry_after_sonrasi_yeniden_dener():
+    stub = ZoteroStubServer(latency=0, rate_limit_count=1, retry_after=1)
+    with stub as base_url:
+        start = time.monotonic()
+        sonuc = _cek_tekil(base_url, ["ABCD1234"], max_retries=2)
+        sure = time.monotonic() - start
+
+    assert sonuc[0]["key"] == "ABCD1234"
+    assert stub.state["requests"] == 2
+    ilk, ikinci = stub.state["zamanlar"]
+    assert ikinci - ilk >= 0.95  # Retry-After: 1 sn
+    assert sure < 3
+
+
+def test_429_deneme_hakki_bitince_none():
+    stub = ZoteroStubServer(latency=0, rate_limit_count=10, retry_after=0)
+    with stub as base_url:
+        sonuc = _cek_tekil(base_url, ["ABCD1234"], max_retries=1)
+
+    assert sonuc == [None]
+    assert stub.state["requests"] == 2
+
+
+def test_backoff_basligi_sonraki_istekleri_erteler():
+    stub = ZoteroStubServer(latency=0, backoff=1)
+    with stub as base_url:
+        sonuc = _cek_tekil(base_url, ["AAAA1111", "BBBB2222"])
+
+    assert [s["key"] for s in sonuc] == ["AAAA1111", "BBBB2222"]
+    ilk, ikinci = stub.state["zamanlar"]
+    assert ikinci - ilk >= 0.95  # Backoff: 1 sn
+
+
+def test_backoff_eszamanli_gruplara_da_uygulanir():
+    keys = [f"K{i:07d}" for i in range(3 * ZOTERO_ITEMKEY_LIMIT)]
+    stub = ZoteroStubServer(latency=0, backoff=1)
+
+    async def _calistir(base_url):
+        async with AsyncZoteroClient(base_url=f"{base_url}/users/1/items", api_key="", max_concurrency=1) as client:
+            await client.fetch_item("ABCD1234")  # Backoff başlığı burada alınır
+            return await client.fetch_items(keys)
+
+    with stub as base_url:
+        sonuc = asyncio.run(_calistir(base_url))
+
+    zamanlar = stub.state["zamanlar"]
+    assert len(zamanlar) == 4
+    assert all(b - a >= 0.95 for a, b in zip(zamanlar, zamanlar[1:]))
+    assert all(sonuc.values())
+
+
+def test_404_none_doner():
+    stub = ZoteroStubServer(latency=0, missing={"YOKK0000"})
+    with stub as base_url:
+        sonuc = _cek_tekil(base_url, ["YOKK0000"])
+
+    assert sonuc == [None]
+    assert stub.state["requests"] == 1
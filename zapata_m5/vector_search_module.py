@@ -0,0 +1,170 @@
+import time
+import threading
+import chromadb
+from config_module import config
+from embedding_module import embed_text, OPENAI_MODEL
+from alternative_embedding_module import embed_text_with_model
+from metadata_store_module import metadata_store
+
+
+def chroma_where(filters):
+    """
+    📌 Basit filtre sözlüğünü ChromaDB `where` ifadesine çevirir.
+
+    - {"dosya_id": "ABCD"} → eşitlik; liste değer → `$in`.
+    - Birden çok alan `$and` ile birleştirilir.
+    - Anahtarı `$` ile başlayan sözlükler zaten Chroma ifadesi kabul edilip olduğu gibi kullanılır.
+
+    Args:
+        filters (dict or None): Metadata filtreleri.
+
+    Returns:
+        dict veya None: Chroma `where` ifadesi.
+    """
+    if not filters:
+        return None
+    if any(str(k).startswith("$") for k in filters):
+        return filters
+    kosullar = [
+        {alan: {"$in": list(deger)} if isinstance(deger, (list, tuple, set)) else deger}
+        for alan, deger in filters.items()
+    ]
+    return kosullar[0] if len(kosullar) == 1 else {"$and": kosullar}
+
+
+class VectorSearch:
+    """
+    📌 **`pdf_embeddings` koleksiyonu üzerinde en yakın komşu araması.**
+
+    - Sorgu, ingest ile aynı model (`embedding_module.OPENAI_MODEL`) kullanılarak embedding'e çevrilir;
+      aynı sorgu tekrarlandığında vektör kalıcı embedding cache'inden gelir.
+    - Arama ChromaDB'nin HNSW indeksinde yapılır; sonuçlar chunk metadata'sı (doküman, bölüm, aralık)
+      ve `MetadataStore`'daki Zotero kaydıyla `dosya_id` üzerinden tek sorguda birleştirilir.
+    - Koleksiyon ilk aramada açılır. Aşama süreleri (ms) çağrıya özeldir: `sureler` sözlüğü verilirse
+      doldurulur; `son_sureler` çağıran thread'in son aramasının sürelerini döndürür (eşzamanlı aramalar
+      birbirinin sürelerini ezmez).
+
+    Örnek:
+        sonuclar = VectorSearch().search("protein folding", k=5, filters={"bolum": "Methods"})
+    """
+
+    def __init__(self, collection=None, client=None, model=None, store=None):
+        self._collection = collection
+        self._client = client
+        self.model = model or OPENAI_MODEL
+        self.store = store or metadata_store
+        self._lock = threading.Lock()
+        self._yerel = threading.local()
+
+    @property
+    def son_sureler(self):
+        """Bu thread'de yapılan son aramanın aşama süreleri (ms)."""
+        return getattr(self._yerel, "sureler", {})
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    self._client = self._client or chromadb.PersistentClient(path="chroma_db")
+                    self._collection = self._client.get_or_create_collection(name="pdf_embeddings")
+        return self._collection
+
+    def sorgu_vektoru(self, query):
+        """
+        📌 Sorgu metnini ingest ile aynı modelle embedding'e çevirir.
+
+        Returns:
+            list veya None: Sorgu vektörü.
+        """
+        if self.model == OPENAI_MODEL:
+            return embed_text(query, model=self.model)
+        return embed_text_with_model(query, self.model)
+
+    def search(self, query, k=10, filters=None, sureler=None):
+        """
+        📌 **Sorguya en yakın `k` chunk'ı sıralı olarak döndürür.**
+
+        Args:
+            query (str): Arama metni.
+            k (int): Döndürülecek sonuç sayısı.
+            filters (dict, optional): Chunk metadata filtreleri (ör. {"dosya_id": [...], "bolum": "Results"}).
+            sureler (dict, optional): Verilirse bu çağrının aşama süreleri (ms) içine yazılır
+                ("embedding", "ann", "birlestirme").
+
+        Returns:
+            list: Sıralı sonuç sözlükleri (bkz. `search_by_vector`); sorgu embedding'i oluşturulamazsa boş liste.
+        """
+        sureler = {} if sureler is None else sureler
+        start = time.perf_counter()
+        vektor = self.sorgu_vektoru(query)
+        sureler["embedding"] = round((time.perf_counter() - start) * 1000, 2)
+        if vektor is None:
+            self._yerel.sureler = sureler
+            config.logger.error(f"❌ Sorgu embedding'i oluşturulamadı: {query[:50]}")
+            return []
+        sonuclar = self.search_by_vector(vektor, k=k, filters=filters, sureler=sureler)
+        config.logger.info(f"🔍 Vektör arama: {len(sonuclar)} sonuç, süreler (ms): {sureler}")
+        return sonuclar
+
+    def search_by_vector(self, vektor, k=10, filters=None, sureler=None):
+        """
+        📌 Hazır bir sorgu vektörüyle en yakın komşu araması yapar.
+
+        Args:
+            vektor (list): Sorgu embedding'i.
+            k (int): Döndürülecek sonuç sayısı.
+            filters (dict, optional): Chunk metadata filtreleri.
+            sureler (dict, optional): Verilirse "ann" ve "birlestirme" süreleri (ms) içine yazılır.
+
+        Returns:
+            list: [{"sira", "id", "mesafe", "dosya_id", "dosya", "chunk_index", "bolum",
+                    "baslangic", "bitis", "metin", "zotero_meta"}]
+        """
+        start = time.perf_counter()
+        yanit = self.collection.query(
+            query_embeddings=[list(vektor)],
+            n_results=k,
+            where=chroma_where(filters),
+            include=["metadatas", "documents", "distances"]
+        )
+        ann_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        ids = yanit["ids"][0]
+        metadatas = (yanit.get("metadatas") or [[None] * len(ids)])[0]
+        documents = (yanit.get("documents") or [[None] * len(ids)])[0]
+        distances = (yanit.get("distances") or [[None] * len(ids)])[0]
+        kayitlar = self.store.getir_coklu((m or {}).get("dosya_id") for m in metadatas)
+        sonuclar = []
+        for sira, (chunk_id, metadata, metin, mesafe) in enumerate(zip(ids, metadatas, documents, distances), start=1):
+            metadata = metadata or {}
+            kayit = kayitlar.get(metadata.get("dosya_id")) or {}
+            sonuclar.append({
+                "sira": sira,
+                "id": chunk_id,
+                "mesafe": mesafe,
+                "dosya_id": metadata.get("dosya_id"),
+                "dosya": metadata.get("dosya"),
+                "chunk_index": metadata.get("chunk_index"),
+                "bolum": metadata.get("bolum"),
+                "baslangic": metadata.get("baslangic"),
+                "bitis": metadata.get("bitis"),
+                "metin": metin,
+                "zotero_meta": kayit.get("zotero_meta"),
+            })
+        sureler = {} if sureler is None else sureler
+        sureler["ann"] = round(ann_ms, 2)
+        sureler["birlestirme"] = round((time.perf_counter() - start) * 1000, 2)
+        self._yerel.sureler = sureler
+        return sonuclar
+
+
+vector_search = VectorSearch()
+
+
+def search(query, k=10, filters=None, sureler=None):
+    """
+    📌 Varsayılan `VectorSearch` örneği üzerinden arama yapar (bkz. `VectorSearch.search`).
+    """
+    return vector_search.search(query, k=k, filters=filters, sureler=sureler)
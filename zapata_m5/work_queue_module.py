@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import psutil
+import threading
+from pathlib import Path
+from config_module import config
+
+# İş durumları
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+
+def varsayilan_isci_kimligi():
+    """
+    📌 Geçerli süreç için "host:pid" biçiminde işçi kimliği döndürür.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def is_anahtari(dosya_yolu):
+    """
+    📌 Dosya için iş kuyruğu anahtarını (mutlak, çözümlenmiş yol) döndürür.
+    Farklı dizinlerdeki aynı adlı dosyalar (ör. a/x.pdf ve b/x.pdf) ayrı iş olarak tutulur.
+    """
+    return str(Path(dosya_yolu).resolve())
+
+
+def dosya_yolunu_coz(key):
+    """
+    📌 İş anahtarından dosya yolunu bulur. Eski sürümlerin yalnızca dosya adı olan anahtarları
+    `STORAGE_DIR` altında aranır.
+
+    Returns:
+        Path veya None: Mevcut dosyanın yolu.
+    """
+    yol = Path(key)
+    if yol.is_absolute():
+        return yol if yol.is_file() else None
+    return next((p for p in Path(config.STORAGE_DIR).rglob(yol.name) if p.is_file()), None)
+
+
+class WorkQueue:
+    """
+    📌 **SQLite tabanlı, süreçler arası güvenli iş kuyruğu.**
+
+    - Durumlar: pending → in_progress → done / failed.
+    - `claim` işi kiralar (lease): kira süresi dolan in_progress işler başka işçiye verilebilir.
+    - `recover` çökmüş süreçlerin (aynı makinede artık yaşamayan pid) ve süresi dolmuş kiraların
+      işlerini pending durumuna geri alır.
+    - Tüm durum geçişleri `BEGIN IMMEDIATE` işlemleriyle yapılır; WAL kipi sayesinde GUI ve
+      süreç havuzu aynı dosyayı eşzamanlı kullanabilir. Bağlantı süreç (pid) başına açılır;
+      aynı süreçteki thread'ler bağlantıyı bir kilitle sırayla kullanır.
+    """
+
+    def __init__(self, db_path=None, lease_seconds=None, max_attempts=None):
+        self.db_path = str(db_path or config.WORK_QUEUE_PATH)
+        self.lease_seconds = lease_seconds or config.WORK_QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or config.WORK_QUEUE_MAX_ATTEMPTS
+        self._conn = None
+        self._pid = None
+        self._lock = threading.RLock()
+
+    def _baglanti(self):
+        if self._conn is None or self._pid != os.getpid():
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    key TEXT PRIMARY KEY,
+                    durum TEXT NOT NULL,
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    hata TEXT,
+                    payload TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_durum ON jobs(durum, lease_until)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _islem(self, fonksiyon):
+        """
+        📌 Verilen fonksiyonu tek bir yazma işlemi (BEGIN IMMEDIATE ... COMMIT) içinde çalıştırır.
+        """
+        with self._lock:
+            conn = self._baglanti()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                sonuc = fonksiyon(conn)
+                conn.execute("COMMIT")
+                return sonuc
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, keys, payload=None, yeniden=False):
+        """
+        📌 İşleri pending olarak kuyruğa ekler.
+
+        Args:
+            keys (list): İş anahtarları (dosyalar için `is_anahtari`).
+            payload (dict, optional): Her işe eklenecek JSON verisi.
+            yeniden (bool): True ise done/failed işler de yeniden pending yapılır.
+
+        Returns:
+            int: Eklenen veya yeniden kuyruğa alınan iş sayısı.
+        """
+        now = time.time()
+        veri = json.dumps(payload, ensure_ascii=False) if payload is not None else None
+        sql = (
+            "INSERT INTO jobs (key, durum, payload, created_at, updated_at) VALUES (?, 'pending', ?, ?, ?) "
+            "ON CONFLICT(key) DO " + (
+                "UPDATE SET durum = 'pending', worker = NULL, lease_until = NULL, attempts = 0, hata = NULL, "
+                "updated_at = excluded.updated_at WHERE durum IN ('done', 'failed')" if yeniden else "NOTHING"
+            )
+        )
+        return self._islem(lambda conn: sum(conn.execute(sql, (k, veri, now, now)).rowcount for k in keys))
+
+    def claim(self, limit=1, worker=None, haric=()):
+        """
+        📌 En eski pending (veya kirası dolmuş in_progress) işleri kiralar.
+
+        Args:
+            limit (int): En fazla kaç iş alınacağı.
+            worker (str, optional): İşçi kimliği (varsayılan: host:pid).
+            haric (iterable): Kiralanmayacak iş anahtarları (ör. bu çalıştırmada başarısız olup yeniden
+                pending'e dönen işler; bunlar sonraki çalıştırmaya veya başka bir işçiye bırakılır).
+
+        Returns:
+            list: [(key, payload)] çiftleri.
+        """
+        worker = worker or varsayilan_isci_kimligi()
+        haric = list(haric)
+
+        def _al(conn):
+            now = time.time()
+            rows = conn.execute(
+                "SELECT key, payload FROM jobs WHERE (durum = 'pending' OR (durum = 'in_progress' AND lease_until < ?)) "
+                f"AND key NOT IN ({','.join('?' * len(haric))}) ORDER BY created_at LIMIT ?", (now, *haric, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET durum = 'in_progress', worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? WHERE key = ?",
+                [(worker, now + self.lease_seconds, now, key) for key, _ in rows]
+            )
+            return [(key, json.loads(payload) if payload else None) for key, payload in rows]
+
+        return self._islem(_al)
+
+    def baslat(self, key, worker=None):
+        """
+        📌 Tek bir işi doğrudan in_progress olarak işaretler (yoksa oluşturur).
+        GUI'den tek dosya işlenirken kullanılır.
+        """
+        worker = worker or varsayilan_isci_kimligi()
+        now = time.time()
+        self._islem(lambda conn: conn.execute(
+            "INSERT INTO jobs (key, durum, worker, lease_until, attempts, created_at, updated_at) "
+            "VALUES (?, 'in_progress', ?, ?, 1, ?, ?) ON CONFLICT(key) DO UPDATE SET durum = 'in_progress', "
+            "worker = excluded.worker, lease_until = excluded.lease_until, attempts = attempts + 1, "
+            "hata = NULL, updated_at = excluded.updated_at",
+            (key, worker, now + self.lease_seconds, now, now)
+        ))
+
+    def heartbeat(self, key, worker=None):
+        """
+        📌 Uzun süren işlerde kirayı uzatır.
+
+        Returns:
+            bool: Kira hâlâ bu işçiye aitse True.
+        """
+        return bool(self.heartbeat_coklu([key], worker=worker))
+
+    def heartbeat_coklu(self, keys, worker=None):
+        """
+        📌 Birden çok işin kirasını tek işlemde uzatır.
+
+        Returns:
+            list: Kirası hâlâ bu işçiye ait olan (uzatılan) anahtarlar.
+        """
+        worker = worker or varsayilan_isci_kimligi()
+        now = time.time()
+        return self._islem(lambda conn: [
+            key for key in keys
+            if conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE key = ? AND durum = 'in_progress' AND worker = ?",
+                (now + self.lease_seconds, now, key, worker)
+            ).rowcount
+        ])
+
+    def tamamla(self, key):
+        """
+        📌 İşi done olarak işaretler.
+        """
+        now = time.time()
+        self._islem(lambda conn: conn.execute(
+            "UPDATE jobs SET durum = 'done', worker = NULL, lease_until = NULL, hata = NULL, updated_at = ? WHERE key = ?",
+            (now, key)
+        ))
+
+    def birak(self, key):
+        """
+        📌 Kiralanmış işi işlemeden bırakır: pending'e döner ve kiralamada artan deneme sayısı geri alınır.
+        """
+        now = time.time()
+        self._islem(lambda conn: conn.execute(
+            "UPDATE jobs SET durum = 'pending', worker = NULL, lease_until = NULL, "
+            "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE key = ? AND durum = 'in_progress'",
+            (now, key)
+        ))
+
+    def basarisiz(self, key, hata=None):
+        """
+        📌 İşi başarısız olarak işaretler; deneme hakkı kaldıysa yeniden pending yapılır.
+
+        Returns:
+            str: İşin yeni durumu ("pending" veya "failed").
+        """
+        now = time.time()
+
+        def _isaretle(conn):
+            row = conn.execute("SELECT attempts FROM jobs WHERE key = ?", (key,)).fetchone()
+            durum = PENDING if row and row[0] < self.max_attempts else FAILED
+            conn.execute(
+                "UPDATE jobs SET durum = ?, worker = NULL, lease_until = NULL, hata = ?, updated_at = ? WHERE key = ?",
+                (durum, str(hata) if hata is not None else None, now, key)
+            )
+            return durum
+
+        return self._islem(_isaretle)
+
+    def recover(self):
+        """
+        📌 Çökme sonrası kurtarma: süresi dolmuş kiraları ve bu makinede artık çalışmayan
+        süreçlere ait in_progress işleri pending durumuna geri alır.
+
+        Returns:
+            int: Geri alınan iş sayısı.
+        """
+        host = socket.gethostname()
+
+        def _kurtar(conn):
+            now = time.time()
+            rows = conn.execute("SELECT key, worker, lease_until FROM jobs WHERE durum = 'in_progress'").fetchall()
+            geri = []
+            for key, worker, lease_until in rows:
+                w_host, _, w_pid = (worker or "").rpartition(":")
+                olu = w_host == host and w_pid.isdigit() and not psutil.pid_exists(int(w_pid))
+                if olu or (lease_until or 0) < now:
+                    geri.append(key)
+            conn.executemany(
+                "UPDATE jobs SET durum = 'pending', worker = NULL, lease_until = NULL, updated_at = ? WHERE key = ?",
+                [(now, k) for k in geri]
+            )
+            return len(geri)
+
+        n = self._islem(_kurtar)
+        if n:
+            config.logger.warning(f"♻️ İş kuyruğu kurtarma: {n} yarım kalmış iş yeniden kuyruğa alındı.")
+        return n
+
+    def listele(self, durum=IN_PROGRESS):
+        """
+        📌 Belirtilen durumdaki iş anahtarlarını döndürür.
+        """
+        with self._lock:
+            rows = self._baglanti().execute("SELECT key FROM jobs WHERE durum = ? ORDER BY created_at", (durum,)).fetchall()
+        return [r[0] for r in rows]
+
+    def sayac(self):
+        """
+        📌 Durum bazında iş sayılarını döndürür.
+
+        Returns:
+            dict: {durum: sayı}
+        """
+        with self._lock:
+            return dict(self._baglanti().execute("SELECT durum, COUNT(*) FROM jobs GROUP BY durum").fetchall())
+
+
+work_queue = WorkQueue()
@@ -1,7 +1,591 @@
+import os
 import re
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from pathlib import Path
+import aiohttp
 import requests
 from config_module import config
 
+ZOTERO_API_VERSION = "3"
+ZOTERO_ITEMKEY_LIMIT = 50  # Zotero `itemKey=` sorgusunda tek istekte izin verilen en fazla anahtar sayısı
+
+
+def zotero_items_url():
+    """
+    📌 Yapılandırmaya göre (user/group) Zotero items uç noktasının adresini döndürür.
+    """
+    library = "groups" if config.ZOTERO_LIBRARY_TYPE == "group" else "users"
+    return f"{config.ZOTERO_API_BASE_URL}/{library}/{config.ZOTERO_USER_ID}/items"
+
+
+class AsyncZoteroClient:
+    """
+    📌 **Bağlantı havuzlu, eşzamanlılığı sınırlı asyncio Zotero istemcisi.**
+
+    - Tek bir `aiohttp.ClientSession` (keep-alive bağlantı havuzu) tüm isteklerde paylaşılır.
+    - Aynı anda en fazla `max_concurrency` istek gönderilir.
+    - Zotero'nun `Backoff` başlığı sonraki tüm istekleri belirtilen süre kadar erteler;
+      429/503 yanıtlarında `Retry-After` kadar beklenip istek yeniden denenir.
+    - `fetch_items` çok sayıda anahtarı `itemKey=` sorgusuyla 50'şerli gruplar halinde çözer.
+
+    Örnek:
+        async with AsyncZoteroClient() as client:
+            items = await client.fetch_items(["ABCD1234", "EFGH5678"])
+    """
+
+    def __init__(self, base_url=None, api_key=None, max_concurrency=None, timeout=None, max_retries=None):
+        self.base_url = (base_url or zotero_items_url()).rstrip("/")
+        self.api_key = api_key if api_key is not None else config.ZOTERO_API_KEY
+        self.max_concurrency = max_concurrency or config.ZOTERO_MAX_CONCURRENCY
+        self.timeout = timeout or config.ZOTERO_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else config.MAX_RETRIES
+        self._session = None
+        self._semaphore = None
+        self._backoff_until = 0.0
+
+    async def __aenter__(self):
+        headers = {"Zotero-API-Version": ZOTERO_API_VERSION}
+        if self.api_key:
+            headers["Zotero-API-Key"] = self.api_key
+        self._session = aiohttp.ClientSession(
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    def _backoff_ayarla(self, saniye):
+        """
+        📌 Sunucunun istediği bekleme süresini tüm istekler için ortak bekleme zamanına işler.
+        """
+        try:
+            saniye = float(saniye)
+        except (TypeError, ValueError):
+            return
+        self._backoff_until = max(self._backoff_until, time.monotonic() + saniye)
+
+    async def _get(self, url, params=None):
+        """
+        📌 Backoff/Retry-After kurallarına uyarak GET isteği yapar.
+
+        Returns:
+            dict veya list veya None: JSON yanıtı; 404 veya kalıcı hata durumunda None.
+        """
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                bekleme = self._backoff_until - time.monotonic()
+                if bekleme > 0:
+                    await asyncio.sleep(bekleme)
+                try:
+                    async with self._session.get(url, params=params) as response:
+                        if "Backoff" in response.headers:
+                            self._backoff_ayarla(response.headers["Backoff"])
+                        if response.status == 200:
+                            return await response.json()
+                        if response.status == 404:
+                            return None
+                        if response.status in (429, 503) and "Retry-After" in response.headers:
+                            self._backoff_ayarla(response.headers["Retry-After"])
+                            config.logger.warning(f"⚠️ Zotero API {response.status}: Retry-After={response.headers['Retry-After']} sn bekleniyor.")
+                            continue
+                        if response.status < 500 and response.status != 429:
+                            config.logger.error(f"⚠️ Zotero API Hatası! Kod: {response.status}")
+                            return None
+                        config.logger.warning(f"⚠️ Zotero API {response.status}, yeniden denenecek ({attempt + 1}/{self.max_retries}).")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    config.logger.warning(f"⚠️ Zotero bağlantı hatası ({attempt + 1}/{self.max_retries}): {e}")
+            await asyncio.sleep(config.BACKOFF_FACTOR * (2 ** attempt))
+        config.logger.error(f"❌ Zotero isteği başarısız: {url}")
+        return None
+
+    async def fetch_item(self, item_key):
+        """
+        📌 Tek bir öğenin metadatasını çeker.
+
+        Returns:
+            dict veya None: Zotero öğe JSON'u.
+        """
+        return await self._get(f"{self.base_url}/{item_key}")
+
+    async def fetch_items(self, item_keys):
+        """
+        📌 Birden fazla öğeyi `itemKey=` çoklu anahtar sorgusuyla eşzamanlı olarak çeker.
+
+        Args:
+            item_keys (list): Zotero öğe anahtarları.
+
+        Returns:
+            dict: {item_key: öğe JSON'u veya None}
+        """
+        keys = list(dict.fromkeys(k for k in item_keys if k))
+        gruplar = [keys[i:i + ZOTERO_ITEMKEY_LIMIT] for i in range(0, len(keys), ZOTERO_ITEMKEY_LIMIT)]
+
+        async def grup_cek(grup):
+            params = {"itemKey": ",".join(grup), "format": "json", "limit": str(len(grup))}
+            return await self._get(self.base_url, params=params) or []
+
+        sonuc = {k: None for k in keys}
+        for items in await asyncio.gather(*(grup_cek(g) for g in gruplar)):
+            for item in items:
+                if item.get("key") in sonuc:
+                    sonuc[item["key"]] = item
+        return sonuc
+
+
+class ZoteroMirror:
+    """
+    📌 **Zotero kütüphanesinin yerel SQLite aynası.**
+
+    - İlk kullanımda tüm kütüphane sayfalanarak (`limit=100&start=N`) indirilir.
+    - Sonraki senkronizasyonlar yalnızca `since=<kütüphane sürümü>` ile değişen öğeleri
+      ve `/deleted` uç noktasındaki silinmiş anahtarları işler (`Last-Modified-Version` saklanır).
+    - Öğeler bellekte anahtar ve dosya adı sözlükleriyle tutulur; `get` ve `anahtar_coz` O(1) çalışır.
+
+    Örnek:
+        mirror = ZoteroMirror()
+        mirror.sync()
+        item = mirror.get("ABCD1234")
+    """
+
+    PAGE_SIZE = 100  # Zotero API'nin sayfa başına izin verdiği en fazla öğe
+
+    def __init__(self, db_path=None, base_url=None, api_key=None, sync_interval=None):
+        self.db_path = str(db_path or config.ZOTERO_MIRROR_PATH)
+        self.base_url = (base_url or zotero_items_url()).rstrip("/")
+        self.library_url = self.base_url.rsplit("/items", 1)[0]
+        self.sync_interval = config.ZOTERO_MIRROR_SYNC_INTERVAL if sync_interval is None else sync_interval
+        self.session = requests.Session()
+        api_key = api_key if api_key is not None else config.ZOTERO_API_KEY
+        self.session.headers.update({"Zotero-API-Version": ZOTERO_API_VERSION})
+        if api_key:
+            self.session.headers["Zotero-API-Key"] = api_key
+        self._lock = threading.RLock()
+        self._items = None
+        self._by_filename = {}
+        self._last_sync = 0.0
+        self._conn = None
+
+    def _baglanti(self):
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    key TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    item_type TEXT,
+                    parent_key TEXT,
+                    filename TEXT,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @property
+    def library_version(self):
+        row = self._baglanti().execute("SELECT value FROM meta WHERE name = 'library_version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _indeksle(self, item):
+        data = item.get("data", {})
+        if data.get("filename"):
+            self._by_filename[data["filename"]] = item["key"]
+
+    def _yukle(self):
+        """
+        📌 SQLite aynasını belleğe (anahtar ve dosya adı sözlüklerine) yükler.
+        """
+        self._items, self._by_filename = {}, {}
+        for (data,) in self._baglanti().execute("SELECT data FROM items"):
+            item = json.loads(data)
+            self._items[item["key"]] = item
+            self._indeksle(item)
+
+    def _istek(self, url, params=None, headers=None):
+        """
+        📌 Backoff/Retry-After başlıklarına uyarak GET isteği yapar.
+        """
+        for attempt in range(config.MAX_RETRIES + 1):
+            response = self.session.get(url, params=params, headers=headers, timeout=config.ZOTERO_TIMEOUT)
+            bekleme = response.headers.get("Retry-After") if response.status_code in (429, 503) else response.headers.get("Backoff")
+            if response.status_code in (429, 503) or response.status_code >= 500:
+                time.sleep(float(bekleme) if bekleme else config.BACKOFF_FACTOR * (2 ** attempt))
+                continue
+            if bekleme:
+                time.sleep(float(bekleme))
+            return response
+        response.raise_for_status()
+        return response
+
+    def sync(self):
+        """
+        📌 **Aynayı Zotero ile senkronize eder** (ilk seferde tam, sonra `since=` ile artımlı).
+
+        Returns:
+            int: Güncellenen/eklenen öğe sayısı (değişiklik yoksa 0).
+        """
+        with self._lock:
+            if self._items is None:
+                self._yukle()
+            since = self.library_version
+            conn = self._baglanti()
+            start, guncellenen, yeni_surum = 0, 0, since
+            while True:
+                params = {"since": since, "format": "json", "limit": self.PAGE_SIZE, "start": start}
+                headers = {"If-Modified-Since-Version": str(since)} if since else None
+                response = self._istek(self.base_url, params=params, headers=headers)
+                if response.status_code == 304:
+                    break
+                response.raise_for_status()
+                if start == 0:
+                    yeni_surum = int(response.headers.get("Last-Modified-Version", since))
+                items = response.json()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                    [(i["key"], i.get("version", 0), i.get("data", {}).get("itemType"),
+                      i.get("data", {}).get("parentItem"), i.get("data", {}).get("filename"),
+                      json.dumps(i, ensure_ascii=False)) for i in items]
+                )
+                for item in items:
+                    self._items[item["key"]] = item
+                    self._indeksle(item)
+                guncellenen += len(items)
+                toplam = response.headers.get("Total-Results")
+                start += len(items)
+                if len(items) < self.PAGE_SIZE or (toplam is not None and start >= int(toplam)):
+                    break
+
+            if since and yeni_surum != since:
+                response = self._istek(f"{self.library_url}/deleted", params={"since": since})
+                if response.status_code == 200:
+                    silinen = response.json().get("items", [])
+                    conn.executemany("DELETE FROM items WHERE key = ?", [(k,) for k in silinen])
+                    for key in silinen:
+                        item = self._items.pop(key, None)
+                        if item and item.get("data", {}).get("filename"):
+                            self._by_filename.pop(item["data"]["filename"], None)
+
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('library_version', ?)", (str(yeni_surum),))
+            conn.commit()
+            self._last_sync = time.monotonic()
+            config.logger.info(f"🔄 Zotero aynası senkronize edildi: {guncellenen} öğe güncellendi (sürüm {since} → {yeni_surum}, toplam {len(self._items)}).")
+            return guncellenen
+
+    @property
+    def surum(self):
+        return f"api:{self.library_version}"
+
+    def ogeler(self):
+        """
+        📌 Aynadaki tüm öğeleri döndürür.
+        """
+        if self._items is None:
+            with self._lock:
+                if self._items is None:
+                    self._yukle()
+        return list(self._items.values())
+
+    def ensure_synced(self):
+        """
+        📌 Ayna hiç senkronize edilmemişse veya `sync_interval` süresi dolmuşsa senkronize eder.
+        Ağ hatasında mevcut yerel veriyle devam edilir.
+
+        Returns:
+            bool: Aynanın kullanılabilir (en az bir kez senkronize edilmiş) olup olmadığı.
+        """
+        with self._lock:
+            if self._last_sync and time.monotonic() - self._last_sync < self.sync_interval:
+                return True
+            try:
+                self.sync()
+            except Exception as e:
+                config.logger.error(f"❌ Zotero aynası senkronize edilemedi: {e}")
+                if self._items is None:
+                    self._yukle()
+                self._last_sync = time.monotonic()
+            return self.library_version > 0
+
+    def get(self, item_key):
+        """
+        📌 Öğeyi yerel aynadan döndürür (O(1)).
+
+        Returns:
+            dict veya None: Zotero API biçimindeki öğe JSON'u.
+        """
+        if self._items is None:
+            with self._lock:
+                if self._items is None:
+                    self._yukle()
+        return self._items.get(item_key)
+
+    def anahtar_coz(self, dosya_adi):
+        """
+        📌 Dosya adından (ek dosya adı veya ada gömülü anahtar) ana öğe anahtarını çözer.
+
+        Returns:
+            str veya None: Ana (parent) öğe anahtarı; ek dosyanın üst öğesi yoksa ekin kendi anahtarı.
+        """
+        key = self._by_filename.get(dosya_adi)
+        if key is None:
+            key = next((k for k in re.findall(r'(?<![A-Z0-9])([A-Z0-9]{8})(?![A-Z0-9])', dosya_adi) if self.get(k)), None)
+        if key is None:
+            return None
+        return self.get(key).get("data", {}).get("parentItem") or key
+
+
+class ZoteroLocalDB:
+    """
+    📌 **Yerel `zotero.sqlite` veritabanını çevrimdışı metadata kaynağı olarak okuyan arka uç.**
+
+    - Veritabanı salt okunur ve `immutable=1` kipinde açılır; Zotero açıkken bile kilit beklenmez.
+    - Öğeler, alanlar, yazarlar ve ekler birkaç toplu JOIN sorgusuyla tek seferde belleğe alınır;
+      çıktı Zotero API'sinin öğe JSON biçimindedir (`{"key", "version", "data": {...}}`).
+    - Depolama klasörü anahtarı (storage/<KEY>/) ek öğesine ve onun üst öğesine eşlenir.
+    - `ZoteroMirror` ile aynı arayüzü (`ensure_synced`, `get`, `anahtar_coz`) sunar.
+
+    Not: immutable kip dosyanın okuma sırasında değişmediğini varsayar; veritabanı dosyası
+    değiştiğinde (mtime) bir sonraki `ensure_synced` çağrısında yeniden yüklenir.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or config.ZOTERO_SQLITE_PATH)
+        self._lock = threading.RLock()
+        self._items = None
+        self._by_filename = {}
+        self._storage = {}
+        self._mtime = None
+
+    def _baglanti(self):
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro&immutable=1"
+        return sqlite3.connect(uri, uri=True)
+
+    def _yukle(self):
+        """
+        📌 Kütüphaneyi toplu sorgularla belleğe yükler.
+        """
+        start = time.perf_counter()
+        conn = self._baglanti()
+        try:
+            tablolar = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+            fields = "fieldsCombined" if "fieldsCombined" in tablolar else "fields"
+            item_types = "itemTypesCombined" if "itemTypesCombined" in tablolar else "itemTypes"
+            silinen = "WHERE i.itemID NOT IN (SELECT itemID FROM deletedItems)" if "deletedItems" in tablolar else ""
+
+            items, by_id = {}, {}
+            for item_id, key, version, type_name in conn.execute(
+                f"SELECT i.itemID, i.key, i.version, t.typeName FROM items i "
+                f"JOIN {item_types} t ON t.itemTypeID = i.itemTypeID {silinen}"
+            ):
+                item = {"key": key, "version": version, "data": {"key": key, "version": version, "itemType": type_name}}
+                items[key] = by_id[item_id] = item
+
+            for item_id, field_name, value in conn.execute(
+                f"SELECT d.itemID, f.fieldName, v.value FROM itemData d "
+                f"JOIN itemDataValues v ON v.valueID = d.valueID JOIN {fields} f ON f.fieldID = d.fieldID"
+            ):
+                if item_id in by_id:
+                    by_id[item_id]["data"][field_name] = value
+
+            for item_id, creator_type, first, last, field_mode in conn.execute(
+                "SELECT ic.itemID, ct.creatorType, c.firstName, c.lastName, c.fieldMode FROM itemCreators ic "
+                "JOIN creators c ON c.creatorID = ic.creatorID JOIN creatorTypes ct ON ct.creatorTypeID = ic.creatorTypeID "
+                "ORDER BY ic.itemID, ic.orderIndex"
+            ):
+                if item_id in by_id:
+                    creator = {"creatorType": creator_type, "name": last} if field_mode == 1 else \
+                        {"creatorType": creator_type, "firstName": first, "lastName": last}
+                    by_id[item_id]["data"].setdefault("creators", []).append(creator)
+
+            by_filename, storage = {}, {}
+            for item_id, parent_key, path, content_type in conn.execute(
+                "SELECT a.itemID, p.key, a.path, a.contentType FROM itemAttachments a "
+                "LEFT JOIN items p ON p.itemID = a.parentItemID"
+            ):
+                item = by_id.get(item_id)
+                if item is None:
+                    continue
+                data = item["data"]
+                if parent_key:
+                    data["parentItem"] = parent_key
+                if content_type:
+                    data["contentType"] = content_type
+                if path:
+                    filename = path[len("storage:"):] if path.startswith("storage:") else Path(path).name
+                    data["filename"] = filename
+                    by_filename[filename] = item["key"]
+                storage[item["key"]] = parent_key or item["key"]
+        finally:
+            conn.close()
+
+        self._items, self._by_filename, self._storage = items, by_filename, storage
+        config.logger.info(
+            f"📚 zotero.sqlite yüklendi: {len(items)} öğe, {len(storage)} ek ({time.perf_counter() - start:.2f} sn)."
+        )
+
+    @property
+    def surum(self):
+        return f"local:{self.db_path}:{self._mtime}" if self._mtime is not None else None
+
+    def ogeler(self):
+        """
+        📌 Veritabanındaki tüm (silinmemiş) öğeleri döndürür.
+        """
+        if self._items is None:
+            self.ensure_synced()
+        return list((self._items or {}).values())
+
+    def ensure_synced(self):
+        """
+        📌 Veritabanını ilk kullanımda veya dosya değiştiğinde yeniden yükler.
+
+        Returns:
+            bool: Veritabanı okunabildiyse True.
+        """
+        with self._lock:
+            try:
+                mtime = self.db_path.stat().st_mtime
+                if self._items is None or mtime != self._mtime:
+                    self._yukle()
+                    self._mtime = mtime
+            except (OSError, sqlite3.Error) as e:
+                config.logger.error(f"❌ zotero.sqlite okunamadı ({self.db_path}): {e}")
+            return self._items is not None
+
+    def get(self, item_key):
+        """
+        📌 Öğeyi bellekteki kütüphaneden döndürür (O(1)).
+        """
+        if self._items is None:
+            self.ensure_synced()
+        return (self._items or {}).get(item_key)
+
+    def storage_klasoru_coz(self, folder_key):
+        """
+        📌 Depolama klasörü anahtarını (storage/<KEY>) ek ve üst öğe metadatasına eşler.
+
+        Returns:
+            dict veya None: {"attachment": ek öğesi, "parent": üst öğe (yoksa ekin kendisi)}
+        """
+        if self._items is None:
+            self.ensure_synced()
+        parent_key = self._storage.get(folder_key)
+        if parent_key is None:
+            return None
+        return {"attachment": self._items.get(folder_key), "parent": self._items.get(parent_key)}
+
+    def anahtar_coz(self, dosya_adi):
+        """
+        📌 Dosya yolu/adından ana öğe anahtarını çözer: önce storage klasörü, sonra ek dosya adı,
+        en son ada gömülü 8 karakterlik anahtar denenir.
+        """
+        if self._items is None:
+            self.ensure_synced()
+        folder = Path(dosya_adi).parent.name
+        if folder in self._storage:
+            return self._storage[folder]
+        key = self._by_filename.get(Path(dosya_adi).name)
+        if key is None:
+            key = next((k for k in re.findall(r'(?<![A-Z0-9])([A-Z0-9]{8})(?![A-Z0-9])', str(dosya_adi)) if k in self._items), None)
+        if key is None:
+            return None
+        return self._storage.get(key) or key
+
+
+class AttachmentIndex:
+    """
+    📌 **Depolama klasörü / ek anahtarı / dosya adı → ana öğe anahtarı dizini.**
+
+    - Bir kez `ZoteroMirror` veya `ZoteroLocalDB` üzerinden kurulur ve JSON olarak diske yazılır;
+      sonraki çalıştırmalarda ağa veya veritabanına dokunmadan yüklenir.
+    - Kaynağın sürümü (`surum`) değiştiğinde yeniden kurulur.
+    - `coz` çağrıları sözlük aramasıdır (O(1)).
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or config.ZOTERO_ATTACHMENT_INDEX_PATH)
+        self.surum = None
+        self.by_key = {}       # ek/storage klasörü anahtarı veya öğe anahtarı → ana öğe anahtarı
+        self.by_filename = {}  # ek dosya adı → ana öğe anahtarı
+        self._lock = threading.Lock()
+        self._yukle()
+
+    @property
+    def hazir(self):
+        return self.surum is not None
+
+    def _yukle(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                veri = json.load(f)
+            self.surum, self.by_key, self.by_filename = veri["surum"], veri["by_key"], veri["by_filename"]
+        except (OSError, ValueError, KeyError) as e:
+            config.logger.error(f"❌ Ek anahtar dizini okunamadı, yeniden kurulacak: {e}")
+
+    def _kaydet(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"surum": self.surum, "by_key": self.by_key, "by_filename": self.by_filename}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def guncelle(self, kaynak):
+        """
+        📌 Kaynağın sürümü dizindekinden farklıysa dizini yeniden kurar ve diske yazar.
+
+        Args:
+            kaynak (ZoteroMirror veya ZoteroLocalDB): Senkronize edilmiş metadata kaynağı.
+
+        Returns:
+            bool: Dizin yeniden kurulduysa True.
+        """
+        with self._lock:
+            surum = kaynak.surum
+            if surum is not None and surum == self.surum:
+                return False
+            by_key, by_filename = {}, {}
+            for item in kaynak.ogeler():
+                data = item.get("data", {})
+                parent = data.get("parentItem") or item["key"]
+                by_key[item["key"]] = parent
+                if data.get("filename"):
+                    by_filename[data["filename"]] = parent
+            self.surum, self.by_key, self.by_filename = surum, by_key, by_filename
+            self._kaydet()
+        config.logger.info(f"🗂️ Ek anahtar dizini kuruldu: {len(by_key)} anahtar, {len(by_filename)} dosya adı ({surum}).")
+        return True
+
+    def coz(self, dosya_yolu):
+        """
+        📌 Dosya yolundan ana öğe anahtarını çözer: storage klasörü → dosya adı → ada gömülü geçerli anahtar.
+
+        Returns:
+            str veya None: Ana öğe anahtarı; dizinde yoksa None.
+        """
+        dosya_yolu = Path(dosya_yolu)
+        parent = self.by_key.get(dosya_yolu.parent.name) or self.by_filename.get(dosya_yolu.name)
+        if parent:
+            return parent
+        for key in re.findall(r'(?<![A-Z0-9])([A-Z0-9]{8})(?![A-Z0-9])', dosya_yolu.name):
+            if key in self.by_key:
+                return self.by_key[key]
+        return None
+
+
 class ZoteroEntegratoru:
     """
     📌 **Zotero API entegrasyonunu yöneten sınıf.**
@@ -18,21 +602,50 @@ class ZoteroEntegratoru:
     - **Gelişmiş hata yönetimi** ve detaylı loglama eklendi.
     """
 
-    def __init__(self):
-        self.base_url = f"https://api.zotero.org/users/{config.ZOTERO_USER_ID}/items"
-        self.headers = {"Zotero-API-Key": config.ZOTERO_API_KEY}
+    def __init__(self, base_url=None, ayna_kullan=True):
+        """
+        Args:
+            base_url (str, optional): Öğeler uç noktası (varsayılan: `zotero_items_url()`).
+            ayna_kullan (bool): False ise yerel ayna / zotero.sqlite kullanılmaz, her istek API'ye gider
+                (ör. sahte sunucuya karşı benchmark).
+        """
+        self.base_url = base_url or zotero_items_url()
+        self.headers = {"Zotero-API-Key": config.ZOTERO_API_KEY, "Zotero-API-Version": ZOTERO_API_VERSION}
+        self.session = requests.Session()  # Keep-alive bağlantı havuzu
+        self.session.headers.update(self.headers)
+        # Metadata arka ucu: "local" → zotero.sqlite (çevrimdışı), aksi halde API + yerel SQLite aynası
+        if not ayna_kullan:
+            self.mirror = None
+        elif config.ZOTERO_BACKEND == "local":
+            self.mirror = ZoteroLocalDB()
+        elif config.ZOTERO_MIRROR_ENABLED and config.ZOTERO_USER_ID:
+            self.mirror = ZoteroMirror(base_url=self.base_url)
+        else:
+            self.mirror = None
+        self.attachment_index = AttachmentIndex()
 
     def dokuman_id_al(self, dosya_adi):
         """
-        📌 **Dosya adından Zotero benzersiz kimliğini çıkarır.**
+        📌 **Dosya yolundan/adından Zotero benzersiz kimliğini çıkarır.**
+        Önce diskteki ek anahtar dizinine (storage klasörü, ek anahtarı, dosya adı) bakılır;
+        dizin yoksa veya kaynak sürümü değiştiyse ayna/yerel veritabanından yeniden kurulur.
+        Dizin hazırsa ve dosya bulunamazsa tahmin yapılmaz (gereksiz API çağrısı önlenir).
         
         Args:
-            dosya_adi (str): PDF veya TXT dosya adı.
+            dosya_adi (str or Path): PDF veya TXT dosya yolu ya da adı.
         
         Returns:
-            str veya None: Zotero'daki benzersiz doküman ID'si.
+            str veya None: Zotero'daki ana öğe (parent) anahtarı.
         """
-        match = re.search(r'([A-Z0-9]{8})', dosya_adi)  # Zotero ID'leri genellikle 8 karakter uzunluğundadır.
+        key = self.attachment_index.coz(dosya_adi)
+        if key:
+            return key
+        if self.mirror is not None and self.mirror.ensure_synced():
+            if self.attachment_index.guncelle(self.mirror):
+                key = self.attachment_index.coz(dosya_adi)
+        if key or self.attachment_index.hazir:
+            return key
+        match = re.search(r'([A-Z0-9]{8})', Path(dosya_adi).name)  # Zotero ID'leri genellikle 8 karakter uzunluğundadır.
         if match:
             return match.group(1)
         return None  # Eğer eşleşme bulunamazsa None döndür.
@@ -47,8 +660,11 @@ class ZoteroEntegratoru:
         Returns:
             dict veya None: Eğer başarıyla çekilirse JSON verisi, yoksa None.
         """
+        # Senkronize yerel ayna varsa ağ isteği yapılmaz; aynada olmayan öğe kütüphanede de yoktur
+        if self.mirror is not None and self.mirror.ensure_synced():
+            return self.mirror.get(item_key)
         try:
-            response = requests.get(f"{self.base_url}/{item_key}", headers=self.headers)
+            response = self.session.get(f"{self.base_url}/{item_key}", timeout=config.ZOTERO_TIMEOUT)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -58,6 +674,28 @@ class ZoteroEntegratoru:
             config.logger.error(f"❌ Zotero bağlantı hatası: {str(e)}")
             return None
 
+    def fetch_zotero_metadata_batch(self, item_keys):
+        """
+        📌 **Birden fazla öğenin metadatasını tek seferde çeker.**
+        `AsyncZoteroClient.fetch_items` ile `itemKey=` sorguları eşzamanlı gönderilir.
+        Çalışan bir event loop içinden çağrılmamalıdır; orada doğrudan `AsyncZoteroClient` kullanılmalıdır.
+
+        Args:
+            item_keys (list): Zotero öğe anahtarları.
+
+        Returns:
+            dict: {item_key: metadata JSON'u veya None}
+        """
+        async def _calistir():
+            async with AsyncZoteroClient(base_url=self.base_url) as client:
+                return await client.fetch_items(item_keys)
+
+        try:
+            return asyncio.run(_calistir())
+        except Exception as e:
+            config.logger.error(f"❌ Zotero toplu metadata hatası: {str(e)}")
+            return {k: None for k in item_keys}
+
 
 
 